@@ -0,0 +1,205 @@
+"""Persistenter Angebotsspeicher (SQLite) für beide Apps.
+
+Positionen liegen nur in der Datenbank; die Session merkt sich lediglich die
+ID des aktiven Angebots. Summe und Anzahl der Positionen werden in der
+Angebotszeile mitgeführt und bei jeder Änderung in derselben Transaktion
+angepasst.
+"""
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+import laufzeit
+
+DB_DATEI = "angebote.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS kunden (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL DEFAULT '', strasse TEXT NOT NULL DEFAULT '', ort TEXT NOT NULL DEFAULT '',
+    tel TEXT NOT NULL DEFAULT '', email TEXT NOT NULL DEFAULT '', notiz TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS ix_kunden_name ON kunden(name COLLATE NOCASE);
+
+CREATE TABLE IF NOT EXISTS angebote (
+    id INTEGER PRIMARY KEY,
+    app TEXT NOT NULL,
+    kunde_id INTEGER REFERENCES kunden(id),
+    titel TEXT NOT NULL DEFAULT '',
+    zusatzkosten TEXT NOT NULL DEFAULT '{}',
+    anzahl INTEGER NOT NULL DEFAULT 0,
+    summe REAL NOT NULL DEFAULT 0,
+    naechste_nr INTEGER NOT NULL DEFAULT 1,
+    erstellt TEXT NOT NULL,
+    geaendert TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_angebote_app_geaendert ON angebote(app, geaendert);
+CREATE INDEX IF NOT EXISTS ix_angebote_kunde ON angebote(kunde_id);
+
+CREATE TABLE IF NOT EXISTS positionen (
+    id INTEGER PRIMARY KEY,
+    angebot_id INTEGER NOT NULL REFERENCES angebote(id) ON DELETE CASCADE,
+    nr INTEGER NOT NULL,
+    preis REAL NOT NULL DEFAULT 0,
+    daten TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_positionen_angebot_nr ON positionen(angebot_id, nr);
+"""
+
+KUNDEN_FELDER = {"Name": "name", "Strasse": "strasse", "Ort": "ort", "Tel": "tel", "Email": "email", "Notiz": "notiz"}
+
+def _jetzt():
+    return datetime.now().isoformat(timespec="seconds")
+
+class AngebotStore:
+    """Eine Verbindung pro Thread (Streamlit-Sessions laufen in eigenen Threads)."""
+
+    def __init__(self, pfad=DB_DATEI):
+        self.pfad = os.path.abspath(pfad)
+        self._lokal = threading.local()
+        self._con().executescript(_SCHEMA)
+
+    def _con(self):
+        con = getattr(self._lokal, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.pfad, timeout=10, isolation_level=None)
+            con.row_factory = sqlite3.Row
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            con.execute("PRAGMA foreign_keys=ON")
+            self._lokal.con = con
+        return con
+
+    @contextmanager
+    def _tx(self):
+        con = self._con()
+        con.execute("BEGIN IMMEDIATE")
+        try: yield con
+        except BaseException:
+            con.execute("ROLLBACK")
+            raise
+        con.execute("COMMIT")
+
+    # ==========================================
+    # ANGEBOTE
+    # ==========================================
+    def neu(self, app, titel=""):
+        with self._tx() as con:
+            t = _jetzt()
+            return con.execute("INSERT INTO angebote(app, titel, erstellt, geaendert) VALUES (?,?,?,?)",
+                               (app, titel, t, t)).lastrowid
+
+    def existiert(self, angebot_id, app=None):
+        r = self._con().execute("SELECT app FROM angebote WHERE id=?", (angebot_id,)).fetchone()
+        return r is not None and (app is None or r["app"] == app)
+
+    @laufzeit.gemessen("Warenkorb Summe")
+    def kopf(self, angebot_id):
+        """{'anzahl', 'summe', 'titel', 'zusatzkosten', 'kunde'} ohne Positionen zu laden."""
+        r = self._con().execute(
+            "SELECT a.*, k.name, k.strasse, k.ort, k.tel, k.email, k.notiz FROM angebote a "
+            "LEFT JOIN kunden k ON k.id = a.kunde_id WHERE a.id=?", (angebot_id,)).fetchone()
+        if r is None: return None
+        kunde = {feld: (r[spalte] or "") for feld, spalte in KUNDEN_FELDER.items()}
+        return {"id": r["id"], "app": r["app"], "titel": r["titel"], "anzahl": r["anzahl"], "summe": r["summe"],
+                "zusatzkosten": json.loads(r["zusatzkosten"]), "kunde": kunde,
+                "erstellt": r["erstellt"], "geaendert": r["geaendert"]}
+
+    def laden(self, angebot_id):
+        """Kopf + alle Positionen (z.B. für die PDF-Erstellung)."""
+        kopf = self.kopf(angebot_id)
+        if kopf is None: return None
+        kopf["positionen"] = [p for _, p in self.positionen(angebot_id)]
+        return kopf
+
+    def kunde_speichern(self, angebot_id, kunde):
+        werte = [str(kunde.get(feld, "") or "") for feld in KUNDEN_FELDER]
+        with self._tx() as con:
+            kid = con.execute("SELECT kunde_id FROM angebote WHERE id=?", (angebot_id,)).fetchone()[0]
+            spalten = list(KUNDEN_FELDER.values())
+            if kid is None:
+                kid = con.execute(f"INSERT INTO kunden({','.join(spalten)}) VALUES ({','.join('?' * len(spalten))})",
+                                  werte).lastrowid
+            else:
+                con.execute(f"UPDATE kunden SET {','.join(s + '=?' for s in spalten)} WHERE id=?", werte + [kid])
+            con.execute("UPDATE angebote SET kunde_id=?, titel=?, geaendert=? WHERE id=?",
+                        (kid, werte[0], _jetzt(), angebot_id))
+
+    def zusatzkosten_speichern(self, angebot_id, zusatzkosten):
+        with self._tx() as con:
+            con.execute("UPDATE angebote SET zusatzkosten=?, geaendert=? WHERE id=?",
+                        (json.dumps(zusatzkosten, ensure_ascii=False), _jetzt(), angebot_id))
+
+    def loeschen(self, angebot_id):
+        with self._tx() as con:
+            con.execute("DELETE FROM positionen WHERE angebot_id=?", (angebot_id,))
+            con.execute("DELETE FROM angebote WHERE id=?", (angebot_id,))
+
+    def liste(self, app=None, suche="", limit=50):
+        """Neueste Angebote zuerst; ``suche`` filtert über Titel und Kundendaten."""
+        sql = ("SELECT a.id, a.app, a.titel, a.anzahl, a.summe, a.geaendert, k.name, k.ort FROM angebote a "
+               "LEFT JOIN kunden k ON k.id = a.kunde_id WHERE a.anzahl > 0")
+        args = []
+        if app: sql += " AND a.app=?"; args.append(app)
+        if suche:
+            muster = f"%{suche.strip()}%"
+            sql += (" AND (a.titel LIKE ? OR k.name LIKE ? OR k.ort LIKE ? OR k.email LIKE ?"
+                    " OR CAST(a.id AS TEXT) = ?)")
+            args += [muster, muster, muster, muster, suche.strip()]
+        sql += " ORDER BY a.geaendert DESC LIMIT ?"; args.append(limit)
+        return [dict(r) for r in self._con().execute(sql, args)]
+
+    # ==========================================
+    # POSITIONEN
+    # ==========================================
+    def positionen(self, angebot_id, start=0, anzahl=None):
+        """[(Positions-ID, Dict)] in Reihenfolge; mit ``anzahl`` nur eine Seite."""
+        sql = "SELECT id, daten FROM positionen WHERE angebot_id=? ORDER BY nr"
+        args = [angebot_id]
+        if anzahl is not None: sql += " LIMIT ? OFFSET ?"; args += [anzahl, start]
+        return [(r["id"], json.loads(r["daten"])) for r in self._con().execute(sql, args)]
+
+    def position_hinzufuegen(self, angebot_id, position, preis):
+        with self._tx() as con:
+            nr = con.execute("SELECT naechste_nr FROM angebote WHERE id=?", (angebot_id,)).fetchone()[0]
+            con.execute("INSERT INTO positionen(angebot_id, nr, preis, daten) VALUES (?,?,?,?)",
+                        (angebot_id, nr, preis, json.dumps(position, ensure_ascii=False)))
+            con.execute("UPDATE angebote SET naechste_nr=naechste_nr+1, anzahl=anzahl+1, summe=summe+?, geaendert=? "
+                        "WHERE id=?", (preis, _jetzt(), angebot_id))
+
+    @laufzeit.gemessen("Warenkorb ändern")
+    def positionen_batch(self, angebot_id, aendern=None, loeschen=()):
+        """Änderungen {Positions-ID: (Dict, Preis)} und Löschungen in einer Transaktion."""
+        with self._tx() as con:
+            delta, weg = 0.0, 0
+            for pid, (daten, preis) in (aendern or {}).items():
+                alt = con.execute("SELECT preis FROM positionen WHERE id=? AND angebot_id=?", (pid, angebot_id)).fetchone()
+                if alt is None: continue
+                con.execute("UPDATE positionen SET daten=?, preis=? WHERE id=?",
+                            (json.dumps(daten, ensure_ascii=False), preis, pid))
+                delta += preis - alt[0]
+            for pid in set(loeschen):
+                alt = con.execute("SELECT preis FROM positionen WHERE id=? AND angebot_id=?", (pid, angebot_id)).fetchone()
+                if alt is None: continue
+                con.execute("DELETE FROM positionen WHERE id=?", (pid,))
+                delta -= alt[0]; weg += 1
+            con.execute("UPDATE angebote SET anzahl=anzahl-?, summe=CASE WHEN anzahl-?=0 THEN 0 ELSE summe+? END, "
+                        "geaendert=? WHERE id=?", (weg, weg, delta, _jetzt(), angebot_id))
+
+    def positionen_leeren(self, angebot_id):
+        with self._tx() as con:
+            con.execute("DELETE FROM positionen WHERE angebot_id=?", (angebot_id,))
+            con.execute("UPDATE angebote SET anzahl=0, summe=0, geaendert=? WHERE id=?", (_jetzt(), angebot_id))
+
+_STORES = {}
+_LOCK = threading.Lock()
+
+def store(pfad=DB_DATEI):
+    """Prozessweite Store-Instanz je Datenbankdatei."""
+    pfad = os.path.abspath(pfad)
+    with _LOCK:
+        if pfad not in _STORES: _STORES[pfad] = AngebotStore(pfad)
+        return _STORES[pfad]
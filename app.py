@@ -1,16 +1,24 @@
 import streamlit as st
 import math
-import pandas as pd
-from fpdf import FPDF
 import datetime
 import os
-import json
-import io
+
+import laufzeit
+import startzeit
+import warenkorb
+import angebot_store
+import katalog_json
+import katalog_backup
+import katalog_suche
+from pdf_v8 import create_pdf # PDF-Generator
+
+messung = startzeit.Messung("app")
 
 # ==========================================
 # 0. KONFIGURATION & STYLES
 # ==========================================
 st.set_page_config(page_title="Meingassner V8", page_icon="🏗️", layout="wide")
+laufzeit.sitzung(st.session_state.setdefault('laufzeit', laufzeit.Statistik()))
 
 # Custom CSS für Touch-Optimierung auf Tablets
 st.markdown("""
@@ -27,6 +35,9 @@ st.markdown("""
 # ==========================================
 # 1. DATENBANK & STATE MANAGEMENT
 # ==========================================
+APP_KENNUNG = "v8"  # Angebote dieser App im gemeinsamen Angebotsspeicher
+ANGEBOTE = angebot_store.store()
+
 
 def get_full_default_data():
     """Liefert die Standard-Datenbankstruktur zurück."""
@@ -82,108 +93,32 @@ def get_full_default_data():
 
 def init_session():
     if 'db' not in st.session_state:
-        # Lade DB oder Defaults
-        if os.path.exists('katalog.json'):
-            try:
-                with open('katalog.json', 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    defaults = get_full_default_data()
-                    # Fehlende Keys ergänzen
-                    for k in defaults:
-                        if k not in data: data[k] = defaults[k]
-                    st.session_state.db = data
-            except:
-                st.session_state.db = get_full_default_data()
-        else:
-            st.session_state.db = get_full_default_data()
+        # Nur eine Sicht auf den prozessweit geteilten Katalog; eigene Daten erst nach Admin-Änderungen
+        st.session_state.db = katalog_json.Sitzung(get_full_default_data)
             
-    if 'cart' not in st.session_state: st.session_state.cart = []
+    if 'angebot_id' not in st.session_state:
+        # Positionen liegen im Angebotsspeicher; ?angebot=ID in der URL überlebt einen Reload
+        aid = st.query_params.get("angebot", "")
+        st.session_state.angebot_id = int(aid) if aid.isdigit() and ANGEBOTE.existiert(int(aid), APP_KENNUNG) else None
+    if 'cart_version' not in st.session_state: st.session_state.cart_version = 0
 
-init_session()
-DB = st.session_state.db
+def oeffne_angebot(aid):
+    st.session_state.angebot_id = aid
+    st.session_state.cart_version += 1
+    if aid is None: st.query_params.pop("angebot", None)
+    else: st.query_params["angebot"] = str(aid)
 
-# ==========================================
-# 2. PDF GENERATOR
-# ==========================================
-def txt_clean(s):
-    """Reinigt Text für FPDF (Latin-1) und ersetzt €."""
-    if not isinstance(s, str): s = str(s)
-    s = s.replace("€", "EUR").replace("–", "-")
-    # Mapping für Umlaute, falls encoding='latin-1' strict ist
-    return s.encode('latin-1', 'replace').decode('latin-1')
-
-def create_pdf(cart_items):
-    pdf = FPDF()
-    pdf.add_page()
-    
-    # Logo
-    if os.path.exists("logo_firma.png"): 
-        pdf.image("logo_firma.png", 10, 8, 40)
-        pdf.ln(25)
-    else: 
-        pdf.ln(10)
-    
-    # Header
-    pdf.set_font("Arial", 'B', 16)
-    pdf.cell(0, 10, txt_clean("ANGEBOT"), ln=True, align='C')
-    pdf.set_font("Arial", '', 10)
-    pdf.cell(0, 10, txt_clean(f"Datum: {datetime.date.today().strftime('%d.%m.%Y')}"), ln=True, align='R')
-    pdf.ln(10)
-    
-    # Tabelle Header
-    pdf.set_fill_color(230, 230, 230)
-    pdf.set_font("Arial", 'B', 9)
-    pdf.cell(10, 8, "#", 1, 0, 'C', 1)
-    pdf.cell(110, 8, "Position / Beschreibung", 1, 0, 'L', 1)
-    pdf.cell(25, 8, "Menge", 1, 0, 'C', 1)
-    pdf.cell(45, 8, "Gesamt (Netto)", 1, 1, 'R', 1)
-    
-    # Positionen
-    total_net = 0
-    pdf.set_font("Arial", '', 9)
-    
-    for idx, item in enumerate(cart_items):
-        total_net += item['preis']
-        
-        # Hauptzeile
-        pdf.set_font("Arial", 'B', 9)
-        pdf.cell(10, 8, str(idx+1), "LRT", 0, 'C')
-        pdf.cell(110, 8, txt_clean(item['titel']), "LRT", 0, 'L')
-        pdf.cell(25, 8, txt_clean(item['menge_txt']), "LRT", 0, 'C')
-        pdf.cell(45, 8, txt_clean(f"{item['preis']:,.2f}"), "LRT", 1, 'R')
-        
-        # Details
-        pdf.set_font("Arial", '', 8)
-        for d in item.get('details', []):
-            pdf.cell(10, 5, "", "LR", 0)
-            pdf.cell(110, 5, txt_clean(f"  - {d}"), "LR", 0, 'L')
-            pdf.cell(25, 5, "", "LR", 0)
-            pdf.cell(45, 5, "", "LR", 1)
-            
-        # Abschlusslinie Item
-        pdf.cell(190, 1, "", "T", 1)
+def in_warenkorb(item):
+    if st.session_state.angebot_id is None: oeffne_angebot(ANGEBOTE.neu(APP_KENNUNG))
+    ANGEBOTE.position_hinzufuegen(st.session_state.angebot_id, item, item['preis'])
 
-    # Summenblock
-    mwst = total_net * 0.20
-    brutto = total_net + mwst
-    
-    pdf.ln(5)
-    pdf.set_font("Arial", '', 10)
-    pdf.cell(145, 7, "Netto Summe:", 0, 0, 'R')
-    pdf.cell(45, 7, txt_clean(f"{total_net:,.2f} EUR"), 1, 1, 'R')
-    
-    pdf.cell(145, 7, "20% MwSt:", 0, 0, 'R')
-    pdf.cell(45, 7, txt_clean(f"{mwst:,.2f} EUR"), 1, 1, 'R')
-    
-    pdf.set_font("Arial", 'B', 11)
-    pdf.cell(145, 8, "Gesamt Brutto:", 0, 0, 'R')
-    pdf.cell(45, 8, txt_clean(f"{brutto:,.2f} EUR"), 1, 1, 'R')
-    
-    return pdf.output(dest='S').encode('latin-1')
+init_session()
+DB = st.session_state.db
 
 # ==========================================
-# 3. MODUL A: INDIVIDUAL (CORE FEATURE)
+# 2. MODUL A: INDIVIDUAL (CORE FEATURE)
 # ==========================================
+@laufzeit.gemessen("Rendern Individual")
 def render_individual():
     st.markdown("<div class='main-header'>🛠️ Metallbau Individual</div>", unsafe_allow_html=True)
     
@@ -201,18 +136,37 @@ def render_individual():
 
     col_cat, col_mod = st.columns(2)
     kats = sorted(list(raw_indiv.keys()))
-    kat = col_cat.selectbox("Kategorie", kats)
+    kat = col_cat.selectbox("Kategorie", kats, key="ind_kat")
     
     modelle = raw_indiv[kat]
-    mod = col_mod.selectbox("Modell / Ausführung", list(modelle.keys()))
+    mod = col_mod.selectbox("Modell / Ausführung", list(modelle.keys()), key="ind_mod")
     
     data = modelle[mod]
     base_unit = data.get('einheit', 'Stk')
     
-    # 3. Dimensionen
+    # 3. Dimensionen (Treppen: Stufenzahl aus der Geometrie)
+    geometrie = None
+    if base_unit == 'Stufe':
+        with st.expander("📐 Treppengeometrie", expanded=True):
+            with startzeit.importzeit("pandas"): import pandas # von treppe benötigt, getrennt gemessen
+            with startzeit.importzeit("treppe"): import treppe
+            c_t1, c_t2, c_t3 = st.columns(3)
+            geschoss = c_t1.number_input("Geschoßhöhe (m)", 0.0, 10.0, 0.0, step=0.01)
+            lauf_max = c_t2.number_input("Max. Lauflänge (m, 0 = frei)", 0.0, 30.0, 0.0, step=0.1)
+            oeffnung = c_t3.number_input("Deckenöffnung ab Austritt (m, 0 = ohne)", 0.0, 30.0, 0.0, step=0.1)
+            if geschoss > 0:
+                loesungen = treppe.loesungen(geschoss, lauf_max, oeffnung).rename(index=lambda i: i + 1)
+                if loesungen.empty: st.warning("Keine gültige Treppengeometrie (Schrittmaß 63 ± 3 cm, Lauflänge, Kopfhöhe 2,0 m)")
+                else:
+                    st.dataframe(loesungen)
+                    nr = st.selectbox("Lösung", list(loesungen.index), format_func=lambda i: (
+                        f"{i}: {loesungen.at[i, 'Stufen']} Stufen, {loesungen.at[i, 'Steigung m'] * 100:.1f}/"
+                        f"{loesungen.at[i, 'Auftritt m'] * 100:.1f} cm, Wange {loesungen.at[i, 'Wange m']:.2f} m"))
+                    geometrie = loesungen.loc[nr]
+
     st.markdown("<div class='sub-header'>1. Maße & Menge</div>", unsafe_allow_html=True)
     c1, c2, c3 = st.columns(3)
-    menge = c1.number_input(f"Anzahl ({base_unit})", 0.0, 1000.0, 1.0, step=1.0)
+    menge = c1.number_input(f"Anzahl ({base_unit})", 0.0, 1000.0, float(geometrie['Stufen']) if geometrie is not None else 1.0, step=1.0)
     laenge = c2.number_input("Länge (m)", 0.0, 100.0, 0.0, step=0.1)
     breite = c3.number_input("Breite (m)", 0.0, 20.0, 0.0, step=0.1)
     
@@ -286,6 +240,10 @@ def render_individual():
         if st.button("🛒 In den Warenkorb", type="primary", use_container_width=True):
             details = [f"Basis: {mod} ({menge} {base_unit})"]
             if laenge > 0: details.append(f"Maße: {laenge}m x {breite}m")
+            if geometrie is not None:
+                details.append(f"Geometrie: {geometrie['Steigungen']} x {geometrie['Steigung m'] * 100:.1f} cm Steigung, "
+                               f"Auftritt {geometrie['Auftritt m'] * 100:.1f} cm, Lauf {geometrie['Lauflänge m']:.2f} m, "
+                               f"Wangen 2 x {geometrie['Wange m']:.2f} m")
             details.extend([x['detail_txt'] for x in selected_options])
             
             item = {
@@ -294,19 +252,20 @@ def render_individual():
                 "preis": endpreis,
                 "details": details
             }
-            st.session_state.cart.append(item)
+            in_warenkorb(item)
             st.success("Hinzugefügt!")
             st.rerun()
 
 # ==========================================
-# 4. MODUL B: ZÄUNE (Optimiert)
+# 3. MODUL B: ZÄUNE (Optimiert)
 # ==========================================
+@laufzeit.gemessen("Rendern Zaun")
 def render_zaun():
     st.markdown("<div class='main-header'>🚧 Gitterzäune</div>", unsafe_allow_html=True)
     
     with st.form("zaun_calc"):
         c1, c2 = st.columns(2)
-        typ = c1.selectbox("Matten-Typ", list(DB['matten'].keys()))
+        typ = c1.selectbox("Matten-Typ", list(DB['matten'].keys()), key="zaun_typ")
         h_opts = sorted(list(DB['matten'][typ].keys()), key=lambda x: int(x))
         hoehe = c2.selectbox("Höhe (mm)", h_opts)
         
@@ -314,7 +273,7 @@ def render_zaun():
         laenge = c3.number_input("Länge des Zauns (m)", 1.0, 1000.0, 10.0)
         farbe = c4.selectbox("Oberfläche", ["Verzinkt", "Anthrazit", "Moosgrün"])
         
-        steher = st.selectbox("Steher Typ", list(DB['steher'].keys()))
+        steher = st.selectbox("Steher Typ", list(DB['steher'].keys()), key="zaun_steher")
         faktor = st.number_input("Preisfaktor (Marge)", 0.5, 2.0, 1.0)
         
         if st.form_submit_button("Berechnen & Hinzufügen", type="primary", use_container_width=True):
@@ -339,7 +298,7 @@ def render_zaun():
                 f"{anz_steher} Stk Steher ({steher})"
             ]
             
-            st.session_state.cart.append({
+            in_warenkorb({
                 "titel": "Gitterzaun-Anlage",
                 "menge_txt": f"{laenge}m",
                 "preis": endpreis,
@@ -349,13 +308,14 @@ def render_zaun():
             st.rerun()
 
 # ==========================================
-# 5. MODUL C: BRIX (Optimiert)
+# 4. MODUL C: BRIX (Optimiert)
 # ==========================================
+@laufzeit.gemessen("Rendern Brix")
 def render_brix():
     st.markdown("<div class='main-header'>🏢 Brix Balkone</div>", unsafe_allow_html=True)
     
     with st.form("brix_calc"):
-        mod = st.selectbox("Modell", list(DB['brix'].keys()))
+        mod = st.selectbox("Modell", list(DB['brix'].keys()), key="brix_mod")
         
         c1, c2 = st.columns(2)
         l_ger = c1.number_input("Länge Gerade (m)", 0.0, 100.0, 5.0)
@@ -387,7 +347,7 @@ def render_brix():
                     f"Montage: {montage} (inkl. ca. {anz_steher} Steher)"
                 ]
                 
-                st.session_state.cart.append({
+                in_warenkorb({
                     "titel": f"Brix Geländer ({mod})",
                     "menge_txt": f"{l_ges:.2f}m",
                     "preis": total,
@@ -397,24 +357,52 @@ def render_brix():
                 st.rerun()
 
 # ==========================================
-# 6. WARENKORB (SIDEBAR & PDF)
+# 5. WARENKORB (SIDEBAR & PDF)
 # ==========================================
+@laufzeit.gemessen("Rendern Warenkorb")
 def render_cart_ui():
-    st.markdown("### 📋 Aktuelles Angebot")
-    
-    if not st.session_state.cart:
+    aid = st.session_state.angebot_id
+    st.markdown(f"### 📋 Aktuelles Angebot {f'(Nr. {aid})' if aid else ''}")
+
+    with st.expander("📂 Gespeicherte Angebote"):
+        suche = st.text_input("Suche (Titel, Nr.)")
+        for a in ANGEBOTE.liste(APP_KENNUNG, suche, limit=10):
+            if st.button(f"Nr. {a['id']} | {a['anzahl']} Pos. | {a['summe']:,.2f} € | {a['geaendert'][:10]}",
+                         key=f"oeffne_{a['id']}", disabled=a['id'] == aid, use_container_width=True):
+                oeffne_angebot(a['id']); st.rerun()
+        if aid and st.button("➕ Neues Angebot", use_container_width=True):
+            oeffne_angebot(None); st.rerun()
+
+    kopf = ANGEBOTE.kopf(aid) if aid else None
+    if not kopf or not kopf['anzahl']:
         st.info("Warenkorb ist leer.")
         return
 
-    total = 0
-    for i, item in enumerate(st.session_state.cart):
-        with st.expander(f"{item['titel']} ({item['preis']:,.2f} €)", expanded=False):
-            for d in item['details']:
-                st.text(f"- {d}")
-            if st.button("🗑️ Entfernen", key=f"del_{i}"):
-                st.session_state.cart.pop(i)
-                st.rerun()
-        total += item['preis']
+    with startzeit.importzeit("pandas"): import pandas as pd
+    seiten = warenkorb.seiten_anzahl(kopf['anzahl'])
+    seite = st.number_input(f"Seite (von {seiten})", 1, seiten, 1, step=1, key=f"cart_seite_{seiten}") if seiten > 1 else 1
+    start, _ = warenkorb.seiten_bereich(seite, kopf['anzahl'])
+    seite_pos = ANGEBOTE.positionen(aid, start, warenkorb.SEITEN_GROESSE)
+    sichtbar = [item for _, item in seite_pos]
+    tabelle = pd.DataFrame({
+        "Position": [item['titel'] for item in sichtbar],
+        "Menge": [item['menge_txt'] for item in sichtbar],
+        "Preis €": [item['preis'] for item in sichtbar],
+        "Details": [", ".join(item['details']) for item in sichtbar],
+        "Entfernen": [False] * len(sichtbar),
+    })
+    # Eine Tabelle statt Expander pro Position; Löschen als Batch beim Übernehmen
+    with st.form(f"cart_{st.session_state.cart_version}_{seite}"):
+        bearbeitet = st.data_editor(
+            tabelle, hide_index=True,
+            disabled=["Position", "Menge", "Preis €", "Details"],
+            column_config={"Preis €": st.column_config.NumberColumn(format="%.2f")})
+        if st.form_submit_button("🗑️ Markierte entfernen", use_container_width=True):
+            loeschen = [pid for (pid, _), x in zip(seite_pos, bearbeitet["Entfernen"]) if x]
+            ANGEBOTE.positionen_batch(aid, loeschen=loeschen)
+            st.session_state.cart_version += 1
+            st.rerun()
+    total = kopf['summe']
     
     st.markdown("---")
     mwst = total * 0.2
@@ -425,7 +413,7 @@ def render_cart_ui():
     
     # PDF Generieren
     if st.button("📄 PDF Erstellen", type="primary", use_container_width=True):
-        pdf_bytes = create_pdf(st.session_state.cart)
+        pdf_bytes = create_pdf(ANGEBOTE.laden(aid)['positionen'])
         st.download_button(
             label="⬇️ Download PDF",
             data=pdf_bytes,
@@ -435,31 +423,72 @@ def render_cart_ui():
         )
         
     if st.button("Alles löschen", use_container_width=True):
-        st.session_state.cart = []
+        ANGEBOTE.positionen_leeren(aid)
         st.rerun()
 
 # ==========================================
-# 7. ADMIN & EXCEL LOGIK
+# 6. ADMIN & EXCEL LOGIK
 # ==========================================
 def render_admin():
+    with startzeit.importzeit("pandas"): import pandas as pd
+    import individual_excel
     st.markdown("<div class='main-header'>⚙️ Datenbank Verwaltung</div>", unsafe_allow_html=True)
     
-    tab1, tab2 = st.tabs(["💾 Backup (JSON)", "📊 Excel Import/Export (Individual)"])
+    tab1, tab2, tab3, tab4 = st.tabs(["💾 Backup (JSON)", "📊 Excel Import/Export (Individual)", "⏱️ Startzeiten", "📈 Laufzeiten"])
     
     # --- JSON BACKUP ---
     with tab1:
         st.info("Sichert die **gesamte** Datenbank (Individual + Zäune + Brix).")
-        json_str = json.dumps(st.session_state.db, indent=2, ensure_ascii=False)
-        st.download_button("⬇️ Full Backup Download", json_str, "db_backup.json", "application/json")
+        db = st.session_state.db
+        # JSON erst beim Klick erzeugen (eigener Thread, daher db statt session_state)
+        st.download_button("⬇️ Full Backup Download", lambda: katalog_backup.als_json(db), "db_backup.json", "application/json")
         
-        uploaded_json = st.file_uploader("Backup wiederherstellen (JSON)", type=['json'])
+        uploaded_json = st.file_uploader("Backup wiederherstellen (JSON)", type=['json', 'gz'])
         if uploaded_json:
             try:
-                data = json.load(uploaded_json)
-                st.session_state.db = data
-                st.success("Datenbank erfolgreich wiederhergestellt!")
+                data = katalog_backup.lies_datei(uploaded_json)
+                fehler = katalog_backup.pruefe(data, get_full_default_data())
+                if fehler:
+                    st.error("Backup ungültig:\n\n" + "\n".join(f"- {f}" for f in fehler[:20]))
+                else:
+                    diff = katalog_backup.unterschiede(db, data)
+                    st.write(f"{len(diff)} Unterschiede zur aktuellen Datenbank.")
+                    if diff: st.dataframe(pd.DataFrame(diff[:1000]), hide_index=True)
+                    if st.button("Wiederherstellen (nur diese Sitzung)"):
+                        db.wiederherstellen(data)
+                        st.success("Datenbank erfolgreich wiederhergestellt!")
             except Exception as e:
                 st.error(f"Fehler beim Laden: {e}")
+        if st.session_state.db.ueberlagerung:
+            st.warning(f"Diese Sitzung nutzt eigene Daten ({', '.join(st.session_state.db.ueberlagerung)}), andere Geräte sehen sie nicht.")
+            if st.button("↩️ Eigene Daten verwerfen"): st.session_state.db.verwerfen(); st.rerun()
+
+        # Sicherungen auf dem Server (komprimiert, je Abschnitt nur bei Änderung neu)
+        st.markdown("---")
+        st.write("**🗂️ Sicherungen**")
+        c_n, c_s = st.columns([3, 1])
+        notiz = c_n.text_input("Notiz", placeholder="z.B. Preise 2026", key="backup_notiz")
+        if c_s.button("📸 Jetzt sichern"):
+            e = katalog_backup.sichern(db, notiz)
+            st.success(f"Gesichert: {e['zeit']} ({e['id']})")
+        
+        eintraege = katalog_backup.verlauf()
+        if eintraege:
+            st.caption(f"{len(eintraege)} Sicherungen, {katalog_backup.groesse() / 1e6:.2f} MB")
+            namen = {e['id']: f"{e['zeit'].replace('T', ' ')} · {e['notiz'] or '-'}" for e in eintraege}
+            sid = st.selectbox("Sicherung", list(namen), format_func=namen.get, key="backup_wahl")
+            if st.checkbox("Unterschiede zur aktuellen Datenbank anzeigen"):
+                diff = katalog_backup.unterschiede(katalog_backup.lade(sid), db)
+                st.write(f"{len(diff)} Unterschiede (Alt = Sicherung, Neu = aktuell).")
+                if diff: st.dataframe(pd.DataFrame(diff[:1000]), hide_index=True)
+            c_d, c_r = st.columns(2)
+            c_d.download_button("⬇️ Sicherung herunterladen", lambda: katalog_backup.als_json(katalog_backup.lade(sid)),
+                                f"db_backup_{sid}.json", "application/json")
+            if c_r.button("⏪ Für alle wiederherstellen"):
+                katalog_backup.sichern(katalog_json.geteilt(get_full_default_data), "vor Wiederherstellung")
+                katalog_json.speichern(katalog_backup.lade(sid))
+                db.verwerfen()
+                st.success(f"Stand vom {namen[sid]} wiederhergestellt (vorheriger Stand gesichert).")
 
     # --- EXCEL LOGIK ---
     with tab2:
@@ -467,41 +496,11 @@ def render_admin():
         
         # 1. EXPORT
         if st.button("⬇️ Excel Template herunterladen"):
-            # Flatten Logic
-            rows_prod = []
-            rows_opt = []
-            
-            indiv_data = st.session_state.db.get('individual', {})
-            for cat, models in indiv_data.items():
-                for mod_name, mod_data in models.items():
-                    # Produkt Zeile
-                    rows_prod.append({
-                        "Kategorie": cat,
-                        "Produkt": mod_name,
-                        "Einheit": mod_data.get('einheit', 'Stk'),
-                        "Materialpreis": mod_data.get('mat', 0),
-                        "Zeit_Fertigung": mod_data.get('z_fert', 0),
-                        "Zeit_Montage": mod_data.get('z_mont', 0)
-                    })
-                    # Optionen Zeilen
-                    for opt_name, opt_data in mod_data.get('optionen', {}).items():
-                        rows_opt.append({
-                            "Produkt": mod_name,
-                            "Option": opt_name,
-                            "Preis": opt_data.get('p', 0),
-                            "Einheit_Typ": opt_data.get('einheit', 'Pauschal'), # Pauschal, pro_lfm, pro_m2
-                            "Zeit_Plus": opt_data.get('z_plus', 0)
-                        })
-            
-            # Create Excel
-            buffer = io.BytesIO()
-            with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                pd.DataFrame(rows_prod).to_excel(writer, sheet_name='Produkte', index=False)
-                pd.DataFrame(rows_opt).to_excel(writer, sheet_name='Optionen', index=False)
+            daten = individual_excel.exportiere(st.session_state.db.get('individual', {}))
             
             st.download_button(
                 label="Excel Datei speichern",
-                data=buffer.getvalue(),
+                data=daten,
                 file_name="individual_katalog.xlsx",
                 mime="application/vnd.ms-excel"
             )
@@ -512,62 +511,65 @@ def render_admin():
         st.write("Excel Datei hochladen, um 'Individual' zu aktualisieren:")
         excel_file = st.file_uploader("Excel Datei (.xlsx)", type=['xlsx'])
         
-        if excel_file and st.button("🚀 Import starten"):
+        # Erst prüfen, dann mit Prüfbericht übernehmen (Ergebnis gilt nur für diese Datei)
+        if excel_file is None: st.session_state.pop('excel_import', None)
+        elif st.button("🔍 Datei prüfen"):
             try:
-                df_p = pd.read_excel(excel_file, 'Produkte')
-                df_o = pd.read_excel(excel_file, 'Optionen')
-                
-                new_indiv = {}
-                
-                # Aufbau Produkte
-                for _, row in df_p.iterrows():
-                    cat = str(row['Kategorie']).strip()
-                    prod = str(row['Produkt']).strip()
-                    
-                    if cat not in new_indiv: new_indiv[cat] = {}
-                    
-                    new_indiv[cat][prod] = {
-                        "einheit": str(row['Einheit']),
-                        "mat": float(row['Materialpreis']),
-                        "z_fert": float(row['Zeit_Fertigung']),
-                        "z_mont": float(row['Zeit_Montage']),
-                        "optionen": {}
-                    }
-                
-                # Aufbau Optionen
-                count_opt = 0
-                for _, row in df_o.iterrows():
-                    p_ref = str(row['Produkt']).strip()
-                    opt_name = str(row['Option']).strip()
-                    
-                    # Option nur einfügen, wenn Produkt existiert
-                    found = False
-                    for c in new_indiv:
-                        if p_ref in new_indiv[c]:
-                            new_indiv[c][p_ref]['optionen'][opt_name] = {
-                                "p": float(row['Preis']),
-                                "einheit": str(row['Einheit_Typ']),
-                                "z_plus": float(row['Zeit_Plus'])
-                            }
-                            found = True
-                            count_opt += 1
-                            break
-                
-                # Update Session State (Nur Individual überschreiben)
-                st.session_state.db['individual'] = new_indiv
-                
-                # Speichern auf Disk optional
-                with open('katalog.json', 'w', encoding='utf-8') as f:
-                    json.dump(st.session_state.db, f, indent=2, ensure_ascii=False)
-                    
-                st.success(f"Import erfolgreich! {len(df_p)} Produkte und {count_opt} Optionen geladen.")
-                
+                st.session_state.excel_import = (excel_file.file_id, individual_excel.importiere(excel_file))
             except Exception as e:
                 st.error(f"Fehler beim Import: {e}")
+        
+        datei_id, imp = st.session_state.get('excel_import', (None, None))
+        if imp is not None and excel_file is not None and datei_id == excel_file.file_id:
+            st.write(f"**{imp.produkte} Produkte** und **{imp.optionen} Optionen** gültig.")
+            if imp.ok: st.success("Keine Auffälligkeiten.")
+            else:
+                st.warning(f"{len(imp.probleme)} Auffälligkeiten - diese Zeilen werden nicht (bzw. wie angegeben) übernommen:")
+                st.dataframe(imp.probleme, hide_index=True)
+            
+            if st.button("🚀 Import starten", disabled=not imp.produkte):
+                # Nur Individual überschreiben und für alle Sessions speichern (vorher sichern)
+                katalog_backup.sichern(katalog_json.geteilt(get_full_default_data), "vor Excel-Import")
+                st.session_state.db.setze('individual', imp.katalog)
+                katalog_json.speichern(st.session_state.db)
+                st.session_state.db.verwerfen() # steht jetzt im geteilten Stand
+                del st.session_state.excel_import
+                st.success(f"Import erfolgreich! {imp.produkte} Produkte und {imp.optionen} Optionen geladen.")
+
+    with tab3:
+        st.dataframe(pd.DataFrame(startzeit.bericht()), hide_index=True)
+
+    with tab4:
+        laufzeit.aktivieren(st.checkbox("Messung aktiv (alle Sessions)", value=laufzeit.AKTIV))
+        st.write("**Diese Session**")
+        st.dataframe(pd.DataFrame(laufzeit.tabelle(st.session_state.laufzeit)), hide_index=True)
+        st.write("**Prozess**")
+        st.dataframe(pd.DataFrame(laufzeit.tabelle(laufzeit.PROZESS)), hide_index=True)
+        c1, c2 = st.columns(2)
+        c1.download_button("⬇️ JSON Export", laufzeit.als_json(st.session_state.laufzeit), "laufzeiten.json", "application/json")
+        if c2.button("Zurücksetzen"):
+            laufzeit.PROZESS.leeren(); st.session_state.laufzeit.leeren(); st.rerun()
 
 # ==========================================
-# 8. MAIN APP LOGIC
+# 7. MAIN APP LOGIC
 # ==========================================
+def springe_zu(ziel):
+    # Callback eines Suchtreffers: Bereich und Auswahlfelder setzen, bevor sie gezeichnet werden
+    bereich, *rest = ziel
+    st.session_state.modus, st.session_state.bereich = "🏗️ Kalkulator", bereich
+    if bereich == "Metallbau Individual": st.session_state.ind_kat, st.session_state.ind_mod = rest
+    elif bereich == "Gitterzäune": st.session_state["zaun_typ" if rest[0] == "matten" else "zaun_steher"] = rest[1]
+    elif bereich == "Brix Balkone": st.session_state.brix_mod = rest[0]
+
+def render_suche():
+    suchbegriff = st.text_input("🔎 Katalog durchsuchen", placeholder="z.B. Carport, Dachrinne, IPE")
+    if not suchbegriff: return
+    with laufzeit.messen("Katalogsuche"): treffer = katalog_suche.index_json(DB).suche(suchbegriff, limit=8)
+    for i, t in enumerate(treffer):
+        st.button(f"{t['Titel']} · {t['Detail']}", key=f"treffer_{i}", on_click=springe_zu, args=(t['Ziel'],),
+                  use_container_width=True)
+    if not treffer: st.caption("Keine Treffer")
+
 def main():
     # Sidebar Navigation
     with st.sidebar:
@@ -577,14 +579,17 @@ def main():
             st.header("Meingassner")
             
         st.markdown("---")
-        app_mode = st.radio("Modus", ["🏗️ Kalkulator", "⚙️ Datenbank Admin"])
+        app_mode = st.radio("Modus", ["🏗️ Kalkulator", "⚙️ Datenbank Admin"], key="modus")
         st.markdown("---")
         
         if app_mode == "🏗️ Kalkulator":
+            render_suche()
             module = st.radio("Bereich wählen", 
-                              ["Metallbau Individual", "Gitterzäune", "Brix Balkone"])
+                              ["Metallbau Individual", "Gitterzäune", "Brix Balkone"], key="bereich")
             st.markdown("---")
+            messung.marke("Erste Anzeige")
             render_cart_ui()
+        else: messung.marke("Erste Anzeige")
     
     # Main Content
     if app_mode == "⚙️ Datenbank Admin":
@@ -596,6 +601,7 @@ def main():
             render_zaun()
         elif module == "Brix Balkone":
             render_brix()
+    messung.abschliessen()
 
 if __name__ == "__main__":
     main()
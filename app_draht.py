@@ -1,20 +1,22 @@
 import streamlit as st
-import pandas as pd
-from fpdf import FPDF
-import base64
 import os
-import tempfile
 import math
-from datetime import datetime
+import time
+
+import laufzeit
+import startzeit
+
+messung = startzeit.Messung("app_draht")
 
 # ==========================================
 # 1. KONFIGURATION & SETUP
 # ==========================================
 LOGO_DATEI = "Meingassner Metalltechnik 2023.png"
 EXCEL_DATEI = "katalog.xlsx"
-MWST_SATZ = 0.20  # 20% MwSt
+APP_KENNUNG = "draht"  # Angebote dieser App im gemeinsamen Angebotsspeicher
 
 st.set_page_config(page_title="Meingassner Kalkulator", layout="wide", page_icon=LOGO_DATEI)
+laufzeit.sitzung(st.session_state.setdefault('laufzeit', laufzeit.Statistik()))
 
 # ==========================================
 # 2. SICHERHEIT
@@ -40,63 +42,80 @@ def check_password():
     else:
         return True
 
-if not check_password():
+angemeldet = check_password()
+messung.marke("Erste Anzeige")
+if not angemeldet:
+    messung.abschliessen()
     st.stop()
 
+# Schwere Importe erst nach dem Login-Bildschirm, damit der sofort erscheint
+with startzeit.importzeit("pandas"): import pandas as pd
+import katalog_cache
+import formel_engine
+import konfigurator
+import pdf_jobs
+import warenkorb
+import angebot_store
+import stueckliste
+import zuschnitt
+import glasteilung
+import treppe
+import katalog_suche
+from pdf_draht import create_pdf, create_internal_pdf
+messung.marke("Importe")
+
 # ==========================================
 # 3. HELFER
 # ==========================================
-def safe_float(value):
-    if pd.isna(value): return 0.0
-    s_val = str(value).replace(',', '.').strip()
-    try: return float(s_val)
-    except: return 0.0
-
-def clean_df_columns(df):
-    if df is None: return pd.DataFrame()
-    if not df.empty: 
-        df.columns = df.columns.str.strip()
-        rename_map = {'Formel / Info': 'Formel', 'Formel/Info': 'Formel', 'Info': 'Formel'}
-        df.rename(columns=rename_map, inplace=True)
-        if 'Variable' in df.columns:
-            df = df.dropna(subset=['Variable'])
-    return df
-
 def lade_startseite():
-    if not os.path.exists(EXCEL_DATEI):
+    try: stand = katalog_cache.lade_katalog(EXCEL_DATEI)
+    except Exception: return pd.DataFrame()
+    if stand is None:
         st.error(f"❌ Datei '{EXCEL_DATEI}' fehlt!")
         return pd.DataFrame()
-    try: return clean_df_columns(pd.read_excel(EXCEL_DATEI, sheet_name="Startseite"))
-    except: return pd.DataFrame()
+    df = stand.blatt("Startseite")
+    return df if df is not None else pd.DataFrame()
 
+@laufzeit.gemessen("Katalog laden")
 def lade_blatt(blatt_name):
-    if not os.path.exists(EXCEL_DATEI): return pd.DataFrame()
-    try: 
-        df = pd.read_excel(EXCEL_DATEI, sheet_name=str(blatt_name).strip())
-        return clean_df_columns(df)
-    except ValueError:
+    try: stand = katalog_cache.lade_katalog(EXCEL_DATEI)
+    except Exception: return pd.DataFrame()
+    if stand is None: return pd.DataFrame()
+    df = stand.blatt(blatt_name)
+    if df is None:
         st.error(f"❌ Blatt '{blatt_name}' fehlt in Excel!")
         return pd.DataFrame()
-    except Exception: return pd.DataFrame()
+    return df
+
+def lade_formeln(blatt_name):
+    stand = katalog_cache.lade_katalog(EXCEL_DATEI)
+    if stand is None: return formel_engine.kompiliere_blatt(None)
+    return stand.abgeleitet(("formeln", str(blatt_name).strip()),
+                            lambda: formel_engine.kompiliere_blatt(stand.blatt(blatt_name)))
+
+def lade_rechner(blatt_name, formeln):
+    # Pro Session & Blatt: merkt sich die letzten Eingaben für die Teil-Neuberechnung
+    rechner = st.session_state.setdefault('rechner', {})
+    r = rechner.get(blatt_name)
+    if r is None or r.blatt is not formeln:
+        r = rechner[blatt_name] = formel_engine.Neuberechnung(formeln)
+    return r
 
 def lade_alle_blattnamen():
-    if not os.path.exists(EXCEL_DATEI): return []
-    return pd.ExcelFile(EXCEL_DATEI).sheet_names
+    stand = katalog_cache.lade_katalog(EXCEL_DATEI)
+    if stand is None: return []
+    return stand.blattnamen
 
-def speichere_excel(df, blatt_name):
-    try:
-        with pd.ExcelWriter(EXCEL_DATEI, engine="openpyxl", mode="a", if_sheet_exists="replace") as writer:
-            df.to_excel(writer, sheet_name=blatt_name, index=False)
-        return True
-    except: return False
+def speichere_blatt(neu, basis, blatt_name):
+    # Zeilen-Deltas in den Katalogspeicher; Excel nur noch über Import/Export
+    try: return katalog_cache.speicher(EXCEL_DATEI).speichere_blatt(blatt_name, neu, basis)
+    except Exception as e:
+        st.error(f"Speichern fehlgeschlagen: {e}")
+        return None
 
 def setup_app_icon(image_file):
     if os.path.exists(image_file):
-        try:
-            with open(image_file, "rb") as f:
-                data = f.read()
-            encoded = base64.b64encode(data).decode()
-            st.sidebar.image(image_file, width=200)
+        try: st.sidebar.image(image_file, width=200)
         except: pass
 
 setup_app_icon(LOGO_DATEI)
@@ -104,290 +123,69 @@ setup_app_icon(LOGO_DATEI)
 # ==========================================
 # 4. SESSION STATE
 # ==========================================
+ANGEBOTE = angebot_store.store()
+
+DEFAULT_ZK = {
+    "kran": 0.0, "montage_mann": 2, "montage_std": 0.0, "montage_satz": 65.0,
+    "zuschlag_prozent": 0.0, "zuschlag_label": "Normal",
+    "provision_prozent": 0.0,
+    "rabatt_prozent": 0.0,
+    "skonto_prozent": 0.0,
+    "zuschnitt_lager": list(zuschnitt.LAGER_M), "zuschnitt_kerf_mm": float(zuschnitt.KERF_MM), "zuschnitt_optimiert": False
+}
+
+def oeffne_angebot(aid):
+    # Positionen bleiben in der DB; in der Session nur ID + Formularwerte
+    kopf = ANGEBOTE.kopf(aid) if aid is not None else None
+    st.session_state['angebot_id'] = aid
+    st.session_state['kunden_daten'] = kopf['kunde'] if kopf else {k: "" for k in angebot_store.KUNDEN_FELDER}
+    st.session_state['zusatzkosten'] = {**DEFAULT_ZK, **(kopf['zusatzkosten'] if kopf else {})}
+    st.session_state['wk_version'] = st.session_state.get('wk_version', 0) + 1
+    if aid is None: st.query_params.pop("angebot", None)
+    else: st.query_params["angebot"] = str(aid)
+
+def aktives_angebot(erstellen=False):
+    if st.session_state['angebot_id'] is None and erstellen:
+        # bisher eingegebene Zusatzkosten übernehmen
+        aid = ANGEBOTE.neu(APP_KENNUNG)
+        ANGEBOTE.zusatzkosten_speichern(aid, st.session_state['zusatzkosten'])
+        st.session_state['angebot_id'] = aid
+        st.query_params["angebot"] = str(aid)
+    return st.session_state['angebot_id']
+
 def init_state():
-    if 'positionen' not in st.session_state: st.session_state['positionen'] = []
-    if 'kunden_daten' not in st.session_state: 
-        st.session_state['kunden_daten'] = {"Name": "", "Strasse": "", "Ort": "", "Tel": "", "Email": "", "Notiz": ""}
+    if 'angebot_id' not in st.session_state:
+        # ?angebot=ID in der URL: überlebt Reload und lässt sich auf anderen Geräten öffnen
+        aid = st.query_params.get("angebot", "")
+        oeffne_angebot(int(aid) if aid.isdigit() and ANGEBOTE.existiert(int(aid), APP_KENNUNG) else None)
     if 'fertiges_pdf' not in st.session_state: st.session_state['fertiges_pdf'] = None
     if 'fertiges_intern_pdf' not in st.session_state: st.session_state['fertiges_intern_pdf'] = None
-
-    default_zk = {
-        "kran": 0.0, "montage_mann": 2, "montage_std": 0.0, "montage_satz": 65.0,
-        "zuschlag_prozent": 0.0, "zuschlag_label": "Normal",
-        "provision_prozent": 0.0,
-        "rabatt_prozent": 0.0,
-        "skonto_prozent": 0.0
-    }
-    if 'zusatzkosten' not in st.session_state:
-        st.session_state['zusatzkosten'] = default_zk.copy()
-    else:
-        for k, v in default_zk.items():
-            if k not in st.session_state['zusatzkosten']:
-                st.session_state['zusatzkosten'][k] = v
+    if 'pdf_auftrag' not in st.session_state: st.session_state['pdf_auftrag'] = None
 
 init_state()
 
 # ==========================================
-# 5. PDF ENGINE
+# 5. PDF ENGINE (Erstellung in pdf_draht.py)
 # ==========================================
-def clean_text(text):
-    if text is None: return ""
-    text = str(text).replace("€", "EUR").replace("–", "-").replace("„", '"').replace("“", '"')
-    text = text.replace("•", "-") # Fix für Fragezeichen
-    try: return text.encode('latin-1', 'replace').decode('latin-1')
-    except: return text
-
-class PDF(FPDF):
-    def header(self):
-        if os.path.exists(LOGO_DATEI): 
-            try: self.image(LOGO_DATEI, 10, 8, 50)
-            except: pass
-        
-        self.set_font('Helvetica', 'B', 16)
-        self.set_text_color(44, 62, 80)
-        self.cell(0, 10, clean_text("Kostenschätzung"), 0, 1, 'R')
-        
-        self.set_font('Helvetica', '', 10)
-        self.set_text_color(100, 100, 100)
-        self.cell(0, 6, clean_text(f"Datum: {datetime.now().strftime('%d.%m.%Y')}"), 0, 1, 'R')
-        
-        self.set_draw_color(200, 200, 200)
-        self.line(10, 35, 200, 35)
-        self.ln(20)
-
-    def footer(self):
-        self.set_y(-15)
-        self.set_font('Helvetica', 'I', 8)
-        self.set_text_color(128, 128, 128)
-        self.cell(0, 10, f'Seite {self.page_no()}', 0, 0, 'C')
-
-    def table_header(self):
-        self.set_font("Helvetica", 'B', 9)
-        self.set_fill_color(240, 240, 240)
-        self.set_text_color(0, 0, 0)
-        self.set_draw_color(220, 220, 220)
-        self.cell(10, 8, "Pos.", 1, 0, 'C', True)
-        self.cell(95, 8, "Beschreibung", 1, 0, 'L', True)
-        self.cell(20, 8, "Menge", 1, 0, 'C', True)
-        self.cell(30, 8, "EP", 1, 0, 'R', True)
-        self.cell(35, 8, "Gesamt", 1, 1, 'R', True)
-
-def create_pdf(positionen_liste, kunden_dict, fotos, montage_summe, kran_summe, zeige_details, zuschlag_prozent, zuschlag_label, zuschlag_transparent, provision_prozent, rabatt_prozent, skonto_prozent):
-    pdf = PDF()
-    pdf.set_auto_page_break(auto=True, margin=20) 
-    pdf.alias_nb_pages()
-    pdf.add_page()
-    
-    # Adresse
-    pdf.set_font("Helvetica", 'B', 11)
-    pdf.set_text_color(0, 0, 0)
-    pdf.cell(0, 6, clean_text("Empfänger:"), 0, 1)
-    pdf.set_font("Helvetica", '', 11)
-    adresse = f"{kunden_dict.get('Name','')}\n{kunden_dict.get('Strasse','')}\n{kunden_dict.get('Ort','')}"
-    pdf.multi_cell(0, 6, clean_text(adresse))
-    
-    if kunden_dict.get("Notiz"):
-        pdf.ln(5)
-        pdf.set_font("Helvetica", 'I', 10)
-        pdf.set_fill_color(250, 250, 250)
-        pdf.multi_cell(0, 6, clean_text(f"Notiz: {kunden_dict['Notiz']}"), 0, 'L', True)
-    
-    pdf.ln(10)
-    pdf.table_header()
-    
-    pdf.set_font("Helvetica", '', 10)
-    
-    prov_faktor = 1 + (provision_prozent / 100.0)
-    subtotal_list = 0
-    pos_nr = 1
-    
-    for pos in positionen_liste:
-        if not pos: continue
-        
-        ep_kunde = pos.get('Einzelpreis', 0) * prov_faktor
-        gp_kunde = pos.get('Preis', 0) * prov_faktor
-        subtotal_list += gp_kunde
-        
-        raw_desc = str(pos.get('Beschreibung', ''))
-        parts = raw_desc.split("|")
-        titel = parts[0].strip()
-        details = ""
-        if len(parts) > 1:
-            details = "\n" + parts[1].replace(",", "\n -").strip()
-            if not details.strip().startswith("-"): details = details.replace("\n", "\n -", 1)
-            
-        full_text = f"{titel}{details}"
-        if pos.get('RefMenge', 0) > 0:
-            ep_ref = ep_kunde / float(pos['RefMenge'])
-            full_text += f"\n(entspr. {ep_ref:.2f} EUR / {pos.get('RefEinheit', 'Stk')})"
-
-        lines = full_text.count('\n') + (len(full_text) / 50) 
-        needed_height = lines * 5 + 10
-        if pdf.get_y() + needed_height > 260:
-            pdf.add_page()
-            pdf.table_header()
-
-        y_start = pdf.get_y()
-        pdf.set_xy(10, y_start)
-        pdf.cell(10, 5, str(pos_nr), 0, 0, 'C') 
-        
-        pdf.set_xy(20, y_start)
-        pdf.multi_cell(95, 5, clean_text(full_text), border=0, align='L')
-        y_end = pdf.get_y()
-        row_height = y_end - y_start
-        
-        pdf.set_xy(115, y_start)
-        pdf.cell(20, row_height, clean_text(str(pos.get('Menge', 0))), 0, 0, 'C')
-        pdf.cell(30, row_height, f"{ep_kunde:.2f}", 0, 0, 'R')
-        pdf.cell(35, row_height, f"{gp_kunde:.2f}", 0, 0, 'R')
-        
-        pdf.set_draw_color(220, 220, 220)
-        pdf.line(10, y_end, 200, y_end)
-        pdf.set_y(y_end)
-        pos_nr += 1
-
-    montage_final = (montage_summe * prov_faktor) 
-    kran_final = (kran_summe * prov_faktor)
-    
-    basis_prov = subtotal_list + montage_final + kran_final
-    zuschlag_wert = 0
-    if zuschlag_prozent > 0: zuschlag_wert = basis_prov * (zuschlag_prozent / 100.0)
-    
-    versteckter_zuschlag = zuschlag_wert if not zuschlag_transparent else 0
-    sichtbarer_zuschlag = zuschlag_wert if zuschlag_transparent else 0
-    
-    montage_final += versteckter_zuschlag
-
-    if montage_final > 0:
-        if pdf.get_y() > 250: pdf.add_page(); pdf.table_header()
-        txt = "Montagearbeiten" if zeige_details else "Montage & Regie (Pauschal)"
-        pdf.cell(10, 8, str(pos_nr), 0, 0, 'C')
-        pdf.cell(95, 8, clean_text(txt), 0, 0, 'L')
-        pdf.cell(20, 8, "1", 0, 0, 'C')
-        pdf.cell(30, 8, f"{montage_final:.2f}", 0, 0, 'R')
-        pdf.cell(35, 8, f"{montage_final:.2f}", 0, 1, 'R')
-        pdf.line(10, pdf.get_y(), 200, pdf.get_y())
-        subtotal_list += montage_final
-        pos_nr += 1
-
-    if kran_final > 0:
-        if pdf.get_y() > 250: pdf.add_page(); pdf.table_header()
-        pdf.cell(10, 8, str(pos_nr), 0, 0, 'C')
-        pdf.cell(95, 8, "Kranarbeiten / Hebegerät", 0, 0, 'L')
-        pdf.cell(20, 8, "1", 0, 0, 'C')
-        pdf.cell(30, 8, f"{kran_final:.2f}", 0, 0, 'R')
-        pdf.cell(35, 8, f"{kran_final:.2f}", 0, 1, 'R')
-        pdf.line(10, pdf.get_y(), 200, pdf.get_y())
-        subtotal_list += kran_final
-        pos_nr += 1
-
-    if sichtbarer_zuschlag > 0:
-        if pdf.get_y() > 250: pdf.add_page(); pdf.table_header()
-        pdf.cell(10, 8, str(pos_nr), 0, 0, 'C')
-        label = f"Erschwerniszuschlag ({zuschlag_label} {zuschlag_prozent}%)"
-        pdf.cell(95, 8, clean_text(label), 0, 0, 'L')
-        pdf.cell(20, 8, "1", 0, 0, 'C')
-        pdf.cell(30, 8, f"{sichtbarer_zuschlag:.2f}", 0, 0, 'R')
-        pdf.cell(35, 8, f"{sichtbarer_zuschlag:.2f}", 0, 1, 'R')
-        pdf.line(10, pdf.get_y(), 200, pdf.get_y())
-        subtotal_list += sichtbarer_zuschlag
-        pos_nr += 1
-
-    if pdf.get_y() > 230: pdf.add_page()
-    pdf.ln(5)
-    
-    if rabatt_prozent > 0:
-        rabatt_wert = subtotal_list * (rabatt_prozent / 100.0)
-        pdf.set_font("Helvetica", '', 10)
-        pdf.cell(155, 6, "Zwischensumme:", 0, 0, 'R')
-        pdf.cell(35, 6, f"{subtotal_list:.2f}", 0, 1, 'R')
-        
-        pdf.set_text_color(200, 50, 50)
-        pdf.set_font("Helvetica", 'B', 10)
-        pdf.cell(155, 6, f"Abzüglich Rabatt ({rabatt_prozent:.1f}%):", 0, 0, 'R')
-        pdf.cell(35, 6, f"- {rabatt_wert:.2f}", 0, 1, 'R')
-        pdf.set_text_color(0, 0, 0)
-        subtotal_list -= rabatt_wert
-
-    netto = subtotal_list
-    mwst = netto * MWST_SATZ
-    brutto = netto + mwst
-
-    pdf.ln(2)
-    pdf.set_draw_color(44, 62, 80)
-    pdf.line(130, pdf.get_y(), 200, pdf.get_y())
-    pdf.ln(1)
-    
-    pdf.set_font("Helvetica", '', 11)
-    pdf.cell(155, 6, "Summe Netto:", 0, 0, 'R')
-    pdf.cell(35, 6, f"{netto:.2f} EUR", 0, 1, 'R')
-    
-    pdf.cell(155, 6, f"zzgl. {int(MWST_SATZ*100)}% MwSt:", 0, 0, 'R')
-    pdf.cell(35, 6, f"{mwst:.2f} EUR", 0, 1, 'R')
-    
-    pdf.ln(3)
-    pdf.set_font("Helvetica", 'B', 12)
-    pdf.set_fill_color(230, 236, 240)
-    pdf.cell(120, 10, "", 0, 0) 
-    pdf.cell(35, 10, "GESAMTSUMME:", 0, 0, 'R', True)
-    pdf.cell(35, 10, f"{brutto:.2f} EUR", 0, 1, 'R', True)
-
-    if skonto_prozent > 0:
-        skonto_wert = brutto * (skonto_prozent / 100.0)
-        zahlbar = brutto - skonto_wert
-        pdf.ln(5)
-        pdf.set_font("Helvetica", '', 9)
-        pdf.set_text_color(80, 80, 80)
-        pdf.cell(0, 5, clean_text(f"Zahlbar bei {skonto_prozent}% Skonto innerhalb 10 Tagen: {zahlbar:.2f} EUR"), 0, 1, 'R')
-
-    if fotos:
-        pdf.add_page()
-        pdf.set_font("Helvetica", 'B', 12)
-        pdf.set_text_color(0,0,0)
-        pdf.cell(0, 10, "Baustellendokumentation", 0, 1)
-        for f in fotos:
-            try:
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as t:
-                    t.write(f.getvalue()); tmp=t.name
-                pdf.image(tmp, x=15, w=180)
-                pdf.ln(5)
-                os.unlink(tmp)
-            except: pass
-
-    return pdf.output(dest='S').encode('latin-1')
-
-def create_internal_pdf(positionen_liste, kunden_dict, zusatzkosten):
-    pdf = PDF(); pdf.alias_nb_pages(); pdf.add_page()
-    pdf.set_font("Arial", 'B', 11); pdf.cell(0, 8, f"INTERN: {clean_text(kunden_dict.get('Name',''))}", 0, 1)
-    
-    pdf.ln(5); pdf.set_fill_color(220, 220, 220); pdf.set_font("Arial", 'B', 10)
-    pdf.cell(10, 8, "#", 1, 0, 'C', True); pdf.cell(120, 8, "Material & AV (Echte Kosten)", 1, 0, 'L', True); pdf.cell(60, 8, "Kalk. Wert (Ohne Prov)", 1, 1, 'R', True)
-    
-    total_intern = 0
-    for i, pos in enumerate(positionen_liste):
-        titel = clean_text(pos.get('Beschreibung','').split('|')[0])
-        details = ""
-        if pos.get('MaterialDetails'):
-            for d in pos['MaterialDetails']: details += f"\n  -> {d}"
-        
-        preis_intern = pos.get('Preis', 0)
-        total_intern += preis_intern
-        
-        pdf.set_font("Arial", '', 10)
-        x_start, y_start = pdf.get_x(), pdf.get_y()
-        pdf.set_x(20)
-        pdf.multi_cell(120, 5, f"{titel}{clean_text(details)}", border=0)
-        y_end = pdf.get_y(); h = y_end - y_start
-        pdf.set_xy(x_start, y_start)
-        pdf.cell(10, h, str(i+1), 1, 0, 'C')
-        pdf.set_xy(20+120, y_start)
-        pdf.cell(60, h, f"{preis_intern:.2f}", 1, 1, 'R')
-        pdf.set_y(y_end)
-        pdf.line(10, y_end, 200, y_end)
-        
-    pdf.ln(5); 
-    pdf.cell(0, 10, clean_text(f"Zusatz: Montage {zusatzkosten.get('montage_std')}h / {zusatzkosten.get('montage_mann')} Mann"), 1, 1)
-    return pdf.output(dest='S').encode('latin-1')
+def _pdf_status_anzeige():
+    auftrag = st.session_state['pdf_auftrag']
+    if auftrag is not None:
+        if not auftrag.fertig():
+            st.progress(auftrag.fortschritt(), text=f"PDFs werden erstellt... ({time.time() - auftrag.start:.0f}s)")
+            return
+        st.session_state['pdf_auftrag'] = None
+        try:
+            erg = auftrag.ergebnisse()
+            st.session_state['fertiges_pdf'] = erg['kunde']
+            st.session_state['fertiges_intern_pdf'] = erg['intern']
+            st.toast("Fertig!")
+        except Exception as e: st.session_state['pdf_fehler'] = str(e)
+        st.rerun() # Polling beenden, Downloads im ganzen Skript anzeigen
+
+def pdf_status():
+    # Pollt nur, solange ein Auftrag läuft - der Rest der Seite bleibt bedienbar
+    laeuft = st.session_state['pdf_auftrag'] is not None
+    st.fragment(run_every=0.5 if laeuft else None)(_pdf_status_anzeige)()
 
 # ==========================================
 # 6. HAUPTPROGRAMM
@@ -395,23 +193,37 @@ def create_internal_pdf(positionen_liste, kunden_dict, zusatzkosten):
 st.sidebar.header("Navigation")
 if st.sidebar.button("⚠️ Speicher leeren (Reset)"):
     for key in list(st.session_state.keys()): del st.session_state[key]
+    st.query_params.clear() # Angebot bleibt gespeichert, wird aber nicht mehr geöffnet
     st.rerun()
 
+def springe_zu(ziel):
+    # Callback: setzt die Widgets, bevor sie im nächsten Lauf gezeichnet werden
+    st.session_state['filter_kategorie'], st.session_state['system_wahl'] = ziel
+    st.session_state['menue'] = "📂 Konfigurator / Katalog"
+
 index_df = lade_startseite()
+messung.marke("Katalog")
 katalog_items = []
 if index_df is not None and not index_df.empty and 'Kategorie' in index_df.columns:
+    suchbegriff = st.sidebar.text_input("🔎 Katalog durchsuchen", placeholder="z.B. Glas, Blumenkasten, Tor")
+    if suchbegriff:
+        with laufzeit.messen("Katalogsuche"): treffer = katalog_suche.index_blaetter(EXCEL_DATEI).suche(suchbegriff, limit=8)
+        for i, t in enumerate(treffer):
+            st.sidebar.button(f"{t['Titel']} · {t['Detail']}", key=f"treffer_{i}", on_click=springe_zu, args=(t['Ziel'],),
+                              use_container_width=True)
+        if not treffer: st.sidebar.caption("Keine Treffer")
     kategorien = index_df['Kategorie'].unique()
-    wahl_kategorie = st.sidebar.selectbox("Filter Kategorie:", kategorien)
+    wahl_kategorie = st.sidebar.selectbox("Filter Kategorie:", kategorien, key="filter_kategorie")
     katalog_items = index_df[index_df['Kategorie'] == wahl_kategorie]['System'].tolist()
 
-menue_punkt = st.sidebar.radio("Gehe zu:", ["📂 Konfigurator / Katalog", "🛒 Warenkorb / Abschluss", "🔐 Admin"])
+menue_punkt = st.sidebar.radio("Gehe zu:", ["📂 Konfigurator / Katalog", "🛒 Warenkorb / Abschluss", "🔐 Admin"], key="menue")
 st.sidebar.markdown("---")
 
 # --- A: KONFIGURATOR ---
 if menue_punkt == "📂 Konfigurator / Katalog":
     st.title("Artikel Konfigurator")
     if katalog_items:
-        auswahl_system = st.selectbox("System wählen:", katalog_items)
+        auswahl_system = st.selectbox("System wählen:", katalog_items, key="system_wahl")
         row = pd.DataFrame()
         if index_df is not None and not index_df.empty:
             row = index_df[(index_df['System'] == auswahl_system)]
@@ -421,121 +233,131 @@ if menue_punkt == "📂 Konfigurator / Katalog":
         if not row.empty:
             blatt = row.iloc[0]['Blattname']
             df_config = lade_blatt(blatt)
+            formeln = lade_formeln(blatt)
+            formular = konfigurator.lade_formular(blatt, EXCEL_DATEI)
+            rechner = lade_rechner(blatt, formeln)
             if df_config.empty: st.warning("Leer.")
             else:
                 c1, c2 = st.columns([2, 1])
                 with c1:
                     st.subheader(f"Konfiguration: {auswahl_system}")
+                    if formeln.fehler: st.warning("⚠️ Formelfehler im Blatt: " + "; ".join(formeln.fehler.values()))
+                    if formular.fehler: st.warning("⚠️ Optionsfehler im Blatt: " + "; ".join(formular.fehler.values()))
                     try:
                         vars_calc = {}; desc_parts = []
-                        for index, zeile in df_config.iterrows():
-                            if pd.isna(zeile.get('Typ')): continue 
-                            typ = str(zeile.get('Typ', '')).strip().lower()
-                            lbl = str(zeile.get('Bezeichnung', ''))
-                            var = str(zeile.get('Variable', '')).strip()
-                            
-                            if typ == 'zahl':
-                                val = st.number_input(lbl, value=safe_float(str(zeile.get('Optionen',''))), step=1.0, key=f"{blatt}_{index}")
-                                vars_calc[var] = val
-                                if val!=0: desc_parts.append(f"{lbl}: {val}")
-                            elif typ == 'auswahl':
-                                raw_opts = str(zeile.get('Optionen', '')).split(',')
-                                opts = {}; opt_names = []
-                                for o in raw_opts:
-                                    if ':' in o: n,v=o.split(':'); opts[n.strip()]=safe_float(v); opt_names.append(n.strip())
-                                    else: opts[o.strip()]=0; opt_names.append(o.strip())
-                                if opt_names:
-                                    sel = st.selectbox(lbl, opt_names, key=f"{blatt}_{index}")
-                                    vars_calc[var] = opts.get(sel,0); desc_parts.append(f"{lbl}: {sel}")
-                            elif typ == 'mehrfach':
-                                raw_opts = str(zeile.get('Optionen', '')).split(',')
-                                opts = {}; opt_names = []
-                                for o in raw_opts:
-                                    if ':' in o: n,v=o.split(':'); opts[n.strip()]=safe_float(v); opt_names.append(n.strip())
-                                    else: opts[o.strip()]=0; opt_names.append(o.strip())
-                                sel = st.multiselect(lbl, opt_names, key=f"{blatt}_{index}")
-                                vars_calc[var] = sum(opts[s] for s in sel)
-                                if sel: desc_parts.append(f"{lbl}: {','.join(sel)}")
-                            elif typ == 'berechnung':
-                                try:
-                                    env={"__builtins__":None,"math":math,"round":round,"int":int,"float":float,"max":max,"min":min}; env.update(vars_calc)
-                                    vars_calc[var] = eval(str(zeile.get('Formel','')), env)
-                                except: vars_calc[var]=0
-                            elif typ == 'preis':
-                                try:
-                                    env={"__builtins__":None,"math":math,"round":round,"int":int,"float":float,"max":max,"min":min}; env.update(vars_calc)
-                                    preis = eval(str(zeile.get('Formel','')), env)
-                                    st.subheader(f"Preis: {preis:.2f} €")
-                                    with st.expander("Debug"): st.json(vars_calc)
-                                    if st.button("In den Warenkorb", type="primary"):
-                                        mat=[]
-                                        l = vars_calc.get('L',0)
-                                        # MATERIAL LOGIK
-                                        if 'N_Bars' in vars_calc: # STABGELÄNDER (NEU!)
-                                            mat.append(f"Anzahl Stäbe: {int(vars_calc['N_Bars'])} Stk")
-                                            mat.append(f"Gesamtlänge Füllstäbe: {(int(vars_calc['N_Bars']) * vars_calc.get('H', 1.0)):.2f} m")
-                                            if 'N_Post' in vars_calc: mat.append(f"Pfosten: {int(vars_calc['N_Post'])} Stk")
-                                        
-                                        elif 'P_Glas' in vars_calc and 'N_Felder' in vars_calc: # GLAS
-                                            h=vars_calc.get('H',0.85); calc_l=max(l,1.0)
-                                            mat.append(f"Glasfläche: {(calc_l*h):.2f} m²"); mat.append(f"Handlauf: {calc_l:.2f}m")
-                                            n_k=int(vars_calc['N_Felder'])*4
-                                            if 'Ecken' in vars_calc: n_k+=int(vars_calc['Ecken'])*4
-                                            mat.append(f"Klemmen: {n_k} Stk")
-                                        
-                                        elif 'N_Spar' in vars_calc: # TERRA
-                                            mat.append(f"Dachfläche: {(l*vars_calc.get('B',0)):.2f} m²")
-                                            mat.append(f"Säulen: {int(vars_calc.get('N_Col',0))} | Sparren: {int(vars_calc.get('N_Spar',0))}")
-                                            lfm=(int(vars_calc.get('N_Col',0))*vars_calc.get('H',2.5)) + (int(vars_calc.get('N_Spar',0))*vars_calc.get('B',0)) + l
-                                            mat.append(f"Stahlfläche: {(lfm*0.4):.2f} m²")
-                                        
-                                        elif 'N_Rows' in vars_calc: # HORIZONT
-                                            mat.append(f"Füllung: {int(vars_calc['N_Rows'])} Reihen")
-                                            mat.append(f"Laufmeter: {(l*int(vars_calc['N_Rows'])):.2f} m")
-                                        
-                                        elif l>0 and 'Treppe' not in str(auswahl_system): # STANDARD
-                                            abst=1.2 if 'Edelstahl' in auswahl_system else 1.3
-                                            stps=math.ceil(l/abst)+1; mat.append(f"Steher: {stps} Stk")
-                                        
-                                        # Allgemeines
-                                        if 'H' in vars_calc and 'Treppe' in str(auswahl_system):
-                                            mat.append(f"Stufen (H/18cm): {math.ceil(vars_calc['H']/0.18)} Stk")
-                                        
-                                        st.session_state['positionen'].append({
-                                            "Beschreibung": f"{auswahl_system} | " + ",".join(desc_parts),
-                                            "Menge": 1.0, "Einzelpreis": preis, "Preis": preis,
-                                            "RefMenge": max(l,1.0), "RefEinheit": "m", "MaterialDetails": mat
-                                        })
-                                        st.success("OK")
-                                except Exception as e: st.error(f"Fehler: {e}")
+                        with laufzeit.messen("Konfigurator rendern"):
+                            for z in formular:
+                                typ, lbl, var = z.typ, z.lbl, z.var
+                                if typ == 'zahl':
+                                    val = st.number_input(lbl, value=z.default, step=1.0, key=f"{blatt}_{z.index}")
+                                    vars_calc[var] = val
+                                    if val!=0: desc_parts.append(f"{lbl}: {val}")
+                                elif typ == 'auswahl':
+                                    if z.optionen.namen:
+                                        sel = st.selectbox(lbl, z.optionen.namen, key=f"{blatt}_{z.index}")
+                                        vars_calc[var] = z.optionen.index.get(sel,0); desc_parts.append(f"{lbl}: {sel}")
+                                elif typ == 'mehrfach':
+                                    sel = st.multiselect(lbl, z.optionen.namen, key=f"{blatt}_{z.index}")
+                                    vars_calc[var] = z.optionen.summe(sel)
+                                    if sel: desc_parts.append(f"{lbl}: {','.join(sel)}")
+                                elif typ == 'berechnung':
+                                    vars_calc[var] = 0 # Platzhalter, Wert kommt aus rechner.berechne()
+                                elif typ == 'preis':
+                                    try:
+                                        with laufzeit.messen("Formeln"): vars_calc.update(rechner.berechne(vars_calc))
+                                        preis = rechner.ergebnis(var)
+                                        st.subheader(f"Preis: {preis:.2f} €")
+                                        if vars_calc.get('N_Felder') and 'B_Feld' in vars_calc:
+                                            klemmen = f", {int(vars_calc['N_Klemmen'])} Klemmen" if 'N_Klemmen' in vars_calc else ""
+                                            st.caption(f"Glasteilung: {int(vars_calc['N_Felder'])} Felder à {vars_calc['B_Feld']:.3f} m{klemmen}")
+                                            if vars_calc['B_Feld'] < glasteilung.B_MIN:
+                                                st.warning(f"Scheibe {vars_calc['B_Feld']:.3f} m schmaler als {glasteilung.B_MIN:.2f} m - Länge und Ecken prüfen")
+                                        if 'N_Stufen' in vars_calc and vars_calc.get('H', 0) > 0:
+                                            if math.isnan(vars_calc['N_Stufen']): st.warning("Keine gültige Treppengeometrie (Lauflänge, Deckenöffnung oder Lösung Nr. prüfen)")
+                                            with st.expander("📐 Treppen-Lösungen"):
+                                                st.dataframe(treppe.loesungen(vars_calc['H'], vars_calc.get('L_Lauf', 0), vars_calc.get('O_Decke', 0)).rename(index=lambda i: i + 1))
+                                        with st.expander("Debug"): st.json(vars_calc)
+                                        if st.button("In den Warenkorb", type="primary", disabled=not math.isfinite(preis)):
+                                            ANGEBOTE.position_hinzufuegen(aktives_angebot(erstellen=True), konfigurator.position(auswahl_system, desc_parts, preis, vars_calc, blatt, EXCEL_DATEI), preis)
+                                            st.success("OK")
+                                    except Exception as e: st.error(f"Fehler: {e}")
                     except Exception as e: st.error(f"Blatt Fehler: {e}")
                 
                 with c2:
                     st.info("Warenkorb")
-                    if st.session_state['positionen']:
-                        st.write(f"{len(st.session_state['positionen'])} Pos. | {sum(p['Preis'] for p in st.session_state['positionen']):.2f} €")
+                    kopf = ANGEBOTE.kopf(aktives_angebot()) if aktives_angebot() else None
+                    if kopf and kopf['anzahl']:
+                        st.write(f"{kopf['anzahl']} Pos. | {kopf['summe']:.2f} €")
 
 # --- B: WARENKORB ---
 elif menue_punkt == "🛒 Warenkorb / Abschluss":
     st.title("🛒 Warenkorb")
+    aid = aktives_angebot()
+    kopf = ANGEBOTE.kopf(aid) if aid else None
+    with st.expander("📂 Gespeicherte Angebote"):
+        c_s1, c_s2 = st.columns([3, 1])
+        suche = c_s1.text_input("Suche (Name, Ort, Email, Nr.)")
+        if c_s2.button("➕ Neues Angebot"):
+            oeffne_angebot(None); st.rerun()
+        for a in ANGEBOTE.liste(APP_KENNUNG, suche, limit=20):
+            c_a1, c_a2 = st.columns([4, 1])
+            c_a1.write(f"**Nr. {a['id']}** {a['name'] or a['titel'] or '-'} {a['ort'] or ''} | {a['anzahl']} Pos. | {a['summe']:.2f} € | {a['geaendert'][:16].replace('T', ' ')}")
+            if c_a2.button("Öffnen", key=f"oeffne_{a['id']}", disabled=a['id'] == aid):
+                oeffne_angebot(a['id']); st.rerun()
     c1, c2 = st.columns([1.2, 0.8])
     with c1:
-        st.subheader("Positionen")
-        if st.session_state['positionen']:
-            to_del = []
-            for i, p in enumerate(st.session_state['positionen']):
-                cc1, cc2, cc3, cc4 = st.columns([3, 1, 1, 0.5])
-                cc1.markdown(f"**Pos {i+1}: {p['Beschreibung'].split('|')[0]}**"); cc1.caption(p['Beschreibung'])
-                p['Menge'] = cc2.number_input("Anz", value=float(p['Menge']), step=1.0, key=f"q_{i}")
-                p['Preis'] = p['Menge'] * p['Einzelpreis']
-                cc3.write(f"{p['Preis']:.2f} €")
-                if cc4.button("X", key=f"d_{i}"): to_del.append(i)
-            for i in sorted(to_del, reverse=True): del st.session_state['positionen'][i]
-            if to_del: st.rerun()
+        st.subheader(f"Positionen (Angebot Nr. {aid})" if aid else "Positionen")
+        if kopf and kopf['anzahl']:
+            seiten = warenkorb.seiten_anzahl(kopf['anzahl'])
+            seite = st.number_input(f"Seite (von {seiten})", 1, seiten, 1, step=1, key=f"wk_seite_{seiten}") if seiten > 1 else 1
+            start, ende = warenkorb.seiten_bereich(seite, kopf['anzahl'])
+            seite_pos = ANGEBOTE.positionen(aid, start, warenkorb.SEITEN_GROESSE)
+            sichtbar = [p for _, p in seite_pos]
+            tabelle = pd.DataFrame({
+                "Pos": range(start + 1, start + len(sichtbar) + 1),
+                "Position": [p['Beschreibung'].split('|')[0].strip() for p in sichtbar],
+                "Details": [p['Beschreibung'] for p in sichtbar],
+                "Menge": [float(p['Menge']) for p in sichtbar],
+                "EP €": [p['Einzelpreis'] for p in sichtbar],
+                "Preis €": [p['Preis'] for p in sichtbar],
+                "Entfernen": [False] * len(sichtbar),
+            })
+            # Nur diese Seite wird gerendert; Änderungen gelten erst beim Übernehmen (Batch)
+            with st.form(f"wk_{st.session_state['wk_version']}_{seite}"):
+                bearbeitet = st.data_editor(
+                    tabelle, hide_index=True,
+                    disabled=["Pos", "Position", "Details", "EP €", "Preis €"],
+                    column_config={
+                        "Menge": st.column_config.NumberColumn(step=1.0, min_value=0.0),
+                        "EP €": st.column_config.NumberColumn(format="%.2f"),
+                        "Preis €": st.column_config.NumberColumn(format="%.2f"),
+                    })
+                if st.form_submit_button("Änderungen übernehmen"):
+                    ids = [pid for pid, _ in seite_pos]
+                    mengen = {pid: m for pid, m, alt in zip(ids, bearbeitet["Menge"], tabelle["Menge"]) if pd.notna(m) and m != alt}
+                    loeschen = [pid for pid, x in zip(ids, bearbeitet["Entfernen"]) if x]
+                    ANGEBOTE.positionen_batch(aid, warenkorb.mengen_aendern(seite_pos, mengen, 'Preis'), loeschen)
+                    st.session_state['wk_version'] += 1
+                    st.rerun()
             
-            total = sum(p['Preis'] for p in st.session_state['positionen'])
             st.markdown("---")
-            st.subheader(f"Summe Artikel: {total:.2f} €")
+            st.subheader(f"Summe Artikel: {kopf['summe']:.2f} €")
+
+            with st.expander("📦 Materialliste (Einkauf)"):
+                stand_wk = (aid, st.session_state['wk_version'], kopf['anzahl'], kopf['summe'])
+                ml = st.session_state.get('materialliste')
+                if st.button("Materialliste erstellen") or (ml and ml[0] != stand_wk):
+                    positionen = ANGEBOTE.laden(aid)['positionen']
+                    ml = st.session_state['materialliste'] = (stand_wk, stueckliste.materialliste(positionen),
+                                                              sum(1 for p in positionen if 'Stueckliste' not in p))
+                if ml:
+                    _, df_ml, ohne = ml
+                    if ohne: st.caption(f"{ohne} Position(en) ohne Stückliste (vor der Umstellung gespeichert)")
+                    st.dataframe(df_ml, hide_index=True)
+                    c_e1, c_e2 = st.columns(2)
+                    c_e1.download_button("⬇️ CSV", stueckliste.exportiere(df_ml, "csv"), f"materialliste_{aid}.csv", "text/csv")
+                    c_e2.download_button("⬇️ Excel", stueckliste.exportiere(df_ml), f"materialliste_{aid}.xlsx",
+                                         "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
         else: st.info("Leer")
 
     with c2:
@@ -557,6 +379,20 @@ elif menue_punkt == "🛒 Warenkorb / Abschluss":
             zk['rabatt_prozent'] = st.number_input("Rabatt % (Sichtbar)", 0.0, 50.0, float(zk.get('rabatt_prozent',0)), step=1.0)
             zk['skonto_prozent'] = st.number_input("Skonto Info %", 0.0, 10.0, float(zk.get('skonto_prozent',0)), step=1.0)
 
+        with st.expander("✂️ Zuschnitt (Fertigungsliste)"):
+            zk['zuschnitt_lager'] = sorted(st.multiselect("Stangenlängen m", sorted({3.0, 5.0, 6.0, 6.5, 7.0, 12.0, *zk['zuschnitt_lager']}),
+                                                          default=zk['zuschnitt_lager'])) or list(zuschnitt.LAGER_M)
+            zk['zuschnitt_kerf_mm'] = st.number_input("Schnittbreite mm", 0.0, 10.0, float(zk['zuschnitt_kerf_mm']), step=0.5)
+            zk['zuschnitt_optimiert'] = st.checkbox("Optimieren (bis 0,5 s)", value=bool(zk['zuschnitt_optimiert']))
+            if aid and st.button("Zuschnitt berechnen"):
+                plaene = zuschnitt.fuer_angebot(ANGEBOTE.laden(aid)['positionen'], **zuschnitt.einstellungen(zk))
+                if plaene:
+                    st.dataframe(pd.DataFrame([{"Artikel": a, "Stangen": len(p.stangen), "Netto m": round(p.netto_mm / 1000, 2),
+                                                "Verschnitt %": round(p.verschnitt_prozent, 1), "Zu lang": len(p.zu_lang)}
+                                               for a, p in plaene.items()]), hide_index=True)
+                else: st.caption("Keine Positionen mit Schnittlängen")
+        if kopf and zk != {**DEFAULT_ZK, **kopf['zusatzkosten']}: ANGEBOTE.zusatzkosten_speichern(aid, zk)
+
         st.subheader("Kunde & PDF")
         with st.form("pdf"):
             kd = st.session_state['kunden_daten']
@@ -566,16 +402,27 @@ elif menue_punkt == "🛒 Warenkorb / Abschluss":
             kd['Email'] = st.text_input("Email", kd['Email'])
             kd['Notiz'] = st.text_area("Notiz", kd['Notiz'])
             fotos = st.file_uploader("Fotos", accept_multiple_files=True)
-            if st.form_submit_button("📄 Erstellen"):
+            c_f1, c_f2 = st.columns(2)
+            erstellen = c_f1.form_submit_button("📄 Erstellen")
+            if c_f2.form_submit_button("💾 Kunde speichern") or erstellen:
+                ANGEBOTE.kunde_speichern(aktives_angebot(erstellen=True), kd)
+            if erstellen:
                 m_sum = zk['montage_mann'] * zk['montage_std'] * zk['montage_satz']
-                st.session_state['fertiges_pdf'] = create_pdf(
-                    st.session_state['positionen'], kd, fotos, m_sum, zk['kran'], 
-                    True, zk['zuschlag_prozent'], "Risiko", zk.get('zuschlag_transparent', True),
-                    zk['provision_prozent'], zk['rabatt_prozent'], zk['skonto_prozent']
-                )
-                st.session_state['fertiges_intern_pdf'] = create_internal_pdf(st.session_state['positionen'], kd, zk)
-                st.success("Fertig!")
-        
+                # Frisch aus der DB: die Session darf weiterarbeiten, während im Hintergrund gerendert wird
+                positionen = ANGEBOTE.laden(aid)['positionen'] if aid else []; kd_kopie = dict(kd); zk_kopie = dict(zk)
+                foto_daten = [f.getvalue() for f in fotos or []]
+                st.session_state['fertiges_pdf'] = st.session_state['fertiges_intern_pdf'] = None
+                st.session_state['pdf_auftrag'] = pdf_jobs.starte({
+                    "kunde": (create_pdf, (
+                        positionen, kd_kopie, foto_daten, m_sum, zk['kran'],
+                        True, zk['zuschlag_prozent'], "Risiko", zk.get('zuschlag_transparent', True),
+                        zk['provision_prozent'], zk['rabatt_prozent'], zk['skonto_prozent']
+                    ), {}),
+                    "intern": (create_internal_pdf, (positionen, kd_kopie, zk_kopie), {}),
+                })
+
+        pdf_status()
+        if st.session_state.get('pdf_fehler'): st.error(f"PDF Fehler: {st.session_state.pop('pdf_fehler')}")
         if st.session_state['fertiges_pdf']:
             c_d1, c_d2 = st.columns(2)
             c_d1.download_button("Kunde PDF", st.session_state['fertiges_pdf'], "angebot.pdf", "application/pdf")
@@ -587,10 +434,55 @@ elif menue_punkt == "🔐 Admin":
     if st.text_input("PW", type="password") == "1234":
         if st.button("Reset Excel"): 
             if generiere_neue_excel_datei(): st.success("OK")
+        store = katalog_cache.speicher(EXCEL_DATEI)
         sheets = lade_alle_blattnamen()
         if sheets:
             sh = st.selectbox("Blatt", sheets)
-            df = lade_blatt(sh)
-            new_df = st.data_editor(df, num_rows="dynamic")
+            # Basis = Stand beim Öffnen; gespeichert wird nur, was seitdem geändert wurde
+            basis = st.session_state.get('admin_basis')
+            if basis is None or basis[0] != sh: basis = st.session_state['admin_basis'] = (sh, store.blatt(sh))
+            new_df = st.data_editor(basis[1], num_rows="dynamic", key=f"admin_{sh}_{id(basis[1])}")
             if st.button("Speichern"):
-                if speichere_excel(new_df, sh): st.success("Gespeichert")
+                erg = speichere_blatt(new_df, basis[1], sh)
+                if erg is not None:
+                    del st.session_state['admin_basis']
+                    st.success(f"Gespeichert ({erg['geaendert']} geändert, {erg['neu']} neu, {erg['geloescht']} gelöscht)")
+
+        if stueckliste.BLATT not in sheets:
+            st.info(f"Kein Blatt '{stueckliste.BLATT}': es gelten die Standard-Stücklistenregeln.")
+            if st.button("📦 Stückliste-Blatt anlegen"):
+                try:
+                    store.blatt_anlegen(stueckliste.BLATT, stueckliste.standard_blatt())
+                    st.rerun()
+                except Exception as e: st.error(f"Anlegen fehlgeschlagen: {e}")
+
+        with st.expander("📥 Excel Import / Export"):
+            if store.xlsx_abweichend(EXCEL_DATEI):
+                st.warning(f"'{EXCEL_DATEI}' weicht vom Katalog ab (nicht importiert).")
+            datei = st.file_uploader("Excel-Datei", type=["xlsx"])
+            c_i1, c_i2 = st.columns(2)
+            if c_i1.button("Importieren (ersetzt alle Blätter)"):
+                try:
+                    store.importiere(datei if datei is not None else EXCEL_DATEI)
+                    st.session_state.pop('admin_basis', None)
+                    st.success("Importiert")
+                except Exception as e: st.error(f"Import fehlgeschlagen: {e}")
+            if c_i2.button("Excel erzeugen"):
+                c_i2.download_button("⬇️ katalog.xlsx", store.exportiere(), "katalog.xlsx",
+                                     "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+
+        with st.expander("⏱️ Startzeiten"):
+            st.dataframe(pd.DataFrame(startzeit.bericht()), hide_index=True)
+
+        with st.expander("📊 Laufzeiten"):
+            laufzeit.aktivieren(st.checkbox("Messung aktiv (alle Sessions)", value=laufzeit.AKTIV))
+            c_l1, c_l2 = st.columns(2)
+            for spalte, titel, statistik in ((c_l1, "Diese Session", st.session_state['laufzeit']), (c_l2, "Prozess", laufzeit.PROZESS)):
+                spalte.write(f"**{titel}**")
+                spalte.dataframe(pd.DataFrame(laufzeit.tabelle(statistik)), hide_index=True)
+            c_l3, c_l4 = st.columns(2)
+            c_l3.download_button("⬇️ JSON", laufzeit.als_json(st.session_state['laufzeit']), "laufzeiten.json", "application/json")
+            if c_l4.button("Zurücksetzen"):
+                laufzeit.PROZESS.leeren(); st.session_state['laufzeit'].leeren(); st.rerun()
+
+messung.abschliessen()
@@ -0,0 +1,233 @@
+"""Benchmarks für Formelauswertung, PDF-Erstellung, Zuschnitt und den Excel Import/Export.
+
+Ergebnisse landen als JSON, damit Läufe (Katalog-Änderung, Library-Update)
+verglichen werden können::
+
+    python benchmark.py -o bench_alt.json
+    python benchmark.py -o bench_neu.json --vergleich bench_alt.json
+    python benchmark.py -k pdf -k formel/Eigen --schnell
+"""
+import argparse
+import io
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import foto_pipeline
+import individual_excel
+import katalog_cache
+import konfigurator
+import pdf_draht
+import pdf_v8
+import zuschnitt
+from katalog_cache import EXCEL_DATEI
+
+POSITIONEN = (10, 100, 1000)
+EXCEL_ZEILEN = (100, 1000, 10000, 50000)
+KONFIGURATIONEN = 200   # Konfigurationen pro Blatt
+FOTOS = 3
+TOLERANZ = 1.20         # ab +20% Median gilt ein Fall als langsamer
+
+# ==========================================
+# 1. MESSEN
+# ==========================================
+def messe(fn, runden):
+    """Median/Min/Max über ``runden`` Läufe; bei mehreren Runden vorher ein Aufwärmlauf."""
+    if runden > 1: fn()
+    zeiten = []
+    for _ in range(runden):
+        t0 = time.perf_counter(); fn(); zeiten.append(time.perf_counter() - t0)
+    return {"median_s": statistics.median(zeiten), "min_s": min(zeiten), "max_s": max(zeiten), "runden": runden}
+
+# ==========================================
+# 2. TESTDATEN
+# ==========================================
+def startseiten_blaetter(pfad=EXCEL_DATEI):
+    start = katalog_cache.lade_katalog(pfad).blatt("Startseite")
+    return list(dict.fromkeys(start['Blattname'].astype(str).str.strip()))
+
+def zufalls_eingaben(blatt, anzahl, rnd, pfad=EXCEL_DATEI):
+    """Plausible Eingaben: Zahlen um den Default, zufällige Optionen."""
+    zeilen, _, _ = konfigurator.lade_modell(blatt, pfad)
+    eingaben = []
+    for _ in range(anzahl):
+        e = {}
+        for typ, _, var, default, opt_names, _ in zeilen:
+            if typ == 'zahl': e[var] = round(default * rnd.choice((0.5, 1, 1.5, 2)) if default else rnd.uniform(0, 10), 2)
+            elif typ == 'auswahl' and opt_names: e[var] = rnd.choice(opt_names)
+            elif typ == 'mehrfach' and opt_names: e[var] = rnd.sample(opt_names, rnd.randint(0, min(2, len(opt_names))))
+        eingaben.append(e)
+    return eingaben
+
+def draht_positionen(anzahl, rnd, pfad=EXCEL_DATEI):
+    """Echte Positionen aus dem Konfigurator, reihum über alle Blätter der Startseite."""
+    positionen, blaetter = [], startseiten_blaetter(pfad)
+    for i in range(anzahl * 20):
+        if len(positionen) == anzahl: break
+        blatt = blaetter[i % len(blaetter)]
+        try: pos = konfigurator.berechne(blatt, zufalls_eingaben(blatt, 1, rnd, pfad)[0], pfad)["Position"]
+        except Exception: continue
+        pos["Menge"] = float(rnd.randint(1, 5))
+        pos["Preis"] = pos["Menge"] * pos["Einzelpreis"]
+        positionen.append(pos)
+    return positionen
+
+def v8_positionen(anzahl, rnd):
+    return [{"titel": f"Geländer: Modell {i}", "menge_txt": f"{rnd.randint(1, 40)} lfm", "preis": rnd.uniform(200, 9000),
+             "details": [f"Option {k}: {rnd.choice(('Pulverbeschichtet', 'Verzinkt', 'Edelstahl'))}" for k in range(rnd.randint(1, 5))]}
+            for i in range(anzahl)]
+
+def fotos(anzahl, rnd):
+    """Handyfoto-große JPEGs (4000x3000)."""
+    from PIL import Image
+    ergebnis = []
+    for _ in range(anzahl):
+        basis = np.random.default_rng(rnd.randint(0, 1 << 30)).integers(0, 255, (300, 400, 3), dtype=np.uint8)
+        puffer = io.BytesIO()
+        Image.fromarray(basis).resize((4000, 3000)).save(puffer, "JPEG", quality=90)
+        ergebnis.append(puffer.getvalue())
+    return ergebnis
+
+def individual_katalog(zeilen, rnd):
+    """Synthetischer Individual-Katalog mit ``zeilen`` Excel-Zeilen (1 Produkt + 4 Optionen)."""
+    katalog = {}
+    for p in range(max(1, zeilen // 5)):
+        kat = katalog.setdefault(f"Kategorie {p % 20}", {})
+        kat[f"Produkt {p}"] = {
+            "einheit": rnd.choice(("lfm", "m2", "Stk")), "mat": round(rnd.uniform(10, 500), 2),
+            "z_fert": round(rnd.uniform(0, 5), 2), "z_mont": round(rnd.uniform(0, 5), 2),
+            "optionen": {f"Option {o}": {"p": round(rnd.uniform(0, 100), 2), "einheit": rnd.choice(("Pauschal", "pro_lfm", "pro_m2")),
+                                         "z_plus": round(rnd.uniform(0, 1), 2)} for o in range(4)}}
+    return katalog
+
+# ==========================================
+# 3. FÄLLE
+# ==========================================
+KUNDE = {"Name": "Benchmark GmbH", "Strasse": "Teststraße 1", "Ort": "4020 Linz", "Tel": "", "Email": "", "Notiz": "Benchmark"}
+ZUSATZKOSTEN = {"kran": 300.0, "montage_mann": 2, "montage_std": 8.0, "montage_satz": 65.0, "zuschlag_prozent": 5.0,
+                "zuschlag_transparent": True, "provision_prozent": 3.0, "rabatt_prozent": 2.0, "skonto_prozent": 2.0}
+
+def faelle(schnell=False, seed=1):
+    """{Name: (vorbereiten, Runden)}; ``vorbereiten()`` erzeugt die Testdaten und liefert die zu messende Funktion."""
+    rnd = random.Random(seed)
+    positionen = POSITIONEN[:1] if schnell else POSITIONEN
+    excel_zeilen = EXCEL_ZEILEN[:2] if schnell else EXCEL_ZEILEN
+    zk = ZUSATZKOSTEN
+    m_sum = zk['montage_mann'] * zk['montage_std'] * zk['montage_satz']
+    f, cache = {}, {}
+
+    def daten(schluessel, erzeuge):
+        if schluessel not in cache: cache[schluessel] = erzeuge()
+        return cache[schluessel]
+    def katalog(n): return daten(("individual", n), lambda: individual_katalog(n, rnd))
+    def xlsx(n): return daten(("xlsx", n), lambda: individual_excel.exportiere(katalog(n)))
+    def draht(n): return daten(("draht", n), lambda: draht_positionen(n, rnd))
+
+    for blatt in startseiten_blaetter():
+        def formel(blatt=blatt):
+            eingaben = daten(("formel", blatt), lambda: zufalls_eingaben(blatt, 20 if schnell else KONFIGURATIONEN, rnd))
+            return lambda: konfigurator.berechne_batch(blatt, eingaben)
+        f[f"formel/{blatt}"] = (formel, 3)
+
+    for n in positionen:
+        runden = 3 if n < 1000 else 1
+        for mit_fotos in (False, True):
+            def kunde(n=n, mit_fotos=mit_fotos):
+                pos, bilder = draht(n), daten("fotos", lambda: fotos(FOTOS, rnd)) if mit_fotos else []
+                def lauf():
+                    foto_pipeline.cache_leeren() # Fotos jedes Mal neu dekodieren/verkleinern
+                    pdf_draht.create_pdf(pos, KUNDE, bilder, m_sum, zk['kran'], True, zk['zuschlag_prozent'], "Risiko",
+                                         True, zk['provision_prozent'], zk['rabatt_prozent'], zk['skonto_prozent'])
+                return lauf
+            f[f"pdf/draht_kunde/{n}{'+fotos' if mit_fotos else ''}"] = (kunde, runden)
+        def intern(n=n):
+            pos = draht(n)
+            return lambda: pdf_draht.create_internal_pdf(pos, KUNDE, zk)
+        def v8(n=n):
+            pos = daten(("v8", n), lambda: v8_positionen(n, rnd))
+            return lambda: pdf_v8.create_pdf(pos)
+        f[f"pdf/draht_intern/{n}"] = (intern, runden)
+        f[f"pdf/v8/{n}"] = (v8, runden)
+        for optimiert in (False, True):
+            def schnitt(n=n, optimiert=optimiert):
+                pos = draht(n)
+                return lambda: zuschnitt.fuer_angebot(pos, optimiert=optimiert)
+            f[f"zuschnitt/{'optimiert' if optimiert else 'ffd'}/{n}"] = (schnitt, runden)
+
+    for n in excel_zeilen:
+        runden = 3 if n <= 1000 else 1
+        def export(n=n):
+            kat = katalog(n)
+            def lauf():
+                individual_excel.cache_leeren() # jedes Mal neu schreiben
+                return individual_excel.exportiere(kat)
+            return lauf
+        def rundreise(n=n):
+            kat, daten_xlsx = katalog(n), xlsx(n)
+            def lauf():
+                neu = individual_excel.importiere(io.BytesIO(daten_xlsx)).katalog
+                if neu != kat: raise AssertionError(f"Excel Rundreise {n}: Daten weichen ab")
+            return lauf
+        f[f"excel/export/{n}"] = (export, runden)
+        f[f"excel/import/{n}"] = (rundreise, runden)
+    return f
+
+# ==========================================
+# 4. AUSWERTUNG
+# ==========================================
+def meta():
+    import fpdf, openpyxl
+    return {"zeit": datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+            "plattform": platform.platform(), "pandas": pd.__version__, "numpy": np.__version__,
+            "openpyxl": openpyxl.__version__, "fpdf": getattr(fpdf, "FPDF_VERSION", "?"),
+            "katalog_version": katalog_cache.speicher().version()}
+
+def vergleiche(alt, neu, toleranz=TOLERANZ):
+    """[(Name, alt_s, neu_s, Faktor)] für gemeinsame Fälle; Faktor > toleranz = langsamer."""
+    zeilen = []
+    for name, e in neu["ergebnisse"].items():
+        a = alt["ergebnisse"].get(name)
+        if a is None or "median_s" not in a or "median_s" not in e: continue
+        zeilen.append((name, a["median_s"], e["median_s"], e["median_s"] / a["median_s"] if a["median_s"] else float("inf")))
+    return zeilen
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmarks (Formeln, PDFs, Excel) als JSON")
+    ap.add_argument("-o", "--ausgabe", default="benchmark.json")
+    ap.add_argument("-k", "--filter", action="append", default=[], help="nur Fälle, deren Name dies enthält")
+    ap.add_argument("--schnell", action="store_true", help="nur die kleinsten Größen")
+    ap.add_argument("--vergleich", help="früheres JSON; Exit-Code 1 bei Verschlechterung")
+    ap.add_argument("--toleranz", type=float, default=TOLERANZ)
+    args = ap.parse_args(argv)
+
+    ergebnisse = {}
+    for name, (vorbereiten, runden) in faelle(args.schnell).items():
+        if args.filter and not any(k in name for k in args.filter): continue
+        try: ergebnisse[name] = messe(vorbereiten(), runden)
+        except Exception as e: ergebnisse[name] = {"fehler": f"{type(e).__name__}: {e}"}
+        e = ergebnisse[name]
+        print(f"{name:45s} {e['median_s'] * 1000:10.1f} ms" if "median_s" in e else f"{name:45s} FEHLER {e['fehler']}", flush=True)
+
+    lauf = {"meta": meta(), "ergebnisse": ergebnisse}
+    with open(args.ausgabe, "w", encoding="utf-8") as f: json.dump(lauf, f, indent=2, ensure_ascii=False)
+    print(f"{len(ergebnisse)} Fälle -> {args.ausgabe}")
+
+    if args.vergleich:
+        with open(args.vergleich, encoding="utf-8") as f: alt = json.load(f)
+        langsamer = 0
+        for name, a, n, faktor in vergleiche(alt, lauf, args.toleranz):
+            markierung = " <-- langsamer" if faktor > args.toleranz else ""
+            langsamer += bool(markierung)
+            print(f"{name:45s} {a * 1000:10.1f} -> {n * 1000:10.1f} ms  x{faktor:.2f}{markierung}")
+        return 1 if langsamer else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
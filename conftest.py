@@ -0,0 +1 @@
+"""pytest: Module liegen im Projektordner (ohne Paket), daher diesen Ordner in sys.path."""
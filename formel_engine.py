@@ -0,0 +1,218 @@
+"""Formel-Engine: 'berechnung'/'preis' Formeln einmal prüfen und kompilieren."""
+import ast
+import math
+
+import pandas as pd
+
+import glasteilung
+import treppe
+
+ERLAUBTE_NAMEN = {"math": math, "round": round, "int": int, "float": float, "max": max, "min": min,
+                  **glasteilung.FORMEL_FUNKTIONEN, **treppe.FORMEL_FUNKTIONEN}
+FORMEL_TYPEN = ("berechnung", "preis")
+
+# Vorgefertigter Namespace - wird nie verändert, Variablen kommen als locals dazu
+NAMESPACE = {"__builtins__": None, **ERLAUBTE_NAMEN}
+
+_ERLAUBTE_KNOTEN = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Compare, ast.IfExp,
+    ast.Call, ast.Name, ast.Load, ast.Constant, ast.Attribute, ast.keyword,
+    ast.operator, ast.unaryop, ast.boolop, ast.cmpop,
+)
+
+class FormelFehler(ValueError):
+    pass
+
+# ==========================================
+# 1. EINZELNE FORMEL
+# ==========================================
+def formel_namen(baum):
+    """Alle Variablennamen, die eine Formel liest (ohne math & Co)."""
+    return {n.id for n in ast.walk(baum) if isinstance(n, ast.Name) and n.id not in ERLAUBTE_NAMEN}
+
+def pruefe_formel(text, variablen):
+    """Parst eine Formel und prüft sie gegen die erlaubten Namen. Liefert den AST."""
+    text = str(text).strip()
+    if not text or text.lower() == "nan": raise FormelFehler("Formel fehlt")
+    try: baum = ast.parse(text, mode="eval")
+    except SyntaxError as e: raise FormelFehler(f"Syntaxfehler: {e.msg}") from None
+
+    for knoten in ast.walk(baum):
+        if not isinstance(knoten, _ERLAUBTE_KNOTEN):
+            raise FormelFehler(f"Nicht erlaubt: {type(knoten).__name__}")
+        if isinstance(knoten, ast.Attribute):
+            if not (isinstance(knoten.value, ast.Name) and knoten.value.id == "math") \
+                    or knoten.attr.startswith("_") or not hasattr(math, knoten.attr):
+                raise FormelFehler(f"Nicht erlaubt: .{knoten.attr}")
+        elif isinstance(knoten, ast.Call):
+            if isinstance(knoten.func, ast.Name) and knoten.func.id not in ERLAUBTE_NAMEN:
+                raise FormelFehler(f"Unbekannte Funktion: {knoten.func.id}")
+        elif isinstance(knoten, ast.Name) and knoten.id not in ERLAUBTE_NAMEN and knoten.id not in variablen:
+            raise FormelFehler(f"Unbekannte Variable: {knoten.id}")
+    return baum
+
+def kompiliere_formel(text, variablen):
+    return compile(pruefe_formel(text, variablen), "<formel>", "eval")
+
+def auswerten(code, werte):
+    return eval(code, NAMESPACE, werte)
+
+# ==========================================
+# 2. GANZES BLATT (inkl. Abhängigkeitsgraph)
+# ==========================================
+EINGABE_TYPEN = ("zahl", "auswahl", "mehrfach")
+
+class KompiliertesBlatt:
+    """Kompilierte Formeln eines Konfigurator-Blatts, Schlüssel = DataFrame-Index.
+
+    ``reihenfolge`` ist die topologische Reihenfolge der Formelzeilen
+    (Eingaben -> berechnung -> preis), ``nachfolger`` ordnet jedem Namen die
+    Formelzeilen zu, die bei einer Änderung neu berechnet werden müssen.
+    """
+
+    def __init__(self, codes, fehler, variablen, eingaben=(), zeilen=None, reihenfolge=(), nachfolger=None):
+        self.codes = codes
+        self.fehler = fehler
+        self.variablen = variablen
+        self.eingaben = list(eingaben)
+        self.zeilen = zeilen or {}
+        self.reihenfolge = list(reihenfolge)
+        self.nachfolger = nachfolger or {}
+
+    def berechne(self, index, werte):
+        code = self.codes.get(index)
+        if code is None: raise FormelFehler(self.fehler.get(index, "Formel fehlt"))
+        return auswerten(code, werte)
+
+def _graph(zeilen, liest, fehler):
+    """Topologische Sortierung der Formelzeilen; Zyklen landen in ``fehler``."""
+    pos = {idx: i for i, idx in enumerate(zeilen)}
+    erzeuger = {var: idx for idx, (typ, var) in zeilen.items()}
+    vorgaenger = {idx: {erzeuger[n] for n in liest.get(idx, ()) if n in erzeuger and erzeuger[n] != idx}
+                  for idx in zeilen}
+    for idx in zeilen:
+        if zeilen[idx][1] in liest.get(idx, ()): fehler[idx] = f"{zeilen[idx][1]}: Zyklus (bezieht sich auf sich selbst)"
+    kinder = {idx: [] for idx in zeilen}
+    for idx, vs in vorgaenger.items():
+        for v in vs: kinder[v].append(idx)
+
+    offen = {idx: len(vs) for idx, vs in vorgaenger.items()}
+    bereit = sorted((idx for idx, n in offen.items() if n == 0), key=pos.get)
+    reihenfolge = []
+    while bereit:
+        idx = bereit.pop(0)
+        reihenfolge.append(idx)
+        for k in kinder[idx]:
+            offen[k] -= 1
+            if offen[k] == 0: bereit.append(k)
+        bereit.sort(key=pos.get)
+    # Zyklische Zeilen bleiben (mit Fehler) am Ende, damit sie 0 bzw. einen Fehler liefern
+    for idx in zeilen:
+        if idx not in reihenfolge:
+            fehler.setdefault(idx, f"{zeilen[idx][1]}: Zyklus in den Formeln")
+            reihenfolge.append(idx)
+    return reihenfolge, kinder
+
+def kompiliere_blatt(df_config):
+    codes, fehler = {}, {}
+    if df_config is None or df_config.empty or 'Typ' not in df_config.columns:
+        return KompiliertesBlatt(codes, fehler, set())
+
+    variablen, eingaben, zeilen, liest = set(), [], {}, {}
+    for index, zeile in df_config.iterrows():
+        if pd.isna(zeile.get('Typ')): continue
+        typ = str(zeile.get('Typ', '')).strip().lower()
+        var = str(zeile.get('Variable', '')).strip()
+        variablen.add(var)
+        if typ in EINGABE_TYPEN: eingaben.append(var)
+        elif typ in FORMEL_TYPEN: zeilen[index] = (typ, var)
+
+    for index, zeile in df_config.iterrows():
+        if index not in zeilen: continue
+        var = zeilen[index][1]
+        try:
+            baum = pruefe_formel(zeile.get('Formel', ''), variablen)
+            liest[index] = formel_namen(baum)
+            codes[index] = compile(baum, "<formel>", "eval")
+        except FormelFehler as e: fehler[index] = f"{var}: {e}"
+
+    reihenfolge, kinder = _graph(zeilen, liest, fehler)
+    for idx in fehler: codes.pop(idx, None)
+
+    # Nachfolger je Name: alle abhängigen Formelzeilen in Rechenreihenfolge
+    rang = {idx: i for i, idx in enumerate(reihenfolge)}
+    direkt = {}
+    for idx, namen in liest.items():
+        for n in namen: direkt.setdefault(n, set()).add(idx)
+    nachfolger = {}
+    for name, start in direkt.items():
+        gesehen, stapel = set(), list(start)
+        while stapel:
+            idx = stapel.pop()
+            if idx in gesehen: continue
+            gesehen.add(idx)
+            stapel.extend(kinder.get(idx, ()))
+        nachfolger[name] = sorted((i for i in gesehen if i in rang), key=rang.get)
+    return KompiliertesBlatt(codes, fehler, variablen, eingaben, zeilen, reihenfolge, nachfolger)
+
+# ==========================================
+# 3. INKREMENTELLE NEUBERECHNUNG
+# ==========================================
+_FEHLT = object()
+
+class Neuberechnung:
+    """Hält die letzten Eingaben/Ergebnisse eines Blatts (eine Instanz pro Session).
+
+    Bei jedem Aufruf von ``berechne()`` werden nur die Formelzeilen neu
+    ausgewertet, die von einer geänderten Eingabe abhängen.
+    """
+
+    def __init__(self, blatt):
+        self.blatt = blatt
+        self.eingaben = None
+        self.werte = {}
+        self.fehler = {}
+
+    def _rechne(self, indizes, env):
+        for idx in indizes:
+            typ, var = self.blatt.zeilen[idx]
+            try:
+                wert = self.blatt.berechne(idx, env)
+                self.fehler.pop(var, None)
+            except Exception as e:
+                wert = 0
+                self.fehler[var] = e
+            self.werte[var] = wert
+            env[var] = wert
+
+    def berechne(self, werte):
+        """Liefert Eingaben + 'berechnung'-Werte (ohne 'preis') für ``vars_calc``."""
+        neu = {n: werte[n] for n in self.blatt.eingaben if n in werte}
+        if self.eingaben is None:
+            schmutzig = self.blatt.reihenfolge
+        else:
+            geaendert = [n for n in set(neu) | set(self.eingaben)
+                         if neu.get(n, _FEHLT) != self.eingaben.get(n, _FEHLT)]
+            betroffen = set()
+            for n in geaendert: betroffen.update(self.blatt.nachfolger.get(n, ()))
+            schmutzig = [idx for idx in self.blatt.reihenfolge if idx in betroffen]
+        self.eingaben = neu
+
+        if schmutzig:
+            env = dict(neu)
+            env.update((v, w) for v, w in self.werte.items() if v not in neu)
+            # Fehlende Eingaben dürfen nicht durch alte Werte ersetzt werden
+            for n in self.blatt.eingaben:
+                if n not in neu: env.pop(n, None)
+            self._rechne(schmutzig, env)
+
+        ergebnis = dict(neu)
+        for idx in self.blatt.reihenfolge:
+            typ, var = self.blatt.zeilen[idx]
+            if typ == 'berechnung': ergebnis[var] = self.werte.get(var, 0)
+        return ergebnis
+
+    def ergebnis(self, var):
+        """Wert einer 'preis'-Zeile; wirft den Fehler der letzten Auswertung weiter."""
+        if var in self.fehler: raise self.fehler[var]
+        return self.werte.get(var, 0)
@@ -0,0 +1,88 @@
+"""Baustellenfotos für die PDFs: einmal dekodieren, drehen, verkleinern, als JPEG cachen."""
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+DRUCKBREITE_MM = 180
+FOTO_DPI = 150
+JPEG_QUALITAET = 80
+CACHE_GROESSE = 128
+
+class FotoJpeg:
+    __slots__ = ("hash", "breite", "hoehe", "daten")
+
+    def __init__(self, hash, breite, hoehe, daten):
+        self.hash = hash
+        self.breite = breite
+        self.hoehe = hoehe
+        self.daten = daten
+
+_CACHE = OrderedDict()
+_LOCK = threading.Lock()
+
+def _rohdaten(foto):
+    # Streamlit UploadedFile, BytesIO oder bytes
+    if isinstance(foto, (bytes, bytearray)): return bytes(foto)
+    if hasattr(foto, "getvalue"): return foto.getvalue()
+    return foto.read()
+
+def _verarbeite(daten, breite_mm, dpi, qualitaet):
+    from PIL import Image, ImageOps # erst beim ersten Foto laden
+    with Image.open(io.BytesIO(daten)) as img:
+        img = ImageOps.exif_transpose(img)
+        if img.mode != "RGB":
+            if img.mode in ("RGBA", "LA", "P"):
+                img = img.convert("RGBA")
+                hintergrund = Image.new("RGB", img.size, (255, 255, 255))
+                hintergrund.paste(img, mask=img.split()[-1])
+                img = hintergrund
+            else: img = img.convert("RGB")
+        max_px = int(round(breite_mm / 25.4 * dpi))
+        if img.width > max_px:
+            img = img.resize((max_px, max(1, round(img.height * max_px / img.width))), Image.LANCZOS)
+        puffer = io.BytesIO()
+        img.save(puffer, "JPEG", quality=qualitaet, optimize=True)
+        return img.width, img.height, puffer.getvalue()
+
+def bereite_foto(foto, breite_mm=DRUCKBREITE_MM, dpi=FOTO_DPI, qualitaet=JPEG_QUALITAET):
+    """Liefert ein druckfertiges FotoJpeg (gecacht über den Inhalts-Hash)."""
+    daten = _rohdaten(foto)
+    h = hashlib.sha1(daten).hexdigest()
+    key = (h, breite_mm, dpi, qualitaet)
+    with _LOCK:
+        if key in _CACHE:
+            _CACHE.move_to_end(key)
+            return _CACHE[key]
+    breite, hoehe, jpeg = _verarbeite(daten, breite_mm, dpi, qualitaet)
+    ergebnis = FotoJpeg(h, breite, hoehe, jpeg)
+    with _LOCK:
+        _CACHE[key] = ergebnis
+        while len(_CACHE) > CACHE_GROESSE: _CACHE.popitem(last=False)
+    return ergebnis
+
+def bereite_fotos(fotos, breite_mm=DRUCKBREITE_MM, dpi=FOTO_DPI, qualitaet=JPEG_QUALITAET):
+    """Alle Fotos vorbereiten, doppelte (gleicher Inhalt) nur einmal. Defekte werden übersprungen."""
+    ergebnis, gesehen = [], set()
+    for f in fotos or []:
+        try: foto = bereite_foto(f, breite_mm, dpi, qualitaet)
+        except Exception: continue
+        if foto.hash in gesehen: continue
+        gesehen.add(foto.hash)
+        ergebnis.append(foto)
+    return ergebnis
+
+def cache_leeren():
+    with _LOCK: _CACHE.clear()
+
+def pdf_bild(pdf, foto, x=None, y=None, w=0, h=0):
+    """FotoJpeg ohne Temp-Datei in ein FPDF-Dokument setzen.
+
+    FPDF 1.7 liest Bilder nur über Dateinamen; wir tragen die JPEG-Daten
+    direkt in ``pdf.images`` ein, der Schlüssel ist der Inhalts-Hash.
+    """
+    name = f"foto_{foto.hash}.jpg"
+    if name not in pdf.images:
+        pdf.images[name] = {'w': foto.breite, 'h': foto.hoehe, 'cs': 'DeviceRGB', 'bpc': 8,
+                            'f': 'DCTDecode', 'data': foto.daten, 'i': len(pdf.images) + 1}
+    pdf.image(name, x=x, y=y, w=w, h=h)
@@ -0,0 +1,85 @@
+"""Feldteilung für Glasgeländer (Eigen_Glasgel, Brix_Gel_Glas), ohne Streamlit.
+
+Jeder Lauf zwischen zwei Ecken wird in möglichst wenige gleich breite Felder
+geteilt: n = kleinste Anzahl mit Scheibenbreite <= ``b_max`` bei Fuge
+``spalt`` an beiden Enden und zwischen den Scheiben. Weniger Felder heißt auch
+weniger Klemmen und Steher (Ecksteher gehören zu beiden Läufen).
+
+In den Katalog-Formeln stehen die Ergebnisse als Funktionen zur Verfügung::
+
+    N_Felder   = glas_felder(max(L, 1.0), Ecken)
+    B_Feld     = glas_breite(max(L, 1.0), Ecken, 1.3, 0.3, 0.02)
+    N_Klemmen  = glas_klemmen(max(L, 1.0), Ecken)
+
+Die Blätter kennen nur Gesamtlänge und Eckenzahl, die Läufe gelten daher als
+gleich lang; mit ``teile()`` lassen sich auch echte Teillängen rechnen.
+"""
+import functools
+import math
+
+B_MAX = 1.3            # m, breiteste Scheibe
+B_MIN = 0.3            # m, schmalste Scheibe
+SPALT = 0.02           # m, Fuge zwischen Scheiben bzw. zum Steher
+KLEMMEN_JE_FELD = 4
+KLEMMEN_JE_ECKE = 4
+
+class Teilung:
+    """Ergebnis je Lauf: Felder und Scheibenbreite (m); Summen über alle Läufe."""
+    __slots__ = ("laeufe", "felder", "breiten", "klemmen", "warnungen")
+
+    def __init__(self, laeufe, felder, breiten, klemmen, warnungen):
+        self.laeufe = laeufe; self.felder = felder; self.breiten = breiten
+        self.klemmen = klemmen; self.warnungen = warnungen
+
+    @property
+    def anzahl(self): return sum(self.felder)
+
+    @property
+    def steher(self): return self.anzahl + 1 if self.anzahl else 0
+
+    @property
+    def breite_max(self): return max(self.breiten, default=0.0)
+
+    @property
+    def glasflaeche_je_m(self):
+        """Scheibenbreite gesamt (m) - mal Höhe = Glasfläche."""
+        return sum(n * b for n, b in zip(self.felder, self.breiten))
+
+def teile(laeufe, b_max=B_MAX, b_min=B_MIN, spalt=SPALT, klemmen_je_feld=KLEMMEN_JE_FELD, klemmen_je_ecke=KLEMMEN_JE_ECKE):
+    """Teilung für Läufe ``laeufe`` (m, in Reihenfolge, Ecke zwischen je zwei Läufen)."""
+    if b_max <= 0 or spalt < 0: raise ValueError("b_max muss > 0 und spalt >= 0 sein")
+    laeufe = tuple(float(l) for l in laeufe if l > 0)
+    felder, breiten, warnungen = [], [], []
+    for nr, l in enumerate(laeufe, 1):
+        # (l - (n+1)*spalt) / n <= b_max  <=>  n >= (l - spalt) / (b_max + spalt)
+        n = max(1, math.ceil((l - spalt) / (b_max + spalt) - 1e-9))
+        b = (l - (n + 1) * spalt) / n
+        if b < b_min: warnungen.append(f"Lauf {nr}: Scheibe {b:.3f} m schmaler als {b_min:.2f} m")
+        felder.append(n); breiten.append(round(b, 4))
+    ecken = max(0, len(laeufe) - 1)
+    klemmen = sum(felder) * klemmen_je_feld + ecken * klemmen_je_ecke
+    return Teilung(laeufe, tuple(felder), tuple(breiten), klemmen, warnungen)
+
+@functools.lru_cache(maxsize=4096)
+def teilung(L, ecken=0, b_max=B_MAX, b_min=B_MIN, spalt=SPALT):
+    """Gesamtlänge ``L`` mit ``ecken`` Ecken -> Teilung gleich langer Läufe (gecacht)."""
+    laeufe = max(0, int(ecken)) + 1
+    return teile((L / laeufe,) * laeufe if L > 0 else (), b_max, b_min, spalt)
+
+# ==========================================
+# FUNKTIONEN FÜR KATALOG-FORMELN
+# ==========================================
+def glas_felder(L, ecken=0, b_max=B_MAX, b_min=B_MIN, spalt=SPALT):
+    return teilung(L, ecken, b_max, b_min, spalt).anzahl
+
+def glas_breite(L, ecken=0, b_max=B_MAX, b_min=B_MIN, spalt=SPALT):
+    return teilung(L, ecken, b_max, b_min, spalt).breite_max
+
+def glas_steher(L, ecken=0, b_max=B_MAX, b_min=B_MIN, spalt=SPALT):
+    return teilung(L, ecken, b_max, b_min, spalt).steher
+
+def glas_klemmen(L, ecken=0, b_max=B_MAX, b_min=B_MIN, spalt=SPALT):
+    return teilung(L, ecken, b_max, b_min, spalt).klemmen
+
+FORMEL_FUNKTIONEN = {"glas_felder": glas_felder, "glas_breite": glas_breite,
+                     "glas_steher": glas_steher, "glas_klemmen": glas_klemmen}
@@ -0,0 +1,173 @@
+"""Excel Import/Export des 'Individual'-Katalogs von app.py, ohne Streamlit."""
+import io
+import threading
+from collections import OrderedDict
+
+import openpyxl
+import pandas as pd
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+
+import katalog_json
+import laufzeit
+
+PRODUKT_SPALTEN = ["Kategorie", "Produkt", "Einheit", "Materialpreis", "Zeit_Fertigung", "Zeit_Montage"]
+OPTION_SPALTEN = ["Produkt", "Option", "Preis", "Einheit_Typ", "Zeit_Plus"]
+OPTION_EINHEITEN = ("Pauschal", "pro_lfm", "pro_m2")
+CACHE_GROESSE = 4       # fertige Exporte (je Katalog-Stand)
+
+# ==========================================
+# 1. EXPORT
+# ==========================================
+_EXPORTE = OrderedDict()  # Schlüssel -> (XLSX-Bytes, Katalog; hält ihn für Identitäts-Schlüssel fest)
+_LOCK = threading.Lock()
+
+def _produkte(indiv_data):
+    for cat, models in indiv_data.items():
+        for mod_name, mod_data in models.items():
+            yield (cat, mod_name, mod_data.get('einheit', 'Stk'), mod_data.get('mat', 0),
+                   mod_data.get('z_fert', 0), mod_data.get('z_mont', 0))
+
+def _optionen(indiv_data):
+    for models in indiv_data.values():
+        for mod_name, mod_data in models.items():
+            for opt_name, opt_data in (mod_data.get('optionen') or {}).items():
+                yield (mod_name, opt_name, opt_data.get('p', 0), opt_data.get('einheit', 'Pauschal'), # Pauschal, pro_lfm, pro_m2
+                       opt_data.get('z_plus', 0))
+
+def _schreibe(indiv_data):
+    # write_only: Zeilen gehen direkt in die Datei, ohne Listen/DataFrames des ganzen Katalogs
+    wb = openpyxl.Workbook(write_only=True)
+    fett = Font(bold=True)
+    for name, spalten, zeilen in (('Produkte', PRODUKT_SPALTEN, _produkte(indiv_data)),
+                                  ('Optionen', OPTION_SPALTEN, _optionen(indiv_data))):
+        ws = wb.create_sheet(name)
+        kopf = []
+        for sp in spalten:
+            zelle = WriteOnlyCell(ws, sp); zelle.font = fett
+            kopf.append(zelle)
+        ws.append(kopf)
+        for z in zeilen: ws.append(z)
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+@laufzeit.gemessen("Excel Export")
+def exportiere(indiv_data):
+    """Individual-Katalog -> XLSX-Bytes mit den Blättern 'Produkte' und 'Optionen' (gecacht je Katalog-Stand)."""
+    key = katalog_json.schluessel(indiv_data)
+    with _LOCK:
+        if key in _EXPORTE:
+            _EXPORTE.move_to_end(key)
+            return _EXPORTE[key][0]
+    daten = _schreibe(indiv_data)
+    with _LOCK:
+        _EXPORTE[key] = (daten, indiv_data)
+        while len(_EXPORTE) > CACHE_GROESSE: _EXPORTE.popitem(last=False)
+    return daten
+
+def cache_leeren():
+    with _LOCK: _EXPORTE.clear()
+
+# ==========================================
+# 2. IMPORT
+# ==========================================
+class Import:
+    """Ergebnis von importiere(): neuer Katalog, Anzahl übernommener Zeilen und Prüfbericht.
+
+    ``probleme`` hat eine Zeile je auffälliger Excel-Zeile (Blatt, Zeile, Problem, Wert);
+    bis auf Produkte in mehreren Kategorien werden diese Zeilen nicht übernommen.
+    """
+    __slots__ = ("katalog", "produkte", "optionen", "probleme")
+
+    def __init__(self, katalog, produkte, optionen, probleme):
+        self.katalog = katalog; self.produkte = produkte; self.optionen = optionen; self.probleme = probleme
+
+    @property
+    def ok(self): return self.probleme.empty
+
+def _blaetter(excel_file, blaetter):
+    """{Blatt: DataFrame} der benötigten Spalten; Index = Zeilennummer in Excel (Kopfzeile = 1)."""
+    # Arbeitsmappe einmal öffnen und nur Werte lesen - read_excel wandelt jede Zelle noch einmal um
+    wb = openpyxl.load_workbook(excel_file, read_only=True, data_only=True)
+    try:
+        ergebnis = {}
+        for name, spalten in blaetter.items():
+            if name not in wb.sheetnames: raise ValueError(f"Blatt '{name}' fehlt")
+            zeilen = wb[name].iter_rows(values_only=True)
+            kopf = [str(k).strip() if k is not None else "" for k in next(zeilen, ())]
+            fehlt = [c for c in spalten if c not in kopf]
+            if fehlt: raise ValueError(f"Blatt '{name}': Spalte(n) {', '.join(fehlt)} fehlen")
+            df = pd.DataFrame(zeilen, columns=kopf)
+            df = df[spalten].dropna(how="all").copy() # formatierte Leerzeilen am Ende
+            df.index = df.index + 2
+            ergebnis[name] = df
+        return ergebnis
+    finally:
+        wb.close()
+
+def _text(spalte):
+    return spalte.astype("string").str.strip().fillna("")
+
+class _Bericht:
+    def __init__(self): self.teile = []
+
+    def melde(self, blatt, df, maske, problem, spalte):
+        if maske.any():
+            self.teile.append(pd.DataFrame({"Blatt": blatt, "Zeile": df.index[maske], "Problem": problem,
+                                            "Wert": df.loc[maske, spalte].astype(str).to_numpy()}))
+
+    def pruefe(self, blatt, df, namen, zahlen):
+        """Leere Namen und keine Zahlen melden; liefert die Maske der gültigen Zeilen (Zahlen umgewandelt, leer = 0)."""
+        gueltig = pd.Series(True, index=df.index)
+        for sp in namen:
+            df[sp] = _text(df[sp])
+            leer = df[sp].eq("") & gueltig
+            self.melde(blatt, df, leer, f"{sp} fehlt", sp); gueltig &= ~leer
+        for sp in zahlen:
+            werte = pd.to_numeric(df[sp], errors="coerce")
+            falsch = werte.isna() & df[sp].notna() & gueltig
+            self.melde(blatt, df, falsch, f"{sp} ist keine Zahl", sp); gueltig &= ~falsch
+            df[sp] = werte.fillna(0.0).astype(float)
+        return gueltig
+
+    def tabelle(self):
+        if not self.teile: return pd.DataFrame(columns=["Blatt", "Zeile", "Problem", "Wert"])
+        return pd.concat(self.teile, ignore_index=True).sort_values(["Blatt", "Zeile"], ascending=[False, True], ignore_index=True)
+
+@laufzeit.gemessen("Excel Import")
+def importiere(excel_file):
+    """XLSX (Pfad oder Datei-Objekt) -> Import (Katalog + Prüfbericht), noch ohne zu speichern."""
+    blaetter = _blaetter(excel_file, {'Produkte': PRODUKT_SPALTEN, 'Optionen': OPTION_SPALTEN})
+    df_p, df_o = blaetter['Produkte'], blaetter['Optionen']
+    bericht = _Bericht()
+
+    # Produkte: gültige Zeilen, bei gleicher Kategorie + Produkt gilt die letzte
+    df_p = df_p[bericht.pruefe('Produkte', df_p, ["Kategorie", "Produkt"], ["Materialpreis", "Zeit_Fertigung", "Zeit_Montage"])]
+    df_p["Einheit"] = _text(df_p["Einheit"]).replace("", "Stk")
+    doppelt = df_p.duplicated(["Kategorie", "Produkt"], keep="last")
+    bericht.melde('Produkte', df_p, doppelt, "Produkt doppelt (letzte Zeile gilt)", "Produkt")
+    df_p = df_p[~doppelt]
+    mehrfach = df_p.duplicated("Produkt", keep=False)
+    bericht.melde('Produkte', df_p, mehrfach, "Produkt in mehreren Kategorien (Optionen gelten für alle)", "Kategorie")
+
+    # Optionen: gültige Zeilen, Einheit bekannt, Produkt vorhanden, bei gleichem Produkt + Option gilt die letzte
+    df_o = df_o[bericht.pruefe('Optionen', df_o, ["Produkt", "Option"], ["Preis", "Zeit_Plus"])]
+    df_o["Einheit_Typ"] = _text(df_o["Einheit_Typ"]).replace("", "Pauschal")
+    unbekannt = ~df_o["Einheit_Typ"].isin(OPTION_EINHEITEN)
+    bericht.melde('Optionen', df_o, unbekannt, f"Einheit_Typ nicht {'/'.join(OPTION_EINHEITEN)}", "Einheit_Typ")
+    df_o = df_o[~unbekannt]
+    verwaist = ~df_o["Produkt"].isin(df_p["Produkt"])
+    bericht.melde('Optionen', df_o, verwaist, "Produkt nicht gefunden", "Produkt")
+    df_o = df_o[~verwaist]
+    doppelt = df_o.duplicated(["Produkt", "Option"], keep="last")
+    bericht.melde('Optionen', df_o, doppelt, "Option doppelt (letzte Zeile gilt)", "Option")
+    df_o = df_o[~doppelt].merge(df_p[["Kategorie", "Produkt"]], on="Produkt") # Optionen -> Kategorie über Produkt
+
+    new_indiv = {}
+    for cat, prod, einheit, mat, z_fert, z_mont in zip(*(df_p[c].tolist() for c in PRODUKT_SPALTEN)):
+        new_indiv.setdefault(cat, {})[prod] = {"einheit": einheit, "mat": mat, "z_fert": z_fert, "z_mont": z_mont, "optionen": {}}
+    for cat, prod, opt, p, einheit, z_plus in zip(*(df_o[c].tolist() for c in ["Kategorie"] + OPTION_SPALTEN)):
+        new_indiv[cat][prod]["optionen"][opt] = {"p": p, "einheit": einheit, "z_plus": z_plus}
+
+    return Import(new_indiv, len(df_p), len(df_o), bericht.tabelle())
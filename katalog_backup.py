@@ -0,0 +1,128 @@
+"""Sicherungen des app.py-Katalogs (katalog.json) mit Verlauf, ohne Streamlit.
+
+Jeder Abschnitt (individual, matten, ...) wird als kanonisches JSON gzip-
+komprimiert unter seinem SHA-256 abgelegt (``objekte/ab/abcd….json.gz``); eine
+Sicherung ist nur eine Zeile in ``verlauf.jsonl`` mit Zeit, Notiz und den
+Hashes ihrer Abschnitte. Unveränderte Abschnitte kosten daher keinen Platz,
+eine unveränderte Datenbank ergibt keine neue Sicherung. Objekte ändern sich
+nie und werden beim Lesen gecacht.
+
+``unterschiede()`` vergleicht zwei Stände Feld für Feld (für Vorschau vor dem
+Wiederherstellen und den Preisverlauf).
+"""
+import functools
+import gzip
+import hashlib
+import json
+import os
+from collections.abc import Mapping
+from datetime import datetime
+
+import katalog_json
+
+ORDNER = "katalog_backups"
+ZAHLEN_PRODUKT = ("mat", "z_fert", "z_mont")
+ZAHLEN_OPTION = ("p", "z_plus")
+
+def _kanonisch(daten):
+    return json.dumps(katalog_json.auftauen(daten), sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode()
+
+def als_json(daten):
+    """Ganzer Katalog als lesbares JSON (für den Download, erst beim Klick erzeugt)."""
+    return json.dumps(katalog_json.auftauen(daten), indent=2, ensure_ascii=False)
+
+def lies_datei(datei):
+    """Hochgeladenes Backup (.json oder .json.gz) -> dict."""
+    roh = datei.read() if hasattr(datei, "read") else datei
+    if roh[:2] == b"\x1f\x8b": roh = gzip.decompress(roh)
+    return json.loads(roh)
+
+# ==========================================
+# 1. ABLAGE
+# ==========================================
+def _objekt_pfad(ordner, h): return os.path.join(ordner, "objekte", h[:2], f"{h}.json.gz")
+
+def _schreibe_atomar(pfad, daten):
+    os.makedirs(os.path.dirname(pfad), exist_ok=True)
+    tmp = f"{pfad}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f: f.write(daten)
+    os.replace(tmp, pfad)
+
+def _lege_ab(ordner, daten):
+    roh = _kanonisch(daten)
+    h = hashlib.sha256(roh).hexdigest()
+    pfad = _objekt_pfad(ordner, h)
+    if not os.path.exists(pfad): _schreibe_atomar(pfad, gzip.compress(roh, 9, mtime=0))
+    return h
+
+@functools.lru_cache(maxsize=64)
+def _objekt(ordner, h):
+    with open(_objekt_pfad(ordner, h), "rb") as f: return katalog_json.einfrieren(json.loads(gzip.decompress(f.read())))
+
+def verlauf(ordner=ORDNER):
+    """Alle Sicherungen, neueste zuerst: [{id, zeit, notiz, abschnitte: {Name: Hash}}]."""
+    try:
+        with open(os.path.join(ordner, "verlauf.jsonl"), encoding="utf-8") as f:
+            eintraege = [json.loads(z) for z in f if z.strip()]
+    except OSError: return []
+    return eintraege[::-1]
+
+def sichern(daten, notiz="", ordner=ORDNER):
+    """Neue Sicherung von ``daten`` (dict/Sitzung); gleicher Inhalt wie die letzte -> diese zurück."""
+    os.makedirs(ordner, exist_ok=True)
+    abschnitte = {k: _lege_ab(ordner, v) for k, v in sorted(daten.items())}
+    sid = hashlib.sha256(json.dumps(abschnitte, sort_keys=True).encode()).hexdigest()[:16]
+    letzte = verlauf(ordner)[:1]
+    if letzte and letzte[0]["id"] == sid: return letzte[0]
+    eintrag = {"id": sid, "zeit": datetime.now().isoformat(timespec="seconds"), "notiz": notiz, "abschnitte": abschnitte}
+    with open(os.path.join(ordner, "verlauf.jsonl"), "a", encoding="utf-8") as f:
+        f.write(json.dumps(eintrag, ensure_ascii=False) + "\n")
+    return eintrag
+
+def lade(sid, ordner=ORDNER):
+    """Katalog einer Sicherung (eingefroren) oder KeyError."""
+    for e in verlauf(ordner):
+        if e["id"] == sid: return {k: _objekt(ordner, h) for k, h in e["abschnitte"].items()}
+    raise KeyError(f"Sicherung {sid} nicht gefunden")
+
+def groesse(ordner=ORDNER):
+    """Belegter Platz in Bytes."""
+    return sum(os.path.getsize(os.path.join(w, d)) for w, _, dateien in os.walk(ordner) for d in dateien)
+
+# ==========================================
+# 2. PRÜFEN & VERGLEICHEN
+# ==========================================
+def pruefe(daten, standard):
+    """Fehler eines Backups gegenüber der Struktur von ``standard`` (leer = in Ordnung)."""
+    if not isinstance(daten, Mapping): return ["Backup ist kein JSON-Objekt"]
+    fehler = [] # unbekannte Abschnitte (z.B. 'systems') bleiben erlaubt
+    for k, v in daten.items():
+        if k in standard and not isinstance(v, type(standard[k])):
+            fehler.append(f"Abschnitt '{k}' hat das falsche Format")
+    for kat, modelle in (daten.get("individual") if isinstance(daten.get("individual"), Mapping) else {}).items():
+        for mod, m in (modelle if isinstance(modelle, Mapping) else {}).items():
+            if not isinstance(m, Mapping):
+                fehler.append(f"individual › {kat} › {mod}: kein Produkt"); continue
+            fehler += [f"individual › {kat} › {mod}: '{z}' ist keine Zahl" for z in ZAHLEN_PRODUKT
+                       if not isinstance(m.get(z, 0), (int, float))]
+            for opt, o in (m.get("optionen") or {}).items():
+                if not isinstance(o, Mapping) or not all(isinstance(o.get(z, 0), (int, float)) for z in ZAHLEN_OPTION):
+                    fehler.append(f"individual › {kat} › {mod} › {opt}: ungültige Option")
+    return fehler
+
+def unterschiede(alt, neu, pfad=()):
+    """[{Pfad, Änderung, Alt, Neu}] zwischen zwei Ständen; neue/entfernte Teilbäume als eine Zeile."""
+    zeilen = []
+    for k in list(dict.fromkeys([*alt, *neu])):
+        p = pfad + (str(k),)
+        if k not in alt: zeilen.append({"Pfad": " › ".join(p), "Änderung": "neu", "Alt": None, "Neu": _kurz(neu[k])})
+        elif k not in neu: zeilen.append({"Pfad": " › ".join(p), "Änderung": "entfernt", "Alt": _kurz(alt[k]), "Neu": None})
+        elif isinstance(alt[k], Mapping) and isinstance(neu[k], Mapping):
+            if alt[k] is not neu[k]: zeilen += unterschiede(alt[k], neu[k], p)
+        elif katalog_json.auftauen(alt[k]) != katalog_json.auftauen(neu[k]):
+            zeilen.append({"Pfad": " › ".join(p), "Änderung": "geändert", "Alt": _kurz(alt[k]), "Neu": _kurz(neu[k])})
+    return zeilen
+
+def _kurz(wert):
+    if isinstance(wert, Mapping): return f"{len(wert)} Einträge"
+    return str(katalog_json.auftauen(wert))
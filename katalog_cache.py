@@ -0,0 +1,121 @@
+"""Prozessweiter Cache für den Katalog (alle Sessions teilen sich einen Stand).
+
+Die Daten liegen im KatalogStore (katalog.db neben katalog.xlsx); die Excel-Datei
+wird nur beim ersten Start importiert. Passt katalog.snapshot zur Store-Version,
+werden die bereinigten Blätter direkt daraus geladen (siehe katalog_snapshot.py).
+"""
+import os
+import threading
+
+import pandas as pd
+
+import katalog_snapshot
+import katalog_store
+import laufzeit
+
+EXCEL_DATEI = "katalog.xlsx"
+
+# ==========================================
+# 1. HELFER
+# ==========================================
+def safe_float(value):
+    if pd.isna(value): return 0.0
+    s_val = str(value).replace(',', '.').strip()
+    try: return float(s_val)
+    except: return 0.0
+
+def clean_df_columns(df):
+    if df is None: return pd.DataFrame()
+    if not df.empty:
+        df.columns = df.columns.str.strip()
+        rename_map = {'Formel / Info': 'Formel', 'Formel/Info': 'Formel', 'Info': 'Formel'}
+        df.rename(columns=rename_map, inplace=True)
+        if 'Variable' in df.columns:
+            df = df.dropna(subset=['Variable'])
+    return df
+
+# ==========================================
+# 2. KATALOG-STAND
+# ==========================================
+class KatalogStand:
+    """Alle Blätter einer Katalog-Version, bereits bereinigt.
+
+    Die DataFrames werden zwischen Sessions geteilt und dürfen nicht
+    verändert werden (für Bearbeitung vorher ``.copy()``).
+    """
+
+    def __init__(self, pfad, version, blaetter):
+        self.pfad = pfad
+        self.version = version
+        self.blaetter = blaetter
+        self._abgeleitet = {}
+        self._lock = threading.Lock()
+
+    @property
+    def blattnamen(self):
+        return list(self.blaetter.keys())
+
+    def blatt(self, name):
+        return self.blaetter.get(str(name).strip())
+
+    def abgeleitet(self, schluessel, erzeuge):
+        """Cacht aus diesem Stand abgeleitete Objekte (z.B. kompilierte Formeln).
+
+        Sie verfallen automatisch mit dem Stand, wenn sich der Katalog ändert.
+        """
+        try: return self._abgeleitet[schluessel]
+        except KeyError: pass
+        with self._lock:
+            if schluessel not in self._abgeleitet:
+                self._abgeleitet[schluessel] = erzeuge()
+            return self._abgeleitet[schluessel]
+
+# ==========================================
+# 3. SPEICHER & CACHE
+# ==========================================
+def db_pfad(pfad=EXCEL_DATEI):
+    return os.path.splitext(os.path.abspath(pfad))[0] + ".db"
+
+def speicher(pfad=EXCEL_DATEI):
+    """KatalogStore zu ``pfad``; ist er leer, wird die Excel-Datei (falls vorhanden) importiert."""
+    store = katalog_store.store(db_pfad(pfad))
+    if store.leer() and os.path.exists(pfad): store.importiere(os.path.abspath(pfad), nur_wenn_leer=True)
+    return store
+
+_STAENDE = {}
+_LOCK = threading.Lock()
+
+def lade_katalog(pfad=EXCEL_DATEI):
+    """Liefert den aktuellen KatalogStand oder None, falls kein Katalog existiert.
+
+    Neu aufgebaut wird nur, wenn sich die Version im Store geändert hat - aus dem
+    Snapshot, falls er zu dieser Version gehört, sonst aus dem Store (danach wird
+    der Snapshot für den nächsten Start erneuert).
+    """
+    pfad = os.path.abspath(pfad)
+    store = speicher(pfad)
+    if store.leer(): return None
+    version = store.version()
+
+    stand = _STAENDE.get(pfad)
+    if stand is not None and stand.version == version: return stand
+
+    with _LOCK:
+        stand = _STAENDE.get(pfad)
+        if stand is not None and stand.version == version: return stand
+        snapshot, kennung = katalog_snapshot.snapshot_pfad(pfad), store.kennung()
+        with laufzeit.messen("Katalog Snapshot"): blaetter = katalog_snapshot.lade_blaetter(snapshot, kennung, version)
+        if blaetter is None:
+            with laufzeit.messen("Katalog aufbauen"):
+                blaetter = {name: clean_df_columns(df) for name, df in store.blaetter().items()}
+            try: katalog_snapshot.schreibe_blaetter(snapshot, kennung, version, blaetter)
+            except OSError: pass # z.B. schreibgeschütztes Verzeichnis: dann eben ohne Snapshot
+        stand = KatalogStand(pfad, version, blaetter)
+        _STAENDE[pfad] = stand
+        return stand
+
+def invalidieren(pfad=None):
+    """Verwirft den Cache (z.B. nach einem Import)."""
+    with _LOCK:
+        if pfad is None: _STAENDE.clear()
+        else: _STAENDE.pop(os.path.abspath(pfad), None)
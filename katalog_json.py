@@ -0,0 +1,119 @@
+"""Prozessweit geteilter, schreibgeschützter Katalog für app.py (katalog.json + Standardwerte).
+
+Alle Sessions lesen denselben eingefrorenen Stand (verschachtelte
+``MappingProxyType``/Tupel); er wird einmal pro Dateiversion geladen und mit
+den Standardwerten ergänzt. Eine Session bekommt nur dann eigene Daten, wenn
+ein Admin einen Abschnitt ändert oder ein Backup wiederherstellt: diese
+Abschnitte liegen in der Überlagerung der ``Sitzung``, alles andere kommt
+weiter aus dem geteilten Stand (Copy-on-Write).
+"""
+import hashlib
+import json
+import os
+import threading
+from collections.abc import Mapping
+from types import MappingProxyType
+
+import katalog_snapshot
+
+JSON_DATEI = "katalog.json"
+
+def einfrieren(wert):
+    """dict -> MappingProxyType, list -> tuple (rekursiv)."""
+    if isinstance(wert, Mapping): return MappingProxyType({k: einfrieren(v) for k, v in wert.items()})
+    if isinstance(wert, (list, tuple)): return tuple(einfrieren(v) for v in wert)
+    return wert
+
+def auftauen(wert):
+    """Eingefrorene Daten wieder als normale dicts/Listen (für JSON, Bearbeitung)."""
+    if isinstance(wert, Mapping): return {k: auftauen(v) for k, v in wert.items()}
+    if isinstance(wert, tuple): return [auftauen(v) for v in wert]
+    return wert
+
+def schluessel(daten):
+    """Cache-Schlüssel für Katalogdaten (ein Abschnitt oder dict von Abschnitten).
+
+    Eingefrorene Daten ändern sich nie, dafür genügt die Identität - der Cache
+    muss sie dann aber selbst festhalten. Sonst SHA-1 über den JSON-Inhalt.
+    """
+    if isinstance(daten, MappingProxyType): return id(daten)
+    if isinstance(daten, Mapping) and all(isinstance(v, MappingProxyType) for v in daten.values()):
+        return tuple((k, id(v)) for k, v in daten.items())
+    return hashlib.sha1(json.dumps(daten, sort_keys=True, default=str).encode()).hexdigest()
+
+# ==========================================
+# 1. GETEILTER STAND
+# ==========================================
+_STAENDE = {}   # Pfad -> (Dateisignatur, eingefrorener Katalog)
+_LOCK = threading.Lock()
+
+def _signatur(pfad):
+    try:
+        st = os.stat(pfad)
+        return st.st_size, st.st_mtime_ns
+    except OSError: return None
+
+def _lade(pfad, standard):
+    daten = None
+    if os.path.exists(pfad):
+        try: daten = katalog_snapshot.lade_json(pfad) # aus katalog.snapshot, solange die Datei unverändert ist
+        except Exception: daten = None
+    if not isinstance(daten, dict): return standard()
+    for k, v in standard().items(): daten.setdefault(k, v) # fehlende Abschnitte ergänzen
+    return daten
+
+def geteilt(standard, pfad=JSON_DATEI):
+    """Eingefrorener Katalog; neu geladen nur, wenn sich die Datei ändert."""
+    sig = _signatur(pfad)
+    eintrag = _STAENDE.get(pfad)
+    if eintrag is not None and eintrag[0] == sig: return eintrag[1]
+    with _LOCK:
+        eintrag = _STAENDE.get(pfad)
+        if eintrag is None or eintrag[0] != sig:
+            eintrag = _STAENDE[pfad] = (sig, einfrieren(_lade(pfad, standard)))
+        return eintrag[1]
+
+def speichern(daten, pfad=JSON_DATEI):
+    """Schreibt den ganzen Katalog; alle Sessions sehen ab dem nächsten Lauf den neuen Stand."""
+    tmp = f"{pfad}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f: json.dump(auftauen(daten), f, indent=2, ensure_ascii=False)
+    os.replace(tmp, pfad)
+
+# ==========================================
+# 2. SESSION-SICHT
+# ==========================================
+class Sitzung(Mapping):
+    """Katalog einer Session: eigene Abschnitte (Überlagerung), sonst der geteilte Stand.
+
+    Liegt in ``st.session_state.db``; ohne Admin-Änderungen ist sie nur ein
+    leeres dict plus Verweis auf die Standardwerte.
+    """
+    __slots__ = ("standard", "pfad", "ueberlagerung")
+
+    def __init__(self, standard, pfad=JSON_DATEI):
+        self.standard = standard
+        self.pfad = pfad
+        self.ueberlagerung = {}
+
+    @property
+    def basis(self): return geteilt(self.standard, self.pfad)
+
+    def __getitem__(self, abschnitt):
+        if abschnitt in self.ueberlagerung: return self.ueberlagerung[abschnitt]
+        return self.basis[abschnitt]
+
+    def __iter__(self): return iter(dict.fromkeys([*self.basis, *self.ueberlagerung]))
+
+    def __len__(self): return len(set(self.basis) | set(self.ueberlagerung))
+
+    def setze(self, abschnitt, daten):
+        """Einen Abschnitt nur für diese Session ersetzen."""
+        self.ueberlagerung[abschnitt] = einfrieren(daten)
+
+    def wiederherstellen(self, daten):
+        """Backup nur für diese Session einspielen; Abschnitte, die es nicht enthält, bleiben geteilt."""
+        self.ueberlagerung = {k: einfrieren(v) for k, v in daten.items()}
+
+    def verwerfen(self):
+        """Zurück zum geteilten Stand."""
+        self.ueberlagerung = {}
@@ -0,0 +1,173 @@
+"""Kompilierter Katalog-Snapshot für einen schnellen Start beider Apps.
+
+Offline prüfen und kompilieren (z.B. nach einem Katalog-Update)::
+
+    python katalog_snapshot.py                       # katalog.db (+ katalog.json) -> katalog.snapshot
+    python katalog_snapshot.py --xlsx katalog.xlsx   # vorher die Excel-Datei importieren
+    python katalog_snapshot.py --nur-pruefen
+
+Der Snapshot ist ein Pickle mit getrennten Abschnitten: die bereinigten Blätter
+aus katalog.db (gültig für genau eine Store-Version) und die geparste
+katalog.json (gültig, solange sich die Datei nicht ändert). Nur Tabellendaten
+werden übernommen, Excel-Reste wie benannte LAMBDA/ARRAYTEXT-Formeln nicht.
+Ist ein Abschnitt veraltet, laden die Apps wie bisher aus katalog.db bzw. der
+JSON-Datei.
+"""
+import argparse
+import json
+import math
+import os
+import pickle
+import sys
+from datetime import datetime
+
+FORMAT = 1
+PFLICHT_SPALTEN = ("Typ", "Bezeichnung", "Variable", "Optionen", "Formel")
+STARTSEITE_SPALTEN = ("Kategorie", "System", "Blattname")
+TYPEN = ("zahl", "auswahl", "mehrfach", "berechnung", "preis")
+
+def snapshot_pfad(pfad):
+    """``katalog.xlsx`` -> ``katalog.snapshot`` (im selben Ordner)."""
+    return os.path.splitext(os.path.abspath(pfad))[0] + ".snapshot"
+
+# ==========================================
+# 1. LESEN & SCHREIBEN
+# ==========================================
+def _lese(pfad):
+    """{Abschnitt: Pickle-Bytes} oder {} (fehlt, kaputt oder anderes Format)."""
+    try:
+        with open(pfad, "rb") as f: daten = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError): return {}
+    if not isinstance(daten, dict) or daten.get("format") != FORMAT: return {}
+    return daten["abschnitte"]
+
+def _schreibe(pfad, name, inhalt):
+    # Abschnitte bleiben Bytes: app.py kann die JSON-Daten lesen, ohne pandas zu laden
+    abschnitte = dict(_lese(pfad))
+    abschnitte[name] = pickle.dumps(inhalt, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp = f"{pfad}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump({"format": FORMAT, "erzeugt": datetime.now().isoformat(timespec="seconds"), "abschnitte": abschnitte}, f,
+                    protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, pfad)
+
+def lade_blaetter(pfad, kennung, version):
+    """Bereinigte Blätter aus dem Snapshot oder None, falls er nicht zu dieser Store-Version gehört."""
+    roh = _lese(pfad).get("katalog")
+    if roh is None: return None
+    katalog = pickle.loads(roh)
+    if katalog["kennung"] != kennung or katalog["version"] != version: return None
+    return katalog["blaetter"]
+
+def schreibe_blaetter(pfad, kennung, version, blaetter):
+    _schreibe(pfad, "katalog", {"kennung": kennung, "version": version, "blaetter": blaetter})
+
+def _signatur(json_pfad):
+    st = os.stat(json_pfad)
+    return st.st_size, st.st_mtime_ns
+
+def lade_json(json_pfad):
+    """Inhalt von ``json_pfad`` - aus dem Snapshot, wenn die Datei seitdem unverändert ist."""
+    roh = _lese(snapshot_pfad(json_pfad)).get("json")
+    if roh is not None:
+        eintrag = pickle.loads(roh)
+        if eintrag["signatur"] == _signatur(json_pfad): return eintrag["daten"]
+    with open(json_pfad, "r", encoding="utf-8") as f: return json.load(f)
+
+def schreibe_json(json_pfad, daten):
+    _schreibe(snapshot_pfad(json_pfad), "json", {"signatur": _signatur(json_pfad), "daten": daten})
+
+# ==========================================
+# 2. PRÜFEN
+# ==========================================
+def _zahl(wert):
+    try: return math.isfinite(float(str(wert).strip()))
+    except ValueError: return False
+
+def pruefe_blaetter(blaetter):
+    """[(Blatt, Meldung)] für Startseite und alle Konfigurator-Blätter (bereinigte DataFrames)."""
+    import pandas as pd
+    import formel_engine
+    import konfigurator
+    import stueckliste
+    fehler = []
+    start = blaetter.get("Startseite")
+    if start is None: return [("Startseite", "Blatt fehlt")]
+    fehlend = [s for s in STARTSEITE_SPALTEN if s not in start.columns]
+    if fehlend: return [("Startseite", f"Spalten fehlen: {', '.join(fehlend)}")]
+
+    for name in dict.fromkeys(start['Blattname'].dropna().astype(str).str.strip()):
+        df = blaetter.get(name)
+        if df is None:
+            fehler.append(("Startseite", f"Blatt '{name}' fehlt")); continue
+        fehlend = [s for s in PFLICHT_SPALTEN if s not in df.columns]
+        if fehlend:
+            fehler.append((name, f"Spalten fehlen: {', '.join(fehlend)}")); continue
+        variablen = set()
+        for _, zeile in df.iterrows():
+            if pd.isna(zeile['Typ']): continue
+            typ, var = str(zeile['Typ']).strip().lower(), str(zeile['Variable']).strip()
+            ort = var or f"'{zeile['Bezeichnung']}'"
+            if typ not in TYPEN: fehler.append((name, f"{ort}: unbekannter Typ '{zeile['Typ']}'"))
+            if not var.isidentifier(): fehler.append((name, f"{ort}: Variable ist kein gültiger Name"))
+            elif var in variablen: fehler.append((name, f"{ort}: Variable doppelt"))
+            variablen.add(var)
+        # Optionen/Standardwerte genau so, wie die Apps sie lesen
+        fehler += [(name, m) for m in konfigurator.formular(df).fehler.values()]
+        fehler += [(name, m) for m in formel_engine.kompiliere_blatt(df).fehler.values()]
+        variablen = set(df['Variable'].dropna().astype(str).str.strip())
+        fehler += [(stueckliste.BLATT, f"{name}: {m}")
+                   for m in stueckliste.kompiliere(blaetter.get(stueckliste.BLATT), name, variablen)[1].values()]
+    return fehler
+
+def pruefe_json(daten):
+    """[(Bereich, Meldung)] für katalog.json (nur der Individual-Katalog hat ein festes Schema)."""
+    if not isinstance(daten, dict): return [("katalog.json", "kein Objekt")]
+    fehler = []
+    for kat, modelle in (daten.get("individual") or {}).items():
+        for modell, m in modelle.items():
+            ort = f"individual/{kat}/{modell}"
+            fehler += [(ort, f"'{k}' ist keine Zahl") for k in ("mat", "z_fert", "z_mont") if not _zahl(m.get(k, 0))]
+            for opt, o in (m.get("optionen") or {}).items():
+                fehler += [(f"{ort}/{opt}", f"'{k}' ist keine Zahl") for k in ("p", "z_plus") if not _zahl(o.get(k, 0))]
+    return fehler
+
+# ==========================================
+# 3. KOMMANDOZEILE
+# ==========================================
+def main(argv=None):
+    import katalog_cache
+    ap = argparse.ArgumentParser(description="Katalog prüfen und als Snapshot kompilieren")
+    ap.add_argument("--katalog", default=katalog_cache.EXCEL_DATEI, help="Excel-Datei, neben der katalog.db liegt")
+    ap.add_argument("--xlsx", help="diese Excel-Datei vorher importieren (ersetzt alle Blätter in katalog.db)")
+    ap.add_argument("--json", default="katalog.json", help="Katalog von app.py")
+    ap.add_argument("--nur-pruefen", action="store_true")
+    ap.add_argument("--erzwingen", action="store_true", help="Snapshot trotz Fehlern schreiben")
+    args = ap.parse_args(argv)
+
+    store = katalog_cache.speicher(args.katalog)
+    if args.xlsx: store.importiere(args.xlsx)
+    if store.xlsx_abweichend(args.katalog):
+        print(f"Hinweis: '{args.katalog}' weicht von katalog.db ab (kompiliert wird katalog.db, Import mit --xlsx)")
+    kennung, version = store.kennung(), store.version()
+    blaetter = {name: katalog_cache.clean_df_columns(df) for name, df in store.blaetter().items()}
+    fehler = pruefe_blaetter(blaetter)
+    daten = None
+    if os.path.exists(args.json):
+        try:
+            with open(args.json, encoding="utf-8") as f: daten = json.load(f)
+        except ValueError as e: fehler.append((args.json, f"kein gültiges JSON: {e}"))
+        else: fehler += pruefe_json(daten)
+
+    for ort, meldung in fehler: print(f"FEHLER {ort}: {meldung}")
+    print(f"{len(blaetter)} Blätter (Version {version}), {len(fehler)} Fehler")
+    if args.nur_pruefen or (fehler and not args.erzwingen): return 1 if fehler else 0
+
+    ziel = snapshot_pfad(args.katalog)
+    schreibe_blaetter(ziel, kennung, version, blaetter)
+    if daten is not None: schreibe_json(args.json, daten) # landet bei gleichem Namen in derselben Datei
+    print(f"Snapshot -> {ziel}")
+    return 1 if fehler else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""Transaktionaler Katalogspeicher (SQLite) für den Admin-Editor.
+
+Jede Tabellenzeile ist ein Datensatz mit fester ID; Speichern schreibt nur die
+geänderten Zeilen. katalog.xlsx ist nur noch Import-/Exportformat.
+"""
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+import laufzeit
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (schluessel TEXT PRIMARY KEY, wert TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS blaetter (
+    name TEXT PRIMARY KEY,
+    pos INTEGER NOT NULL,
+    spalten TEXT NOT NULL,
+    naechste_id INTEGER NOT NULL  -- Zeilen-IDs werden nie wiederverwendet
+);
+CREATE TABLE IF NOT EXISTS zeilen (
+    blatt TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    pos INTEGER NOT NULL,
+    werte TEXT NOT NULL,
+    PRIMARY KEY (blatt, id)
+);
+CREATE INDEX IF NOT EXISTS ix_zeilen_blatt_pos ON zeilen(blatt, pos);
+"""
+
+class KatalogKonflikt(RuntimeError):
+    """Blatt wurde inzwischen gelöscht, umbenannt oder schon angelegt."""
+
+def _zelle(v):
+    if v is None or (pd.api.types.is_scalar(v) and pd.isna(v)): return None
+    return v.item() if hasattr(v, "item") else v
+
+def _zeile(df_zeile, spalten):
+    return {s: _zelle(v) for s, v in zip(spalten, df_zeile)}
+
+def _als_df(spalten, ids, zeilen):
+    df = pd.DataFrame([[z.get(s) for s in spalten] for z in zeilen], columns=spalten, index=pd.Index(ids, dtype="int64"))
+    # gleiche NaN-Darstellung wie pd.read_excel
+    for s in df.columns:
+        if df[s].dtype == object: df[s] = df[s].where(df[s].notna(), np.nan)
+    return df
+
+def _xlsx_bytes(quelle):
+    # Pfad, Bytes oder Streamlit UploadedFile
+    if isinstance(quelle, (bytes, bytearray)): return bytes(quelle)
+    if hasattr(quelle, "getvalue"): return quelle.getvalue()
+    with open(quelle, "rb") as f: return f.read()
+
+class KatalogStore:
+    def __init__(self, pfad):
+        self.pfad = os.path.abspath(pfad)
+        self._lokal = threading.local()
+        self._con().executescript(_SCHEMA)
+        # Kennung der Datenbankdatei: Versionen zweier Dateien sind sonst nicht unterscheidbar
+        self._con().execute("INSERT OR IGNORE INTO meta VALUES ('kennung', ?)", (uuid.uuid4().hex,))
+
+    def _con(self):
+        con = getattr(self._lokal, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.pfad, timeout=10, isolation_level=None)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            self._lokal.con = con
+        return con
+
+    @contextmanager
+    def _tx(self):
+        con = self._con()
+        con.execute("BEGIN IMMEDIATE")
+        try: yield con
+        except BaseException:
+            con.execute("ROLLBACK")
+            raise
+        con.execute("COMMIT")
+
+    def _meta(self, schluessel, standard=None):
+        r = self._con().execute("SELECT wert FROM meta WHERE schluessel=?", (schluessel,)).fetchone()
+        return r[0] if r else standard
+
+    @staticmethod
+    def _neue_version(con):
+        con.execute("INSERT INTO meta VALUES ('version', '1') "
+                    "ON CONFLICT(schluessel) DO UPDATE SET wert = CAST(wert AS INTEGER) + 1")
+
+    # ==========================================
+    # LESEN
+    # ==========================================
+    def version(self):
+        """Zähler, der bei jeder Änderung hochgeht (auch über Prozesse hinweg)."""
+        return int(self._meta("version", 0))
+
+    def kennung(self):
+        return self._meta("kennung")
+
+    def leer(self):
+        return self._con().execute("SELECT 1 FROM blaetter LIMIT 1").fetchone() is None
+
+    def blattnamen(self):
+        return [r[0] for r in self._con().execute("SELECT name FROM blaetter ORDER BY pos")]
+
+    def blatt(self, name):
+        """Blatt wie in der Excel-Datei (Index = Zeilen-ID) oder None."""
+        con = self._con()
+        r = con.execute("SELECT spalten FROM blaetter WHERE name=?", (name,)).fetchone()
+        if r is None: return None
+        zeilen = con.execute("SELECT id, werte FROM zeilen WHERE blatt=? ORDER BY pos", (name,)).fetchall()
+        return _als_df(json.loads(r[0]), [i for i, _ in zeilen], [json.loads(w) for _, w in zeilen])
+
+    def blaetter(self):
+        """{Name: DataFrame} aller Blätter - ein konsistenter Lesevorgang."""
+        con = self._con()
+        con.execute("BEGIN")
+        try:
+            kopf = con.execute("SELECT name, spalten FROM blaetter ORDER BY pos").fetchall()
+            zeilen = {name: ([], []) for name, _ in kopf}
+            for blatt, i, w in con.execute("SELECT blatt, id, werte FROM zeilen ORDER BY blatt, pos"):
+                if blatt in zeilen:
+                    zeilen[blatt][0].append(i); zeilen[blatt][1].append(json.loads(w))
+        finally: con.execute("COMMIT")
+        return {name: _als_df(json.loads(spalten), *zeilen[name]) for name, spalten in kopf}
+
+    # ==========================================
+    # SCHREIBEN
+    # ==========================================
+    def speichere_blatt(self, name, neu, basis):
+        """Übernimmt die Änderungen ``basis`` -> ``neu`` als Zeilen-Deltas.
+
+        ``basis`` ist der Stand, den der Editor geladen hat (Index = Zeilen-ID).
+        Nur Zeilen, die der Bearbeiter tatsächlich geändert hat, werden
+        geschrieben - gleichzeitige Änderungen anderer Zeilen bleiben erhalten.
+        Liefert {"neu", "geaendert", "geloescht"}.
+        """
+        spalten = [str(s) for s in neu.columns]
+        alt = {i: _zeile(z, spalten) for i, z in zip(basis.index, basis.reindex(columns=neu.columns).itertuples(index=False))}
+        geaendert, neue, gesehen = {}, [], set()
+        for i, z in zip(neu.index, neu.itertuples(index=False)):
+            werte = _zeile(z, spalten)
+            if i in alt and i not in gesehen:
+                gesehen.add(i)
+                if werte != alt[i]: geaendert[int(i)] = werte
+            else: neue.append(werte)
+        geloescht = [int(i) for i in alt if i not in gesehen]
+        statistik = {"neu": len(neue), "geaendert": len(geaendert), "geloescht": len(geloescht)}
+        spalten_geaendert = spalten != [str(s) for s in basis.columns]
+        if not (neue or geaendert or geloescht or spalten_geaendert): return statistik
+
+        with self._tx() as con:
+            if con.execute("SELECT 1 FROM blaetter WHERE name=?", (name,)).fetchone() is None:
+                raise KatalogKonflikt(f"Blatt '{name}' existiert nicht mehr")
+            if spalten_geaendert:
+                con.execute("UPDATE blaetter SET spalten=? WHERE name=?", (json.dumps(spalten, ensure_ascii=False), name))
+            for i, werte in geaendert.items():
+                # Zeile vom Bearbeiter geändert: nur die Spalten übernehmen, die er geändert hat
+                r = con.execute("SELECT werte FROM zeilen WHERE blatt=? AND id=?", (name, i)).fetchone()
+                if r is None: continue # inzwischen gelöscht
+                aktuell = json.loads(r[0])
+                aktuell.update({s: v for s, v in werte.items() if v != alt[i].get(s)})
+                con.execute("UPDATE zeilen SET werte=? WHERE blatt=? AND id=?",
+                            (json.dumps(aktuell, ensure_ascii=False, default=str), name, i))
+            con.executemany("DELETE FROM zeilen WHERE blatt=? AND id=?", [(name, i) for i in geloescht])
+            if neue:
+                id_0 = con.execute("SELECT naechste_id FROM blaetter WHERE name=?", (name,)).fetchone()[0]
+                pos_0 = con.execute("SELECT COALESCE(MAX(pos), -1) + 1 FROM zeilen WHERE blatt=?", (name,)).fetchone()[0]
+                con.executemany("INSERT INTO zeilen VALUES (?,?,?,?)",
+                                [(name, id_0 + k, pos_0 + k, json.dumps(w, ensure_ascii=False, default=str))
+                                 for k, w in enumerate(neue)])
+                con.execute("UPDATE blaetter SET naechste_id=? WHERE name=?", (id_0 + len(neue), name))
+            self._neue_version(con)
+        return statistik
+
+    def blatt_anlegen(self, name, df):
+        """Hängt ein neues Blatt an (z.B. die Stückliste-Regeln)."""
+        spalten = [str(s) for s in df.columns]
+        with self._tx() as con:
+            if con.execute("SELECT 1 FROM blaetter WHERE name=?", (name,)).fetchone():
+                raise KatalogKonflikt(f"Blatt '{name}' existiert bereits")
+            pos = con.execute("SELECT COALESCE(MAX(pos), -1) + 1 FROM blaetter").fetchone()[0]
+            con.execute("INSERT INTO blaetter VALUES (?,?,?,?)", (name, pos, json.dumps(spalten, ensure_ascii=False), len(df)))
+            con.executemany("INSERT INTO zeilen VALUES (?,?,?,?)",
+                            [(name, i, i, json.dumps(_zeile(z, spalten), ensure_ascii=False, default=str))
+                             for i, z in enumerate(df.itertuples(index=False))])
+            self._neue_version(con)
+
+    @laufzeit.gemessen("Excel Import")
+    def importiere(self, quelle, nur_wenn_leer=False):
+        """Ersetzt den ganzen Katalog durch eine Excel-Datei (Pfad, Bytes oder Datei-Objekt)."""
+        daten = _xlsx_bytes(quelle)
+        roh = pd.read_excel(io.BytesIO(daten), sheet_name=None, engine="openpyxl")
+        with self._tx() as con:
+            if nur_wenn_leer and con.execute("SELECT 1 FROM blaetter LIMIT 1").fetchone(): return False
+            con.execute("DELETE FROM zeilen"); con.execute("DELETE FROM blaetter")
+            for pos, (name, df) in enumerate(roh.items()):
+                spalten = [str(s) for s in df.columns]
+                con.execute("INSERT INTO blaetter VALUES (?,?,?,?)", (name, pos, json.dumps(spalten, ensure_ascii=False), len(df)))
+                con.executemany("INSERT INTO zeilen VALUES (?,?,?,?)",
+                                [(name, i, i, json.dumps(_zeile(z, spalten), ensure_ascii=False, default=str))
+                                 for i, z in enumerate(df.itertuples(index=False))])
+            con.execute("INSERT OR REPLACE INTO meta VALUES ('xlsx_hash', ?)", (hashlib.sha1(daten).hexdigest(),))
+            self._neue_version(con)
+        return True
+
+    @laufzeit.gemessen("Excel Export")
+    def exportiere(self):
+        """Ganzer Katalog als XLSX-Bytes (wird erst auf Anforderung erzeugt)."""
+        puffer = io.BytesIO()
+        with pd.ExcelWriter(puffer, engine="openpyxl") as writer:
+            for name, df in self.blaetter().items():
+                df.to_excel(writer, sheet_name=name, index=False)
+        return puffer.getvalue()
+
+    def xlsx_abweichend(self, pfad):
+        """True, wenn die Excel-Datei nicht die zuletzt importierte ist."""
+        try: return hashlib.sha1(_xlsx_bytes(pfad)).hexdigest() != self._meta("xlsx_hash", "")
+        except OSError: return False
+
+_STORES = {}
+_LOCK = threading.Lock()
+
+def store(pfad):
+    """Prozessweite Store-Instanz je Datenbankdatei."""
+    pfad = os.path.abspath(pfad)
+    with _LOCK:
+        if pfad not in _STORES: _STORES[pfad] = KatalogStore(pfad)
+        return _STORES[pfad]
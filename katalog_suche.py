@@ -0,0 +1,163 @@
+"""Volltextsuche über den Katalog (Systeme, Optionen, Zubehör), ohne Streamlit.
+
+Ein invertierter Index (Wort -> Dokumente) wird einmal pro Katalog-Stand
+aufgebaut: für app_draht.py aus den Katalogblättern (gecacht am KatalogStand),
+für app.py aus den Abschnitten von katalog.json (gecacht je eingefrorenem
+Stand, sonst über einen Hash des Inhalts). Suchwörter treffen exakt, als
+Präfix (``gel`` -> ``Geländer``) oder über Trigramme auch mit Tippfehlern
+(``gelander``, ``edelsthal``). Alle Suchwörter müssen treffen; Treffer im
+Titel zählen doppelt.
+"""
+import bisect
+import re
+import threading
+from collections import defaultdict
+
+import katalog_json
+
+ABSCHNITTE = ("individual", "brix", "matten", "steher")
+AEHNLICHKEIT = 0.5       # Dice-Koeffizient der Trigramme für Tippfehler-Treffer
+GEWICHT = {"exakt": 3.0, "praefix": 2.0, "fuzzy": 1.0}
+
+_UMLAUTE = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+_WORT = re.compile(r"[a-z0-9]+")
+
+def woerter(text):
+    return _WORT.findall(str(text).lower().translate(_UMLAUTE))
+
+def _trigramme(wort):
+    w = f"${wort}$"
+    return {w[i:i + 3] for i in range(len(w) - 2)}
+
+# ==========================================
+# 1. INDEX
+# ==========================================
+class Index:
+    """Invertierter Index über Dokumente {Titel, Detail, Bereich, Ziel}.
+
+    ``postings``: Wort -> {Dok: Gewicht} (2 = Titel, 1 = übriger Text),
+    ``vokabular``: sortierte Wörter für die Präfixsuche,
+    ``trigramme``: Trigramm -> Wörter für die Tippfehlersuche.
+    """
+    __slots__ = ("dokumente", "postings", "vokabular", "trigramme")
+
+    def __init__(self, dokumente):
+        self.dokumente = list(dokumente)
+        postings = defaultdict(dict)
+        for nr, d in enumerate(self.dokumente):
+            for feld, gewicht in ((d.get("Text", ""), 1.0), (d["Titel"], 2.0)):
+                for w in woerter(feld):
+                    if postings[w].get(nr, 0) < gewicht: postings[w][nr] = gewicht
+        self.postings = dict(postings)
+        self.vokabular = sorted(self.postings)
+        trigramme = defaultdict(list)
+        for w in self.vokabular:
+            for t in _trigramme(w): trigramme[t].append(w)
+        self.trigramme = dict(trigramme)
+
+    def _kandidaten(self, q):
+        """{Wort im Index: Gewicht} für ein Suchwort."""
+        treffer = {}
+        i = bisect.bisect_left(self.vokabular, q)
+        while i < len(self.vokabular) and self.vokabular[i].startswith(q):
+            w = self.vokabular[i]
+            treffer[w] = GEWICHT["exakt"] if w == q else GEWICHT["praefix"]
+            i += 1
+        if len(q) >= 3:
+            tq = _trigramme(q)
+            gemeinsam = defaultdict(int)
+            for t in tq:
+                for w in self.trigramme.get(t, ()): gemeinsam[w] += 1
+            for w, n in gemeinsam.items():
+                dice = 2 * n / (len(tq) + len(w)) # "$wort$" hat len(wort) Trigramme
+                if dice >= AEHNLICHKEIT and w not in treffer: treffer[w] = GEWICHT["fuzzy"] * dice
+        return treffer
+
+    def suche(self, text, limit=20):
+        """Treffer (Dokument-Dicts + ``Score``), beste zuerst."""
+        qs = list(dict.fromkeys(woerter(text)))
+        if not qs: return []
+        punkte = None
+        for q in qs:
+            je_dok = {}
+            for w, g in self._kandidaten(q).items():
+                for nr, feld in self.postings[w].items():
+                    s = g * feld
+                    if s > je_dok.get(nr, 0): je_dok[nr] = s
+            if punkte is None: punkte = je_dok
+            else: punkte = {nr: p + je_dok[nr] for nr, p in punkte.items() if nr in je_dok}
+            if not punkte: return []
+        beste = sorted(punkte.items(), key=lambda x: (-x[1], len(self.dokumente[x[0]]["Titel"])))[:limit]
+        return [{**self.dokumente[nr], "Score": round(p, 2)} for nr, p in beste]
+
+# ==========================================
+# 2. DOKUMENTE
+# ==========================================
+def dokumente_blaetter(stand):
+    """Systeme der Startseite und die Optionen ihrer Blätter (inkl. Zub_*-Zubehör)."""
+    import konfigurator # erst hier: app.py nutzt nur den JSON-Teil und lädt kein pandas
+    start = stand.blatt("Startseite")
+    if start is None or not {"Kategorie", "System", "Blattname"} <= set(start.columns): return []
+    docs, gesehen = [], set()
+    for _, z in start.dropna(subset=["System", "Blattname"]).iterrows():
+        kategorie, system, blatt = str(z["Kategorie"]).strip(), str(z["System"]).strip(), str(z["Blattname"]).strip()
+        ziel = (kategorie, system)
+        form = konfigurator.formular(stand.blatt(blatt))
+        docs.append({"Bereich": kategorie, "Titel": system, "Detail": blatt, "Ziel": ziel,
+                     "Text": " ".join([kategorie, blatt] + [f.lbl for f in form])})
+        if blatt in gesehen: continue # z.B. Zub_Montage unter zwei Kategorien: Optionen nur einmal
+        gesehen.add(blatt)
+        optionen = set() # gleiche Optionsliste in mehreren Zeilen (z.B. Stk. Artikel 1/2) nur einmal
+        for f in form:
+            for name in (f.optionen.namen if f.optionen is not None else ()):
+                if name in optionen: continue
+                optionen.add(name)
+                docs.append({"Bereich": kategorie, "Titel": name, "Detail": f"{system} › {f.lbl}", "Ziel": ziel,
+                             "Text": f"{system} {f.lbl}"})
+    return docs
+
+def dokumente_json(daten):
+    """Modelle/Optionen aus den Abschnitten von katalog.json (app.py)."""
+    docs = []
+    for kat, modelle in (daten.get("individual") or {}).items():
+        for mod, m in modelle.items():
+            ziel = ("Metallbau Individual", kat, mod)
+            docs.append({"Bereich": "Metallbau Individual", "Titel": mod, "Detail": kat, "Ziel": ziel, "Text": kat})
+            for opt in m.get("optionen") or {}:
+                docs.append({"Bereich": "Metallbau Individual", "Titel": opt, "Detail": f"{kat} › {mod}", "Ziel": ziel,
+                             "Text": f"{kat} {mod}"})
+    for mod in daten.get("brix") or {}:
+        docs.append({"Bereich": "Brix Balkone", "Titel": mod, "Detail": "Brix Geländer", "Ziel": ("Brix Balkone", mod),
+                     "Text": "Brix Geländer Balkon"})
+    for typ, hoehen in (daten.get("matten") or {}).items():
+        docs.append({"Bereich": "Gitterzäune", "Titel": typ, "Detail": "Höhen " + ", ".join(map(str, hoehen)),
+                     "Ziel": ("Gitterzäune", "matten", typ), "Text": "Gittermatte Matten Zaun " + " ".join(map(str, hoehen))})
+    for steher in daten.get("steher") or {}:
+        docs.append({"Bereich": "Gitterzäune", "Titel": steher, "Detail": "Steher", "Ziel": ("Gitterzäune", "steher", steher),
+                     "Text": "Steher Pfosten Zaun"})
+    return docs
+
+# ==========================================
+# 3. GECACHTE INDIZES
+# ==========================================
+def index_blaetter(pfad="katalog.xlsx"):
+    """Index über die Katalogblätter; neu aufgebaut nur mit einer neuen Katalog-Version."""
+    import katalog_cache
+    stand = katalog_cache.lade_katalog(pfad)
+    if stand is None: return Index([])
+    return stand.abgeleitet(("suche",), lambda: Index(dokumente_blaetter(stand)))
+
+_JSON_INDIZES = {}
+_JSON_LOCK = threading.Lock()
+
+def index_json(daten):
+    """Index über katalog.json-Daten, prozessweit geteilt für gleichen Inhalt."""
+    teil = {k: daten[k] for k in ABSCHNITTE if k in daten}
+    schluessel = katalog_json.schluessel(teil)
+    eintrag = _JSON_INDIZES.get(schluessel)
+    if eintrag is None:
+        eintrag = (Index(dokumente_json(teil)), teil) # teil mitführen, damit die ids gültig bleiben
+        with _JSON_LOCK:
+            if len(_JSON_INDIZES) > 16: _JSON_INDIZES.clear() # alte Katalog-Stände nicht ewig halten
+            _JSON_INDIZES[schluessel] = eintrag
+    return eintrag[0]
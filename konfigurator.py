@@ -0,0 +1,250 @@
+"""Headless Preisberechnung für die Konfigurator-Blätter (ohne Streamlit).
+
+Beispiel::
+
+    import konfigurator
+    df = konfigurator.berechne_batch("Eigen_Stab", [{"L": 12, "H": 1.0}, {"L": 8, "P_Basis": "Stahl beschichtet"}])
+"""
+import math
+import re
+
+import pandas as pd
+
+import formel_engine
+import katalog_cache
+import stueckliste
+from katalog_cache import EXCEL_DATEI, safe_float
+
+# ==========================================
+# 1. HELFER
+# ==========================================
+_GANZZAHL = re.compile(r"-?[0-9]+")
+_ZIFFERN = re.compile(r"[0-9]+")
+
+class Optionen:
+    """Geparste Optionsliste einer 'auswahl'/'mehrfach'-Zeile (einmal pro Katalog-Version)."""
+    __slots__ = ("namen", "werte", "index")
+
+    def __init__(self, namen, werte):
+        self.namen = tuple(namen)
+        self.werte = tuple(werte)
+        self.index = dict(zip(self.namen, self.werte))
+
+    def summe(self, auswahl):
+        return sum(self.index[n] for n in auswahl)
+
+def _teile(text, meldungen):
+    """An jedem Komma trennen; reine Ziffern direkt nach 'Name:Ganzzahl' sind Nachkommastellen ("Blech:3,5")."""
+    teile = []
+    for stueck in text.split(','):
+        if _ZIFFERN.fullmatch(stueck) and teile and ':' in teile[-1]:
+            wert = teile[-1].rpartition(':')[2]
+            if _GANZZAHL.fullmatch(wert.strip()) and wert == wert.rstrip():
+                teile[-1] = f"{teile[-1]},{stueck}"; continue
+        if _ZIFFERN.fullmatch(stueck.strip()):
+            meldungen.append(f"'{stueck.strip()}': mehrdeutig (Dezimalstelle oder Option ohne Wert?)")
+        teile.append(stueck)
+    return teile
+
+def optionen_lesen(text):
+    """'Name:Wert, Name2:Wert2' -> (Optionen, [Meldungen]).
+
+    Getrennt wird an jedem Komma; Dezimalkomma nur direkt zwischen Ziffern
+    ("A:1,5"), ein Name ohne ':' hat den Wert 0. Unlesbare Werte (als 0), reine
+    Ziffern ohne Wert und Namen mit ':' werden übernommen und gemeldet.
+    """
+    namen, werte, meldungen = [], [], []
+    if text is None or (not isinstance(text, str) and pd.isna(text)): return Optionen(namen, werte), meldungen
+    for teil in _teile(str(text), meldungen):
+        teil = teil.strip()
+        if not teil: continue
+        name, wert = teil, 0.0
+        if ':' in teil:
+            name, _, roh = teil.rpartition(':')
+            name = name.strip()
+            try:
+                wert = float(roh.strip().replace(',', '.'))
+                if not math.isfinite(wert): raise ValueError
+            except ValueError:
+                wert = 0.0
+                meldungen.append(f"'{teil}': Wert ist keine Zahl")
+            if not name:
+                meldungen.append(f"'{teil}': Name fehlt"); continue
+            if ':' in name: meldungen.append(f"'{teil}': Name enthält ':'")
+        if name in namen:
+            meldungen.append(f"'{name}': Option doppelt"); continue
+        namen.append(name); werte.append(wert)
+    return Optionen(namen, werte), meldungen
+
+def optionen_parsen(text):
+    """'Name:Wert, Name2:Wert2' -> (Namen in Reihenfolge, {Name: Wert})."""
+    opt, _ = optionen_lesen(text)
+    return list(opt.namen), dict(opt.index)
+
+def position(auswahl_system, desc_parts, preis, vars_calc, blatt, pfad=EXCEL_DATEI):
+    """Warenkorb-Position inkl. Stückliste (Regeln des Blatts, siehe stueckliste.py)."""
+    l = vars_calc.get('L',0)
+    material = stueckliste.berechne(blatt, vars_calc, pfad)
+    return {
+        "Beschreibung": f"{auswahl_system} | " + ",".join(desc_parts),
+        "Menge": 1.0, "Einzelpreis": preis, "Preis": preis,
+        "RefMenge": max(l,1.0), "RefEinheit": "m",
+        "Stueckliste": material, "MaterialDetails": stueckliste.als_text(material)
+    }
+
+# ==========================================
+# 2. BLATT LADEN
+# ==========================================
+FORMULAR_TYPEN = ('zahl', 'auswahl', 'mehrfach', 'berechnung', 'preis')
+
+class Formularzeile:
+    __slots__ = ("index", "typ", "lbl", "var", "default", "optionen")
+
+    def __init__(self, index, typ, lbl, var, default=None, optionen=None):
+        self.index = index; self.typ = typ; self.lbl = lbl; self.var = var
+        self.default = default; self.optionen = optionen
+
+class Formular(list):
+    """Vorverarbeitete Zeilen eines Blatts; ``fehler`` = {Variable: Meldung} beim Laden."""
+    __slots__ = ("fehler",)
+
+def formular(df_config):
+    """Alle Zeilen eines Blatts einmal vorverarbeiten (Typ, Default, Optionen) - für UI und Berechnung."""
+    form = Formular(); form.fehler = {}
+    if df_config is None or df_config.empty or 'Typ' not in df_config.columns: return form
+    for index, zeile in df_config.iterrows():
+        if pd.isna(zeile.get('Typ')): continue
+        typ = str(zeile.get('Typ', '')).strip().lower()
+        if typ not in FORMULAR_TYPEN: continue
+        z = Formularzeile(index, typ, str(zeile.get('Bezeichnung', '')), str(zeile.get('Variable', '')).strip())
+        roh = zeile.get('Optionen', '')
+        if typ == 'zahl':
+            z.default = safe_float(roh) # leere Zelle = 0 (bisher wurde daraus float('nan'))
+            if not pd.isna(roh) and str(roh).strip():
+                try: float(str(roh).replace(',', '.').strip())
+                except ValueError: form.fehler[z.var] = f"{z.var}: Standardwert '{roh}' ist keine Zahl"
+        elif typ in ('auswahl', 'mehrfach'):
+            z.optionen, meldungen = optionen_lesen(roh)
+            if not z.optionen.namen and not meldungen: meldungen = ["keine Optionen"]
+            if meldungen: form.fehler[z.var] = f"{z.var}: " + "; ".join(meldungen)
+        form.append(z)
+    return form
+
+def eingabe_zeilen(df_config):
+    """Eingabe-/Formelzeilen eines Blatts einmal vorverarbeiten.
+
+    ``df_config`` ist ein Blatt oder ein bereits erzeugtes Formular. Liefert
+    Tupel (typ, Bezeichnung, Variable, Default, Optionsnamen, {Name: Wert}).
+    """
+    form = df_config if isinstance(df_config, Formular) else formular(df_config)
+    zeilen = []
+    for z in form:
+        if z.typ == 'zahl': zeilen.append((z.typ, z.lbl, z.var, z.default, None, None))
+        elif z.typ in ('auswahl', 'mehrfach'): zeilen.append((z.typ, z.lbl, z.var, None, z.optionen.namen, z.optionen.index))
+        elif z.typ == 'berechnung': zeilen.append((z.typ, z.lbl, z.var, None, None, None))
+    return zeilen
+
+def lade_formular(blatt, pfad=EXCEL_DATEI):
+    """Formular eines Blatts, geteilt und gecacht pro Katalog-Version."""
+    stand = katalog_cache.lade_katalog(pfad)
+    if stand is None: return formular(None)
+    name = str(blatt).strip()
+    return stand.abgeleitet(("formular", name), lambda: formular(stand.blatt(name)))
+
+def lade_modell(blatt, pfad=EXCEL_DATEI):
+    """(Eingabezeilen, KompiliertesBlatt, System-Name) eines Blatts aus dem Katalog-Cache."""
+    stand = katalog_cache.lade_katalog(pfad)
+    if stand is None: raise FileNotFoundError(pfad)
+    name = str(blatt).strip()
+    df = stand.blatt(name)
+    if df is None: raise KeyError(f"Blatt '{blatt}' fehlt in Excel!")
+    formeln = stand.abgeleitet(("formeln", name), lambda: formel_engine.kompiliere_blatt(df))
+    form = lade_formular(name, pfad) # nicht innerhalb von abgeleitet(): dessen Lock ist nicht reentrant
+    zeilen = stand.abgeleitet(("eingaben", name), lambda: eingabe_zeilen(form))
+
+    system = name
+    start = stand.blatt("Startseite")
+    if start is not None and {'Blattname', 'System'} <= set(start.columns):
+        treffer = start.loc[start['Blattname'].astype(str).str.strip() == name, 'System']
+        if not treffer.empty: system = str(treffer.iloc[0])
+    return zeilen, formeln, system
+
+# ==========================================
+# 3. BERECHNUNG
+# ==========================================
+def _leer(wert):
+    return wert is None or (not isinstance(wert, (str, list, tuple, set)) and pd.isna(wert))
+
+def _eingaben_setzen(zeilen, eingaben):
+    """Setzt Eingaben wie die Widgets es täten; fehlende Werte = Widget-Default."""
+    vars_calc = {}; desc_parts = []
+    for typ, lbl, var, default, opt_names, opts in zeilen:
+        if typ == 'zahl':
+            val = eingaben.get(var)
+            val = default if _leer(val) else float(val)
+            vars_calc[var] = val
+            if val!=0: desc_parts.append(f"{lbl}: {val}")
+        elif typ == 'auswahl':
+            if opt_names:
+                sel = eingaben.get(var)
+                sel = opt_names[0] if _leer(sel) else str(sel).strip()
+                if sel not in opts: raise ValueError(f"{var}: unbekannte Option '{sel}'")
+                vars_calc[var] = opts.get(sel,0); desc_parts.append(f"{lbl}: {sel}")
+        elif typ == 'mehrfach':
+            sel = eingaben.get(var)
+            if _leer(sel): sel = []
+            elif isinstance(sel, str): sel = [s.strip() for s in sel.split(',') if s.strip()]
+            for s in sel:
+                if s not in opts: raise ValueError(f"{var}: unbekannte Option '{s}'")
+            vars_calc[var] = sum(opts[s] for s in sel)
+            if sel: desc_parts.append(f"{lbl}: {','.join(sel)}")
+        elif typ == 'berechnung':
+            vars_calc[var] = 0
+    return vars_calc, desc_parts
+
+def _rechne(zeilen, formeln, system, eingaben, blatt, pfad):
+    vars_calc, desc_parts = _eingaben_setzen(zeilen, eingaben)
+    env = {n: vars_calc[n] for n in formeln.eingaben if n in vars_calc}
+    preis = None
+    for idx in formeln.reihenfolge:
+        typ, var = formeln.zeilen[idx]
+        try: wert = formeln.berechne(idx, env)
+        except Exception:
+            if typ == 'preis': raise
+            wert = 0
+        env[var] = wert
+        if typ == 'berechnung': vars_calc[var] = wert
+        elif preis is None: preis = wert
+    if preis is None: raise ValueError("Blatt hat keine 'Preis'-Zeile")
+    return {"Werte": vars_calc, "Preis": preis, "Position": position(system, desc_parts, preis, vars_calc, blatt, pfad)}
+
+def berechne(blatt, eingaben=None, pfad=EXCEL_DATEI):
+    """Eine Konfiguration rechnen. ``eingaben``: {Variable: Wert/Optionsname(n)}.
+
+    Liefert {"Werte": vars_calc, "Preis": float, "Position": Warenkorb-Dict}.
+    """
+    zeilen, formeln, system = lade_modell(blatt, pfad)
+    return _rechne(zeilen, formeln, system, eingaben or {}, blatt, pfad)
+
+def berechne_batch(blatt, eingaben, pfad=EXCEL_DATEI):
+    """Viele Konfigurationen eines Blatts rechnen.
+
+    ``eingaben`` ist ein DataFrame (eine Zeile pro Konfiguration, Spalten =
+    Variablen) oder eine Liste von Dicts. Ergebnis: DataFrame mit allen
+    Variablen sowie den Spalten Preis, Beschreibung, MaterialDetails und Fehler.
+    Fehlerhafte Zeilen brechen den Lauf nicht ab.
+    """
+    zeilen_modell, formeln, system = lade_modell(blatt, pfad)
+    if isinstance(eingaben, pd.DataFrame): datensaetze = eingaben.to_dict("records")
+    else: datensaetze = [dict(e) for e in eingaben]
+
+    zeilen = []
+    for e in datensaetze:
+        try:
+            r = _rechne(zeilen_modell, formeln, system, e, blatt, pfad)
+            zeilen.append({**r["Werte"], "Preis": r["Preis"], "Beschreibung": r["Position"]["Beschreibung"],
+                           "MaterialDetails": r["Position"]["MaterialDetails"], "Fehler": None})
+        except Exception as ex:
+            zeilen.append({"Preis": float("nan"), "Fehler": str(ex)})
+    index = eingaben.index if isinstance(eingaben, pd.DataFrame) else None
+    return pd.DataFrame(zeilen, index=index)
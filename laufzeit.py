@@ -0,0 +1,158 @@
+"""Laufzeit-Messpunkte für die teuren Phasen (Katalog laden, Formeln, Rendern, Warenkorb, PDF, Excel).
+
+Jeder Messwert geht in die prozessweite Statistik und in die der Session, die
+gerade im aktuellen Thread läuft (``sitzung()`` am Anfang jedes Skriptlaufs).
+Abgeschaltet (``LAUFZEIT_MESSUNG=0`` oder ``aktivieren(False)``) kostet ein
+Messpunkt nur noch eine Abfrage des Schalters.
+"""
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+AKTIV = os.environ.get("LAUFZEIT_MESSUNG", "1") != "0"
+FENSTER = 1000  # letzte Messwerte je Phase für p50/p95
+GRENZEN_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+def aktivieren(an=True):
+    global AKTIV
+    AKTIV = bool(an)
+
+# ==========================================
+# 1. STATISTIK
+# ==========================================
+class _Phase:
+    __slots__ = ("anzahl", "summe", "max", "werte", "histogramm")
+
+    def __init__(self):
+        self.anzahl = 0
+        self.summe = 0.0
+        self.max = 0.0
+        self.werte = deque(maxlen=FENSTER)
+        self.histogramm = [0] * (len(GRENZEN_MS) + 1)
+
+def _perzentil(sortiert, q):
+    return sortiert[min(len(sortiert) - 1, int(round(q * (len(sortiert) - 1))))]
+
+class Statistik:
+    """Messwerte je Phase: Anzahl, Summe, Maximum, Histogramm und die letzten FENSTER Werte."""
+    __slots__ = ("phasen", "seit", "_lock")
+
+    def __init__(self):
+        self.phasen = {}
+        self.seit = time.time()
+        self._lock = threading.Lock()
+
+    def erfasse(self, phase, dauer):
+        with self._lock:
+            p = self.phasen.get(phase)
+            if p is None: p = self.phasen[phase] = _Phase()
+            p.anzahl += 1; p.summe += dauer; p.werte.append(dauer)
+            if dauer > p.max: p.max = dauer
+            p.histogramm[bisect.bisect_left(GRENZEN_MS, dauer * 1000)] += 1
+
+    def leeren(self):
+        with self._lock:
+            self.phasen.clear()
+            self.seit = time.time()
+
+    def zeilen(self):
+        """Tabellenzeilen (ms), nach Gesamtzeit sortiert."""
+        with self._lock:
+            kopie = [(name, p.anzahl, p.summe, p.max, sorted(p.werte), list(p.histogramm)) for name, p in self.phasen.items()]
+        zeilen = []
+        for name, anzahl, summe, maximum, werte, histogramm in sorted(kopie, key=lambda x: -x[2]):
+            zeilen.append({"Phase": name, "Anzahl": anzahl,
+                           "p50 ms": round(_perzentil(werte, 0.50) * 1000, 2),
+                           "p95 ms": round(_perzentil(werte, 0.95) * 1000, 2),
+                           "max ms": round(maximum * 1000, 1), "Summe s": round(summe, 2),
+                           "histogramm": {(f"<={g}ms" if i < len(GRENZEN_MS) else f">{GRENZEN_MS[-1]}ms"): n
+                                          for i, (g, n) in enumerate(zip(GRENZEN_MS + (None,), histogramm)) if n}})
+        return zeilen
+
+PROZESS = Statistik()
+_LOKAL = threading.local()
+
+def sitzung(statistik):
+    """Bindet die Statistik einer Session an den aktuellen Thread (Skriptlauf)."""
+    _LOKAL.statistik = statistik
+
+def aktuelle_sitzung():
+    return getattr(_LOKAL, "statistik", None)
+
+def erfasse(phase, dauer):
+    PROZESS.erfasse(phase, dauer)
+    s = getattr(_LOKAL, "statistik", None)
+    if s is not None: s.erfasse(phase, dauer)
+
+# ==========================================
+# 2. MESSPUNKTE
+# ==========================================
+class _Aus:
+    __slots__ = ()
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+
+_AUS = _Aus()
+
+class _Messpunkt:
+    __slots__ = ("phase", "t0")
+
+    def __init__(self, phase): self.phase = phase
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        erfasse(self.phase, time.perf_counter() - self.t0)
+        return False
+
+def messen(phase):
+    """``with messen("Formeln"): ...``"""
+    return _Messpunkt(phase) if AKTIV else _AUS
+
+def gemessen(phase):
+    """Decorator: jeder Aufruf zählt als ein Messwert der Phase (auch wenn er fehlschlägt)."""
+    def deko(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not AKTIV: return fn(*args, **kwargs)
+            t0 = time.perf_counter()
+            try: return fn(*args, **kwargs)
+            finally: erfasse(phase, time.perf_counter() - t0)
+        return wrapper
+    return deko
+
+def mit_sitzung(fn):
+    """Für Hintergrund-Threads: ``fn`` misst in die Session, die sie gestartet hat."""
+    s = aktuelle_sitzung()
+    if s is None: return fn
+    @functools.wraps(fn)
+    def gebunden(*args, **kwargs):
+        alt = aktuelle_sitzung()
+        _LOKAL.statistik = s
+        try: return fn(*args, **kwargs)
+        finally: _LOKAL.statistik = alt
+    return gebunden
+
+# ==========================================
+# 3. BERICHT
+# ==========================================
+def tabelle(statistik):
+    """Zeilen ohne Histogramm, für st.dataframe."""
+    return [{k: v for k, v in z.items() if k != "histogramm"} for z in statistik.zeilen()]
+
+def als_json(sitzung_statistik=None):
+    """Prozess- und Session-Statistik inkl. Histogramm als JSON-Text."""
+    bericht = {"zeit": datetime.now().isoformat(timespec="seconds"), "aktiv": AKTIV, "pid": os.getpid(),
+               "grenzen_ms": GRENZEN_MS,
+               "prozess": {"seit": datetime.fromtimestamp(PROZESS.seit).isoformat(timespec="seconds"), "phasen": PROZESS.zeilen()}}
+    if sitzung_statistik is not None:
+        bericht["sitzung"] = {"seit": datetime.fromtimestamp(sitzung_statistik.seit).isoformat(timespec="seconds"),
+                              "phasen": sitzung_statistik.zeilen()}
+    return json.dumps(bericht, indent=2, ensure_ascii=False)
@@ -0,0 +1,324 @@
+"""PDF-Erstellung für app_draht.py (Kundenangebot und interne Fertigungsliste), ohne Streamlit."""
+import functools
+import os
+from datetime import datetime
+
+import foto_pipeline
+import laufzeit
+import pdf_layout
+import startzeit
+import zuschnitt
+
+LOGO_DATEI = "Meingassner Metalltechnik 2023.png"
+MWST_SATZ = 0.20  # 20% MwSt
+FOTO_DPI = 150    # Auflösung der Baustellenfotos im PDF (bei 180mm Breite)
+
+def clean_text(text):
+    if text is None: return ""
+    text = str(text).replace("€", "EUR").replace("–", "-").replace("„", '"').replace("“", '"')
+    text = text.replace("•", "-") # Fix für Fragezeichen
+    try: return text.encode('latin-1', 'replace').decode('latin-1')
+    except: return text
+
+@functools.cache
+def pdf_klasse():
+    # fpdf erst laden, wenn wirklich ein PDF erstellt wird
+    with startzeit.importzeit("fpdf"): from fpdf import FPDF
+
+    class PDF(FPDF):
+        def header(self):
+            if os.path.exists(LOGO_DATEI): 
+                try: self.image(LOGO_DATEI, 10, 8, 50)
+                except: pass
+
+            self.set_font('Helvetica', 'B', 16)
+            self.set_text_color(44, 62, 80)
+            self.cell(0, 10, clean_text("Kostenschätzung"), 0, 1, 'R')
+
+            self.set_font('Helvetica', '', 10)
+            self.set_text_color(100, 100, 100)
+            self.cell(0, 6, clean_text(f"Datum: {datetime.now().strftime('%d.%m.%Y')}"), 0, 1, 'R')
+
+            self.set_draw_color(200, 200, 200)
+            self.line(10, 35, 200, 35)
+            self.ln(20)
+
+        def footer(self):
+            self.set_y(-15)
+            self.set_font('Helvetica', 'I', 8)
+            self.set_text_color(128, 128, 128)
+            self.cell(0, 10, f'Seite {self.page_no()}', 0, 0, 'C')
+
+        def table_header(self):
+            self.set_font("Helvetica", 'B', 9)
+            self.set_fill_color(240, 240, 240)
+            self.set_text_color(0, 0, 0)
+            self.set_draw_color(220, 220, 220)
+            self.cell(10, 8, "Pos.", 1, 0, 'C', True)
+            self.cell(95, 8, "Beschreibung", 1, 0, 'L', True)
+            self.cell(20, 8, "Menge", 1, 0, 'C', True)
+            self.cell(30, 8, "EP", 1, 0, 'R', True)
+            self.cell(35, 8, "Gesamt", 1, 1, 'R', True)
+    return PDF
+
+@laufzeit.gemessen("PDF Kunde")
+def create_pdf(positionen_liste, kunden_dict, fotos, montage_summe, kran_summe, zeige_details, zuschlag_prozent, zuschlag_label, zuschlag_transparent, provision_prozent, rabatt_prozent, skonto_prozent, foto_dpi=None, fortschritt=None):
+    if foto_dpi is None: foto_dpi = FOTO_DPI
+    pdf = pdf_klasse()()
+    pdf.set_auto_page_break(auto=True, margin=20) 
+    pdf.alias_nb_pages()
+    pdf.add_page()
+    y_tabelle_folgeseite = pdf.get_y() + 8 # unter Seitenkopf + Tabellenkopf
+
+    def neue_tabellenseite():
+        pdf.add_page(); pdf.table_header(); pdf.set_font("Helvetica", '', 10)
+    
+    # Adresse
+    pdf.set_font("Helvetica", 'B', 11)
+    pdf.set_text_color(0, 0, 0)
+    pdf.cell(0, 6, clean_text("Empfänger:"), 0, 1)
+    pdf.set_font("Helvetica", '', 11)
+    adresse = f"{kunden_dict.get('Name','')}\n{kunden_dict.get('Strasse','')}\n{kunden_dict.get('Ort','')}"
+    pdf.multi_cell(0, 6, clean_text(adresse))
+    
+    if kunden_dict.get("Notiz"):
+        pdf.ln(5)
+        pdf.set_font("Helvetica", 'I', 10)
+        pdf.set_fill_color(250, 250, 250)
+        pdf.multi_cell(0, 6, clean_text(f"Notiz: {kunden_dict['Notiz']}"), 0, 'L', True)
+    
+    pdf.ln(10)
+    pdf.table_header()
+    
+    pdf.set_font("Helvetica", '', 10)
+    
+    prov_faktor = 1 + (provision_prozent / 100.0)
+    subtotal_list = 0
+    pos_nr = 1
+    
+    # 1. Layout-Durchlauf: Texte aufbereiten, Zeilenhöhen messen, Umbrüche planen
+    zeilen = []
+    for pos in positionen_liste:
+        if not pos: continue
+        
+        ep_kunde = pos.get('Einzelpreis', 0) * prov_faktor
+        gp_kunde = pos.get('Preis', 0) * prov_faktor
+        
+        raw_desc = str(pos.get('Beschreibung', ''))
+        parts = raw_desc.split("|")
+        titel = parts[0].strip()
+        details = ""
+        if len(parts) > 1:
+            details = "\n" + parts[1].replace(",", "\n -").strip()
+            if not details.strip().startswith("-"): details = details.replace("\n", "\n -", 1)
+            
+        full_text = f"{titel}{details}"
+        if pos.get('RefMenge', 0) > 0:
+            ep_ref = ep_kunde / float(pos['RefMenge'])
+            full_text += f"\n(entspr. {ep_ref:.2f} EUR / {pos.get('RefEinheit', 'Stk')})"
+        zeilen.append((pos, ep_kunde, gp_kunde, clean_text(full_text)))
+
+    plan = pdf_layout.plane_tabelle(pdf, [z[3] for z in zeilen], 95, 5, pdf.get_y(), y_tabelle_folgeseite)
+
+    # 2. Render-Durchlauf
+    for (pos, ep_kunde, gp_kunde, text), layout in zip(zeilen, plan):
+        subtotal_list += gp_kunde
+        if layout.neue_seite: neue_tabellenseite()
+
+        y_start = pdf.get_y()
+        pdf.set_xy(10, y_start)
+        pdf.cell(10, 5, str(pos_nr), 0, 0, 'C') 
+        
+        pdf.set_xy(20, y_start)
+        pdf.multi_cell(95, 5, text, border=0, align='L')
+        y_end = pdf.get_y()
+        row_height = y_end - y_start
+        
+        pdf.set_xy(115, y_start)
+        pdf.cell(20, row_height, clean_text(str(pos.get('Menge', 0))), 0, 0, 'C')
+        pdf.cell(30, row_height, f"{ep_kunde:.2f}", 0, 0, 'R')
+        pdf.cell(35, row_height, f"{gp_kunde:.2f}", 0, 0, 'R')
+        
+        pdf.set_draw_color(220, 220, 220)
+        pdf.line(10, y_end, 200, y_end)
+        pdf.set_y(y_end)
+        if fortschritt: fortschritt(0.7 * pos_nr / len(zeilen))
+        pos_nr += 1
+
+    montage_final = (montage_summe * prov_faktor) 
+    kran_final = (kran_summe * prov_faktor)
+    
+    basis_prov = subtotal_list + montage_final + kran_final
+    zuschlag_wert = 0
+    if zuschlag_prozent > 0: zuschlag_wert = basis_prov * (zuschlag_prozent / 100.0)
+    
+    versteckter_zuschlag = zuschlag_wert if not zuschlag_transparent else 0
+    sichtbarer_zuschlag = zuschlag_wert if zuschlag_transparent else 0
+    
+    montage_final += versteckter_zuschlag
+
+    if montage_final > 0:
+        if not pdf_layout.passt(pdf, 8): neue_tabellenseite()
+        txt = "Montagearbeiten" if zeige_details else "Montage & Regie (Pauschal)"
+        pdf.cell(10, 8, str(pos_nr), 0, 0, 'C')
+        pdf.cell(95, 8, clean_text(txt), 0, 0, 'L')
+        pdf.cell(20, 8, "1", 0, 0, 'C')
+        pdf.cell(30, 8, f"{montage_final:.2f}", 0, 0, 'R')
+        pdf.cell(35, 8, f"{montage_final:.2f}", 0, 1, 'R')
+        pdf.line(10, pdf.get_y(), 200, pdf.get_y())
+        subtotal_list += montage_final
+        pos_nr += 1
+
+    if kran_final > 0:
+        if not pdf_layout.passt(pdf, 8): neue_tabellenseite()
+        pdf.cell(10, 8, str(pos_nr), 0, 0, 'C')
+        pdf.cell(95, 8, "Kranarbeiten / Hebegerät", 0, 0, 'L')
+        pdf.cell(20, 8, "1", 0, 0, 'C')
+        pdf.cell(30, 8, f"{kran_final:.2f}", 0, 0, 'R')
+        pdf.cell(35, 8, f"{kran_final:.2f}", 0, 1, 'R')
+        pdf.line(10, pdf.get_y(), 200, pdf.get_y())
+        subtotal_list += kran_final
+        pos_nr += 1
+
+    if sichtbarer_zuschlag > 0:
+        if not pdf_layout.passt(pdf, 8): neue_tabellenseite()
+        pdf.cell(10, 8, str(pos_nr), 0, 0, 'C')
+        label = f"Erschwerniszuschlag ({zuschlag_label} {zuschlag_prozent}%)"
+        pdf.cell(95, 8, clean_text(label), 0, 0, 'L')
+        pdf.cell(20, 8, "1", 0, 0, 'C')
+        pdf.cell(30, 8, f"{sichtbarer_zuschlag:.2f}", 0, 0, 'R')
+        pdf.cell(35, 8, f"{sichtbarer_zuschlag:.2f}", 0, 1, 'R')
+        pdf.line(10, pdf.get_y(), 200, pdf.get_y())
+        subtotal_list += sichtbarer_zuschlag
+        pos_nr += 1
+
+    summen_hoehe = 5 + (12 if rabatt_prozent > 0 else 0) + 3 + 12 + 3 + 10 + (10 if skonto_prozent > 0 else 0)
+    if not pdf_layout.passt(pdf, summen_hoehe): pdf.add_page()
+    pdf.ln(5)
+    
+    if rabatt_prozent > 0:
+        rabatt_wert = subtotal_list * (rabatt_prozent / 100.0)
+        pdf.set_font("Helvetica", '', 10)
+        pdf.cell(155, 6, "Zwischensumme:", 0, 0, 'R')
+        pdf.cell(35, 6, f"{subtotal_list:.2f}", 0, 1, 'R')
+        
+        pdf.set_text_color(200, 50, 50)
+        pdf.set_font("Helvetica", 'B', 10)
+        pdf.cell(155, 6, f"Abzüglich Rabatt ({rabatt_prozent:.1f}%):", 0, 0, 'R')
+        pdf.cell(35, 6, f"- {rabatt_wert:.2f}", 0, 1, 'R')
+        pdf.set_text_color(0, 0, 0)
+        subtotal_list -= rabatt_wert
+
+    netto = subtotal_list
+    mwst = netto * MWST_SATZ
+    brutto = netto + mwst
+
+    pdf.ln(2)
+    pdf.set_draw_color(44, 62, 80)
+    pdf.line(130, pdf.get_y(), 200, pdf.get_y())
+    pdf.ln(1)
+    
+    pdf.set_font("Helvetica", '', 11)
+    pdf.cell(155, 6, "Summe Netto:", 0, 0, 'R')
+    pdf.cell(35, 6, f"{netto:.2f} EUR", 0, 1, 'R')
+    
+    pdf.cell(155, 6, f"zzgl. {int(MWST_SATZ*100)}% MwSt:", 0, 0, 'R')
+    pdf.cell(35, 6, f"{mwst:.2f} EUR", 0, 1, 'R')
+    
+    pdf.ln(3)
+    pdf.set_font("Helvetica", 'B', 12)
+    pdf.set_fill_color(230, 236, 240)
+    pdf.cell(120, 10, "", 0, 0) 
+    pdf.cell(35, 10, "GESAMTSUMME:", 0, 0, 'R', True)
+    pdf.cell(35, 10, f"{brutto:.2f} EUR", 0, 1, 'R', True)
+
+    if skonto_prozent > 0:
+        skonto_wert = brutto * (skonto_prozent / 100.0)
+        zahlbar = brutto - skonto_wert
+        pdf.ln(5)
+        pdf.set_font("Helvetica", '', 9)
+        pdf.set_text_color(80, 80, 80)
+        pdf.cell(0, 5, clean_text(f"Zahlbar bei {skonto_prozent}% Skonto innerhalb 10 Tagen: {zahlbar:.2f} EUR"), 0, 1, 'R')
+
+    if fotos:
+        pdf.add_page()
+        pdf.set_font("Helvetica", 'B', 12)
+        pdf.set_text_color(0,0,0)
+        pdf.cell(0, 10, "Baustellendokumentation", 0, 1)
+        bilder = foto_pipeline.bereite_fotos(fotos, 180, foto_dpi)
+        for nr, f in enumerate(bilder, 1):
+            if fortschritt: fortschritt(0.7 + 0.3 * nr / len(bilder))
+            try:
+                foto_pipeline.pdf_bild(pdf, f, x=15, w=180)
+                pdf.ln(5)
+            except: pass
+
+    return pdf.output(dest='S').encode('latin-1')
+
+@laufzeit.gemessen("PDF Intern")
+def create_internal_pdf(positionen_liste, kunden_dict, zusatzkosten, fortschritt=None):
+    pdf = pdf_klasse()(); pdf.alias_nb_pages(); pdf.add_page()
+    y_tabelle_folgeseite = pdf.get_y() + 8
+    pdf.set_font("Arial", 'B', 11); pdf.cell(0, 8, f"INTERN: {clean_text(kunden_dict.get('Name',''))}", 0, 1)
+
+    def tabellenkopf():
+        pdf.set_fill_color(220, 220, 220); pdf.set_font("Arial", 'B', 10)
+        pdf.cell(10, 8, "#", 1, 0, 'C', True); pdf.cell(120, 8, "Material & AV (Echte Kosten)", 1, 0, 'L', True); pdf.cell(60, 8, "Kalk. Wert (Ohne Prov)", 1, 1, 'R', True)
+        pdf.set_font("Arial", '', 10)
+    
+    pdf.ln(5); tabellenkopf()
+    
+    texte = []
+    for pos in positionen_liste:
+        titel = clean_text(pos.get('Beschreibung','').split('|')[0])
+        details = ""
+        if pos.get('MaterialDetails'):
+            for d in pos['MaterialDetails']: details += f"\n  -> {d}"
+        texte.append(f"{titel}{clean_text(details)}")
+    plan = pdf_layout.plane_tabelle(pdf, texte, 120, 5, pdf.get_y(), y_tabelle_folgeseite)
+
+    total_intern = 0
+    for i, (pos, text, layout) in enumerate(zip(positionen_liste, texte, plan)):
+        if fortschritt: fortschritt(i / len(positionen_liste))
+        if layout.neue_seite: pdf.add_page(); tabellenkopf()
+        
+        preis_intern = pos.get('Preis', 0)
+        total_intern += preis_intern
+        
+        x_start, y_start = pdf.get_x(), pdf.get_y()
+        pdf.set_x(20)
+        pdf.multi_cell(120, 5, text, border=0)
+        y_end = pdf.get_y(); h = y_end - y_start
+        pdf.set_xy(x_start, y_start)
+        pdf.cell(10, h, str(i+1), 1, 0, 'C')
+        pdf.set_xy(20+120, y_start)
+        pdf.cell(60, h, f"{preis_intern:.2f}", 1, 1, 'R')
+        pdf.set_y(y_end)
+        pdf.line(10, y_end, 200, y_end)
+        
+    pdf.ln(5); 
+    pdf.cell(0, 10, clean_text(f"Zusatz: Montage {zusatzkosten.get('montage_std')}h / {zusatzkosten.get('montage_mann')} Mann"), 1, 1)
+    einstellungen = zuschnitt.einstellungen(zusatzkosten)
+    plaene = zuschnitt.fuer_angebot(positionen_liste, **einstellungen)
+    if plaene: zuschnittplan(pdf, plaene, einstellungen)
+    return pdf.output(dest='S').encode('latin-1')
+
+def _m(mm): return f"{mm / 1000:.3f}"
+
+def zuschnittplan(pdf, plaene, einstellungen):
+    """Zuschnittplan je Artikel; gleiche Stangen stehen als eine Zeile mit Anzahl."""
+    pdf.ln(5); pdf.set_font("Arial", 'B', 11); pdf.cell(0, 8, "ZUSCHNITTPLAN", 0, 1)
+    lager = " / ".join(f"{l:.2f}" for l in sorted(einstellungen['lager_m']))
+    pdf.set_font("Arial", '', 9)
+    pdf.cell(0, 5, clean_text(f"Stangen {lager} m, Schnittbreite {einstellungen['kerf_mm']:g} mm, "
+                              f"{'optimiert' if einstellungen['optimiert'] else 'First-Fit-Decreasing'}"), 0, 1)
+    for artikel, plan in plaene.items():
+        pdf.ln(2); pdf.set_font("Arial", 'B', 10)
+        pdf.cell(0, 6, clean_text(f"{artikel}: {len(plan.stangen)} Stangen = {plan.verbrauch_mm / 1000:.2f} m, "
+                                  f"netto {plan.netto_mm / 1000:.2f} m, Verschnitt {plan.verschnitt_prozent:.1f} %"), 0, 1)
+        pdf.set_font("Arial", '', 9)
+        for anzahl, laenge, teile, rest in plan.muster():
+            schnitte = " + ".join(f"{n} x {_m(t)}" for t, n in teile)
+            pdf.multi_cell(0, 5, clean_text(f"  {anzahl} x Stange {laenge / 1000:.2f} m: {schnitte}  | Rest {_m(rest)} m"))
+        if plan.zu_lang:
+            pdf.multi_cell(0, 5, clean_text(f"  Länger als jede Stange (stoßen): {', '.join(_m(t) for t in plan.zu_lang)} m"))
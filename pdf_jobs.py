@@ -0,0 +1,50 @@
+"""Hintergrund-Erstellung der PDFs (prozessweiter Thread-Pool für alle Sessions)."""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import laufzeit
+
+MAX_WORKER = 4
+
+_POOL = ThreadPoolExecutor(max_workers=MAX_WORKER, thread_name_prefix="pdf")
+
+class PdfAuftrag:
+    """Mehrere PDFs, die parallel gerendert werden.
+
+    Jede Aufgabe bekommt als Keyword ``fortschritt`` eine Funktion, mit der sie
+    ihren Anteil (0..1) melden kann.
+    """
+
+    def __init__(self):
+        self.futures = {}
+        self.anteile = {}
+        self.start = time.time()
+        self._lock = threading.Lock()
+
+    def _melde(self, name, anteil):
+        with self._lock: self.anteile[name] = max(0.0, min(1.0, float(anteil)))
+
+    def fortschritt(self):
+        if not self.futures: return 1.0
+        with self._lock:
+            teile = [1.0 if f.done() else self.anteile.get(n, 0.0) for n, f in self.futures.items()]
+        return sum(teile) / len(teile)
+
+    def fertig(self):
+        return all(f.done() for f in self.futures.values())
+
+    def ergebnisse(self):
+        """{Name: PDF-Bytes}; wirft den ersten Fehler einer Aufgabe weiter."""
+        return {n: f.result() for n, f in self.futures.items()}
+
+def starte(aufgaben):
+    """``aufgaben``: {Name: (Funktion, args, kwargs)} -> PdfAuftrag (läuft sofort los).
+
+    Die Argumente sollten Kopien sein - die Session kann sich währenddessen ändern.
+    """
+    auftrag = PdfAuftrag()
+    for name, (fn, args, kwargs) in aufgaben.items():
+        melde = lambda anteil, name=name: auftrag._melde(name, anteil)
+        auftrag.futures[name] = _POOL.submit(laufzeit.mit_sitzung(fn), *args, fortschritt=melde, **kwargs)
+    return auftrag
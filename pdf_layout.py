@@ -0,0 +1,51 @@
+"""Tabellen-Layout für die PDFs: Zeilenhöhen mit echten Font-Metriken, Umbrüche vorab planen."""
+import threading
+
+CACHE_GROESSE = 20000
+
+_ZEILEN = {}
+_LOCK = threading.Lock()
+
+def zeilen_anzahl(pdf, breite, text):
+    """Anzahl Zeilen, die ``pdf.multi_cell(breite, h, text)`` im aktuellen Font erzeugt.
+
+    Gemessen wird mit FPDFs eigenem Umbruch (split_only), gecacht pro
+    Font/Größe/Breite/Text - Font-Metriken ändern sich nie.
+    """
+    key = (pdf.font_family, pdf.font_style, pdf.font_size_pt, breite, text)
+    n = _ZEILEN.get(key)
+    if n is None:
+        n = len(pdf.multi_cell(breite, 1, text, split_only=True))
+        with _LOCK:
+            if len(_ZEILEN) >= CACHE_GROESSE: _ZEILEN.clear()
+            _ZEILEN[key] = n
+    return n
+
+class TabellenZeile:
+    __slots__ = ("hoehe", "neue_seite")
+
+    def __init__(self, hoehe, neue_seite):
+        self.hoehe = hoehe
+        self.neue_seite = neue_seite
+
+def plane_tabelle(pdf, texte, breite, zeilen_hoehe, y_start, y_neue_seite, min_hoehe=0):
+    """Layout-Durchlauf: Höhe jeder Zeile und ob davor umgebrochen wird.
+
+    ``y_neue_seite`` ist die y-Position der ersten Zeile auf einer Folgeseite
+    (nach Seitenkopf und wiederholtem Tabellenkopf). Muss mit dem Font
+    aufgerufen werden, in dem die Texte später gesetzt werden.
+    """
+    unten = pdf.page_break_trigger
+    plan, y = [], y_start
+    for text in texte:
+        hoehe = max(zeilen_anzahl(pdf, breite, text) * zeilen_hoehe, min_hoehe)
+        # Zeilen, die höher als eine ganze Seite sind, bricht FPDF selbst um
+        neue_seite = y + hoehe > unten and y > y_neue_seite
+        if neue_seite: y = y_neue_seite
+        plan.append(TabellenZeile(hoehe, neue_seite))
+        y += hoehe
+    return plan
+
+def passt(pdf, hoehe):
+    """True, wenn ``hoehe`` mm auf der aktuellen Seite noch Platz haben."""
+    return pdf.get_y() + hoehe <= pdf.page_break_trigger
@@ -0,0 +1,85 @@
+"""PDF-Erstellung für app.py (Angebot aus dem Warenkorb), ohne Streamlit."""
+import datetime
+import os
+
+import laufzeit
+import startzeit
+
+def txt_clean(s):
+    """Reinigt Text für FPDF (Latin-1) und ersetzt €."""
+    if not isinstance(s, str): s = str(s)
+    s = s.replace("€", "EUR").replace("–", "-")
+    # Mapping für Umlaute, falls encoding='latin-1' strict ist
+    return s.encode('latin-1', 'replace').decode('latin-1')
+
+@laufzeit.gemessen("PDF")
+def create_pdf(cart_items):
+    # fpdf erst laden, wenn wirklich ein PDF erstellt wird
+    with startzeit.importzeit("fpdf"): from fpdf import FPDF
+    pdf = FPDF()
+    pdf.add_page()
+    
+    # Logo
+    if os.path.exists("logo_firma.png"): 
+        pdf.image("logo_firma.png", 10, 8, 40)
+        pdf.ln(25)
+    else: 
+        pdf.ln(10)
+    
+    # Header
+    pdf.set_font("Arial", 'B', 16)
+    pdf.cell(0, 10, txt_clean("ANGEBOT"), ln=True, align='C')
+    pdf.set_font("Arial", '', 10)
+    pdf.cell(0, 10, txt_clean(f"Datum: {datetime.date.today().strftime('%d.%m.%Y')}"), ln=True, align='R')
+    pdf.ln(10)
+    
+    # Tabelle Header
+    pdf.set_fill_color(230, 230, 230)
+    pdf.set_font("Arial", 'B', 9)
+    pdf.cell(10, 8, "#", 1, 0, 'C', 1)
+    pdf.cell(110, 8, "Position / Beschreibung", 1, 0, 'L', 1)
+    pdf.cell(25, 8, "Menge", 1, 0, 'C', 1)
+    pdf.cell(45, 8, "Gesamt (Netto)", 1, 1, 'R', 1)
+    
+    # Positionen
+    total_net = 0
+    pdf.set_font("Arial", '', 9)
+    
+    for idx, item in enumerate(cart_items):
+        total_net += item['preis']
+        
+        # Hauptzeile
+        pdf.set_font("Arial", 'B', 9)
+        pdf.cell(10, 8, str(idx+1), "LRT", 0, 'C')
+        pdf.cell(110, 8, txt_clean(item['titel']), "LRT", 0, 'L')
+        pdf.cell(25, 8, txt_clean(item['menge_txt']), "LRT", 0, 'C')
+        pdf.cell(45, 8, txt_clean(f"{item['preis']:,.2f}"), "LRT", 1, 'R')
+        
+        # Details
+        pdf.set_font("Arial", '', 8)
+        for d in item.get('details', []):
+            pdf.cell(10, 5, "", "LR", 0)
+            pdf.cell(110, 5, txt_clean(f"  - {d}"), "LR", 0, 'L')
+            pdf.cell(25, 5, "", "LR", 0)
+            pdf.cell(45, 5, "", "LR", 1)
+            
+        # Abschlusslinie Item
+        pdf.cell(190, 1, "", "T", 1)
+
+    # Summenblock
+    mwst = total_net * 0.20
+    brutto = total_net + mwst
+    
+    pdf.ln(5)
+    pdf.set_font("Arial", '', 10)
+    pdf.cell(145, 7, "Netto Summe:", 0, 0, 'R')
+    pdf.cell(45, 7, txt_clean(f"{total_net:,.2f} EUR"), 1, 1, 'R')
+    
+    pdf.cell(145, 7, "20% MwSt:", 0, 0, 'R')
+    pdf.cell(45, 7, txt_clean(f"{mwst:,.2f} EUR"), 1, 1, 'R')
+    
+    pdf.set_font("Arial", 'B', 11)
+    pdf.cell(145, 8, "Gesamt Brutto:", 0, 0, 'R')
+    pdf.cell(45, 8, txt_clean(f"{brutto:,.2f} EUR"), 1, 1, 'R')
+    
+    return pdf.output(dest='S').encode('latin-1')
@@ -0,0 +1,203 @@
+"""Preismatrix: Formeln eines Blatts spaltenweise über ein L/H/Options-Raster rechnen.
+
+Beispiel::
+
+    python preismatrix.py Eigen_Stab L=1:30:1 H=0.9,1.0,1.1 P_Basis=* -o preise.xlsx
+"""
+import argparse
+import functools
+import math
+
+import numpy as np
+import pandas as pd
+
+import formel_engine
+import glasteilung
+import konfigurator
+import treppe
+from katalog_cache import EXCEL_DATEI
+
+ALLE = "*"
+
+# ==========================================
+# 1. VEKTOR-NAMESPACE
+# ==========================================
+def _max(*args):
+    if len(args) == 1: return np.max(args[0])
+    return functools.reduce(np.maximum, args)
+
+def _min(*args):
+    if len(args) == 1: return np.min(args[0])
+    return functools.reduce(np.minimum, args)
+
+def _log(x, basis=None):
+    return np.log(x) if basis is None else np.log(x) / np.log(basis)
+
+class _VektorMath:
+    """Ersatz für ``math`` in Formeln, arbeitet elementweise auf Arrays."""
+    _NP = {"ceil": np.ceil, "floor": np.floor, "trunc": np.trunc, "sqrt": np.sqrt, "fabs": np.fabs,
+           "exp": np.exp, "log": _log, "log10": np.log10, "pow": np.power, "hypot": np.hypot,
+           "sin": np.sin, "cos": np.cos, "tan": np.tan, "atan": np.arctan, "radians": np.radians,
+           "degrees": np.degrees}
+
+    def __getattr__(self, name):
+        if name in self._NP: return self._NP[name]
+        attr = getattr(math, name)
+        return np.vectorize(attr) if callable(attr) else attr
+
+VEKTOR_NAMESPACE = {"__builtins__": None, "math": _VektorMath(), "round": np.round,
+                    "int": np.trunc, "float": lambda x: np.asarray(x, dtype=float),
+                    "max": _max, "min": _min,
+                    **{name: np.vectorize(fn, otypes=[float]) for name, fn in {**glasteilung.FORMEL_FUNKTIONEN, **treppe.FORMEL_FUNKTIONEN}.items()}}
+
+# ==========================================
+# 2. RASTER
+# ==========================================
+def _auswahl_liste(typ, opt_names, werte):
+    if werte == ALLE or werte == [ALLE]:
+        if typ == 'auswahl': return list(opt_names)
+        return [[]] + [[n] for n in opt_names]
+    if isinstance(werte, (str, int, float)): werte = [werte]
+    if typ == 'mehrfach':
+        return [[s.strip() for s in w.split(',') if s.strip()] if isinstance(w, str) else list(w) for w in werte]
+    return [str(w).strip() for w in werte]
+
+def raster_achsen(zeilen, raster):
+    """Pro Eingabevariable die Liste der Rasterwerte (Default = Widget-Default)."""
+    achsen = {}
+    for typ, lbl, var, default, opt_names, opts in zeilen:
+        werte = raster.get(var)
+        if typ == 'zahl':
+            achsen[var] = [default] if werte is None else list(np.atleast_1d(np.asarray(werte, dtype=float)))
+        elif typ == 'auswahl' and opt_names:
+            achsen[var] = [opt_names[0]] if werte is None else _auswahl_liste(typ, opt_names, werte)
+            for w in achsen[var]:
+                if w not in opts: raise ValueError(f"{var}: unbekannte Option '{w}'")
+        elif typ == 'mehrfach':
+            achsen[var] = [[]] if werte is None else _auswahl_liste(typ, opt_names, werte)
+            for sel in achsen[var]:
+                for s in sel:
+                    if s not in opts: raise ValueError(f"{var}: unbekannte Option '{s}'")
+    return achsen
+
+# ==========================================
+# 3. BERECHNUNG
+# ==========================================
+def _zeilenweise(code, env, punkte, fehlwert):
+    # Einzelne Rasterpunkte skalar rechnen, Fehler wie in konfigurator: 'berechnung' -> 0, 'preis' -> NaN
+    werte = np.empty(len(punkte))
+    for j, i in enumerate(punkte):
+        try: werte[j] = formel_engine.auswerten(code, {k: v[i].item() for k, v in env.items()})
+        except Exception: werte[j] = fehlwert
+    return werte
+
+def preismatrix(blatt, raster=None, pfad=EXCEL_DATEI):
+    """Alle Kombinationen des Rasters rechnen.
+
+    ``raster``: {Variable: Werteliste}. Zahlen als Liste/Array, 'auswahl' als
+    Optionsnamen, 'mehrfach' als Liste von Auswahlen; ``"*"`` = alle Optionen.
+    Nicht angegebene Variablen bleiben auf ihrem Default. Ergebnis: ein
+    DataFrame mit einer Zeile pro Rasterpunkt und der Spalte ``Preis``.
+    """
+    zeilen, formeln, system = konfigurator.lade_modell(blatt, pfad)
+    achsen = raster_achsen(zeilen, raster or {})
+    namen = list(achsen)
+    laengen = [len(achsen[v]) for v in namen]
+    n = int(np.prod(laengen)) if laengen else 1
+    idx = np.indices(laengen).reshape(len(laengen), -1) if laengen else np.zeros((0, 1), dtype=int)
+
+    typen = {var: (typ, opts) for typ, lbl, var, default, opt_names, opts in zeilen}
+    env, anzeige = {}, {}
+    for k, var in enumerate(namen):
+        typ, opts = typen[var]
+        werte = achsen[var]
+        if typ == 'zahl': zahlen = np.asarray(werte, dtype=float)
+        elif typ == 'auswahl': zahlen = np.asarray([opts[w] for w in werte], dtype=float)
+        else: zahlen = np.asarray([sum(opts[s] for s in sel) for sel in werte], dtype=float)
+        env[var] = zahlen[idx[k]]
+        if typ == 'zahl': anzeige[var] = env[var]
+        else:
+            texte = np.asarray([w if typ == 'auswahl' else ",".join(w) for w in werte], dtype=object)
+            anzeige[var] = texte[idx[k]]
+
+    ergebnis = dict(anzeige)
+    preis = None
+    for i in formeln.reihenfolge:
+        typ, var = formeln.zeilen[i]
+        code = formeln.codes.get(i)
+        fehlwert = np.nan if typ == 'preis' else 0.0
+        if code is None: wert = np.full(n, fehlwert)
+        else:
+            try:
+                with np.errstate(all="ignore"):
+                    wert = np.array(np.broadcast_to(np.asarray(eval(code, VEKTOR_NAMESPACE, env), dtype=float), (n,)))
+                # inf/NaN (Division durch 0, sqrt(-1) ...) wirft skalar eine Ausnahme: diese Punkte einzeln nachrechnen
+                schlecht = np.flatnonzero(~np.isfinite(wert))
+                if len(schlecht): wert[schlecht] = _zeilenweise(code, env, schlecht, fehlwert)
+            except Exception:
+                # Formeln, die sich nicht vektorisieren lassen (and/or, if-else ...)
+                wert = _zeilenweise(code, env, range(n), fehlwert)
+        if typ == 'berechnung':
+            env[var] = ergebnis[var] = wert
+        elif preis is None: preis = wert
+    if preis is None: raise ValueError("Blatt hat keine 'Preis'-Zeile")
+    ergebnis["Preis"] = np.round(preis, 2)
+    df = pd.DataFrame(ergebnis)
+    df.attrs["System"] = system
+    return df
+
+def alle_systeme(raster=None, pfad=EXCEL_DATEI):
+    """Preismatrix für jedes Blatt der Startseite (Raster-Variablen, die ein Blatt nicht kennt, fallen weg)."""
+    start = konfigurator.katalog_cache.lade_katalog(pfad).blatt("Startseite")
+    ergebnis = {}
+    for blatt in dict.fromkeys(start['Blattname'].astype(str).str.strip()):
+        zeilen, _, _ = konfigurator.lade_modell(blatt, pfad)
+        eigene = {var for _, _, var, _, _, _ in zeilen}
+        try: ergebnis[blatt] = preismatrix(blatt, {k: v for k, v in (raster or {}).items() if k in eigene}, pfad)
+        except ValueError: continue
+    return ergebnis
+
+def als_tabelle(df, zeilen, spalten, werte="Preis"):
+    """Rasterergebnis als Drucktabelle (z.B. zeilen='L', spalten=['H', 'P_Basis'])."""
+    return df.pivot_table(index=zeilen, columns=spalten, values=werte, aggfunc="first")
+
+def exportiere(matrizen, pfad):
+    """Schreibt {Blatt: DataFrame} (oder einen DataFrame) als .xlsx oder .csv."""
+    if isinstance(matrizen, pd.DataFrame): matrizen = {"Preise": matrizen}
+    if str(pfad).lower().endswith(".csv"):
+        pd.concat(matrizen, names=["Blatt", "Nr"]).to_csv(pfad)
+        return
+    with pd.ExcelWriter(pfad, engine="openpyxl") as writer:
+        for name, df in matrizen.items(): df.to_excel(writer, sheet_name=str(name)[:31], index=False)
+
+# ==========================================
+# 4. KOMMANDOZEILE
+# ==========================================
+def _parse_raster(text):
+    var, _, werte = text.partition("=")
+    if werte == ALLE: return var, ALLE
+    if ":" in werte and "," not in werte:
+        teile = [float(x) for x in werte.split(":")]
+        start, stop = teile[0], teile[1]
+        schritt = teile[2] if len(teile) > 2 else 1.0
+        return var, np.round(np.arange(start, stop + schritt / 2, schritt), 6)
+    liste = [w.strip() for w in werte.split(",")]
+    try: return var, [float(w) for w in liste]
+    except ValueError: return var, liste
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Preismatrix für Katalog-Blätter erzeugen")
+    ap.add_argument("blatt", help="Blattname oder 'alle'")
+    ap.add_argument("raster", nargs="*", help="VAR=1:30:1 | VAR=0.9,1.0,1.1 | VAR=*")
+    ap.add_argument("-o", "--ausgabe", default="preismatrix.xlsx")
+    ap.add_argument("--katalog", default=EXCEL_DATEI)
+    args = ap.parse_args(argv)
+
+    raster = dict(_parse_raster(r) for r in args.raster)
+    if args.blatt == "alle": matrizen = alle_systeme(raster, args.katalog)
+    else: matrizen = {args.blatt: preismatrix(args.blatt, raster, args.katalog)}
+    exportiere(matrizen, args.ausgabe)
+    print(f"{sum(len(df) for df in matrizen.values())} Preise -> {args.ausgabe}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Startzeit-Messung für die Streamlit-Einstiegspunkte.
+
+Pro App werden der erste Skriptlauf im Prozess (Kaltstart) und der letzte
+Lauf festgehalten, dazu die Kosten der schweren Importe beim ersten Laden.
+Für Details je Untermodul: ``python -X importtime app_draht.py``.
+"""
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+_IMPORTE = {}
+_KALT = {}
+_ZULETZT = {}
+_LOCK = threading.Lock()
+
+@contextmanager
+def importzeit(name):
+    """``with importzeit("pandas"): import pandas as pd`` - misst nur den ersten Import im Prozess."""
+    neu = name not in sys.modules
+    t0 = time.perf_counter()
+    yield
+    if neu:
+        with _LOCK: _IMPORTE.setdefault(name, time.perf_counter() - t0)
+
+class Messung:
+    """Zeitmarken eines Skriptlaufs, relativ zu seinem Start."""
+    __slots__ = ("app", "start", "marken")
+
+    def __init__(self, app):
+        self.app = app
+        self.start = time.perf_counter()
+        self.marken = []
+
+    def marke(self, name):
+        self.marken.append((name, time.perf_counter() - self.start))
+
+    def abschliessen(self):
+        self.marke("Fertig")
+        with _LOCK:
+            _KALT.setdefault(self.app, self.marken)
+            _ZULETZT[self.app] = self.marken
+
+def bericht():
+    """Zeilen für eine Tabelle: Kaltstart und letzter Lauf je App, dann Importe (ms)."""
+    with _LOCK:
+        zeilen = [{"App": app, "Lauf": lauf, "Marke": name, "ms": round(t * 1000, 1)}
+                  for lauf, laeufe in (("Kaltstart", _KALT), ("Zuletzt", _ZULETZT))
+                  for app, marken in sorted(laeufe.items()) for name, t in marken]
+        zeilen += [{"App": "-", "Lauf": "Import", "Marke": name, "ms": round(t * 1000, 1)}
+                   for name, t in sorted(_IMPORTE.items(), key=lambda x: -x[1])]
+    return zeilen
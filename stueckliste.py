@@ -0,0 +1,146 @@
+"""Stückliste je Position aus Regeln im Katalog und Materialliste je Angebot (ohne Streamlit).
+
+Die Regeln stehen im Katalogblatt ``Stueckliste`` (eine Zeile pro Artikel und
+Konfigurator-Blatt). ``Menge``, ``Laenge`` und ``Bedingung`` sind Formeln über
+die Variablen des Blatts, ausgewertet mit der Formel-Engine. Fehlt das Blatt im
+Katalog, gelten die STANDARD_REGELN (entsprechen der bisherigen Materiallogik).
+"""
+import io
+
+import pandas as pd
+
+import formel_engine
+import katalog_cache
+from katalog_cache import EXCEL_DATEI
+
+BLATT = "Stueckliste"
+SPALTEN = ("Blatt", "Artikel", "Einheit", "Menge", "Laenge", "Bedingung")
+
+# (Blatt, Artikel, Einheit, Menge, Laenge, Bedingung)
+STANDARD_REGELN = (
+    ("Eigen_Stab", "Füllstab", "Stk", "int(N_Bars)", "H", ""),
+    ("Eigen_Stab", "Pfosten", "Stk", "int(N_Post)", "", ""),
+    ("Eigen_Edelstahl-Horiz", "Füllprofil", "Stk", "int(N_Rows)", "L", ""),
+    ("Eigen_Glasgel", "Glasfläche", "m²", "max(L, 1) * H", "", ""),
+    ("Eigen_Glasgel", "Handlauf", "Stk", "1", "max(L, 1)", ""),
+    ("Eigen_Glasgel", "Glasscheibe", "Scheibe", "glas_felder(max(L, 1), Ecken)", "glas_breite(max(L, 1), Ecken)", ""),
+    ("Eigen_Glasgel", "Klemmen", "Stk", "glas_klemmen(max(L, 1), Ecken)", "", ""),
+    ("Eigen_Terrasse", "Dachfläche", "m²", "L * B", "", ""),
+    ("Eigen_Terrasse", "Säule", "Stk", "int(N_Col)", "H", ""),
+    ("Eigen_Terrasse", "Sparren", "Stk", "int(N_Spar)", "B", ""),
+    ("Eigen_Terrasse", "Stahlfläche", "m²", "(int(N_Col) * H + int(N_Spar) * B + L) * 0.4", "", ""),
+    ("Stahl_Treppe", "Stufe", "Stk", "int(N_Stufen)", "", "N_Stufen > 0"),
+    ("Stahl_Treppe", "Wange", "Stk", "2", "L_Wange", "L_Wange > 0"),
+    ("Eigen_Edelstahl-Stab", "Steher", "Stk", "math.ceil(L / 1.2) + 1", "", "L > 0"),
+    ("Brix_Gel_Glas", "Steher", "Stk", "glas_steher(L, Ecken)", "", "L > 0"),
+    ("Brix_Gel_Glas", "Glasscheibe", "Scheibe", "glas_felder(L, Ecken)", "glas_breite(L, Ecken)", "L > 0"),
+    *((b, "Steher", "Stk", "math.ceil(L / 1.3) + 1", "", "L > 0")
+      for b in ("Brix_Gel_Stab", "Brix_Gel_Flaechig", "Brix_Zaun_Stab", "Brix_Zaun_Sicht",
+                "Brix_Schiebe", "Draht_Matten", "Draht_Mix")),
+)
+
+def standard_blatt():
+    return pd.DataFrame(STANDARD_REGELN, columns=list(SPALTEN))
+
+# ==========================================
+# 1. REGELN
+# ==========================================
+class Regel:
+    __slots__ = ("artikel", "einheit", "menge", "laenge", "bedingung")
+
+    def __init__(self, artikel, einheit, menge, laenge=None, bedingung=None):
+        self.artikel = artikel; self.einheit = einheit
+        self.menge = menge; self.laenge = laenge; self.bedingung = bedingung
+
+def _text(wert):
+    return "" if pd.isna(wert) else str(wert).strip()
+
+def kompiliere(regeln_df, blatt, variablen):
+    """Regeln eines Konfigurator-Blatts -> ([Regel], {Zeile: Meldung})."""
+    regeln, fehler = [], {}
+    if regeln_df is None or regeln_df.empty or 'Blatt' not in regeln_df.columns: return regeln, fehler
+    for index, zeile in regeln_df[regeln_df['Blatt'].astype(str).str.strip() == blatt].iterrows():
+        artikel = _text(zeile.get('Artikel'))
+        try:
+            codes = [formel_engine.kompiliere_formel(t, variablen) if t else None
+                     for t in (_text(zeile.get(s)) for s in ('Menge', 'Laenge', 'Bedingung'))]
+            if codes[0] is None: raise formel_engine.FormelFehler("Menge fehlt")
+        except formel_engine.FormelFehler as e:
+            fehler[index] = f"{artikel}: {e}"; continue
+        regeln.append(Regel(artikel, _text(zeile.get('Einheit')) or "Stk", *codes))
+    return regeln, fehler
+
+def regeln_blatt(stand):
+    df = stand.blatt(BLATT) if stand is not None else None
+    return df if df is not None else standard_blatt()
+
+def lade_regeln(blatt, pfad=EXCEL_DATEI):
+    """([Regel], Fehler) eines Blatts, gecacht pro Katalog-Version."""
+    stand = katalog_cache.lade_katalog(pfad)
+    if stand is None: return [], {}
+    name = str(blatt).strip()
+    def erzeuge():
+        df = stand.blatt(name)
+        variablen = set(df['Variable'].dropna().astype(str).str.strip()) if df is not None and 'Variable' in df.columns else set()
+        return kompiliere(regeln_blatt(stand), name, variablen)
+    return stand.abgeleitet(("stueckliste", name), erzeuge)
+
+# ==========================================
+# 2. STÜCKLISTE JE POSITION
+# ==========================================
+def berechne(blatt, vars_calc, pfad=EXCEL_DATEI):
+    """Stücklistenzeilen [{Artikel, Menge, Einheit, Laenge}] einer Konfiguration.
+
+    Zeilen mit Menge 0, nicht erfüllter Bedingung oder Rechenfehler entfallen.
+    """
+    zeilen = []
+    for r in lade_regeln(blatt, pfad)[0]:
+        try:
+            if r.bedingung is not None and not formel_engine.auswerten(r.bedingung, dict(vars_calc)): continue
+            menge = float(formel_engine.auswerten(r.menge, dict(vars_calc)))
+            laenge = float(formel_engine.auswerten(r.laenge, dict(vars_calc))) if r.laenge is not None else None
+        except Exception: continue
+        if menge: zeilen.append({"Artikel": r.artikel, "Menge": menge, "Einheit": r.einheit, "Laenge": laenge})
+    return zeilen
+
+def _zahl(x):
+    return f"{x:.0f}" if float(x).is_integer() else f"{x:.2f}"
+
+def als_text(zeilen):
+    """Stückliste als Textzeilen (MaterialDetails für die interne Fertigungsliste)."""
+    texte = []
+    for z in zeilen:
+        t = f"{z['Artikel']}: {_zahl(z['Menge'])} {z['Einheit']}"
+        if z.get('Laenge'): t += f" à {z['Laenge']:.2f} m (gesamt {z['Menge'] * z['Laenge']:.2f} m)"
+        texte.append(t)
+    return texte
+
+# ==========================================
+# 3. MATERIALLISTE JE ANGEBOT
+# ==========================================
+MATERIAL_SPALTEN = ["Artikel", "Einheit", "Länge m", "Menge", "Gesamtlänge m", "Positionen"]
+
+def materialliste(positionen):
+    """Summiert die Stücklisten aller Positionen (mal Positionsmenge) je Artikel, Einheit und Länge.
+
+    Positionen ohne Stückliste (vor Einführung gespeichert) werden übersprungen.
+    """
+    zeilen = []
+    for nr, pos in enumerate(positionen, 1):
+        faktor = float(pos.get('Menge', 1) or 0)
+        for z in pos.get('Stueckliste') or ():
+            zeilen.append((z['Artikel'], z['Einheit'], round(z['Laenge'], 3) if z.get('Laenge') else 0.0, z['Menge'] * faktor, nr))
+    if not zeilen: return pd.DataFrame(columns=MATERIAL_SPALTEN)
+    df = pd.DataFrame(zeilen, columns=["Artikel", "Einheit", "Länge m", "Menge", "Pos"])
+    df = df.groupby(["Artikel", "Einheit", "Länge m"], sort=True, as_index=False).agg(
+        Menge=("Menge", "sum"), Positionen=("Pos", lambda p: ", ".join(map(str, sorted(set(p))))))
+    df["Gesamtlänge m"] = (df["Menge"] * df["Länge m"]).round(2)
+    df["Menge"] = df["Menge"].round(2)
+    return df[MATERIAL_SPALTEN]
+
+def exportiere(df, format="xlsx"):
+    """Materialliste als CSV (';', Excel-tauglich) oder XLSX-Bytes."""
+    if format == "csv": return df.to_csv(index=False, sep=";", decimal=",").encode("utf-8-sig")
+    puffer = io.BytesIO()
+    with pd.ExcelWriter(puffer, engine="openpyxl") as writer: df.to_excel(writer, sheet_name="Materialliste", index=False)
+    return puffer.getvalue()
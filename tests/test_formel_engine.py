@@ -0,0 +1,43 @@
+import random
+
+import pandas as pd
+import pytest
+
+import formel_engine
+
+def _blatt(zeilen):
+    return formel_engine.kompiliere_blatt(pd.DataFrame(zeilen, columns=["Typ", "Bezeichnung", "Variable", "Optionen", "Formel"]))
+
+BLATT = [("Zahl", "Länge", "L", 0, None), ("Zahl", "Höhe", "H", 0, None), ("Auswahl", "Farbe", "F", "Rot:1,Blau:2", None),
+         ("Berechnung", "", "A", None, "max(L, 1.0) * 2"), ("Berechnung", "", "B", None, "A + H * F"),
+         ("Berechnung", "", "C", None, "math.ceil(L / H)"), ("Preis", "", "P", None, "B * 10 + C")]
+
+def test_inkrementell_wie_vollstaendig():
+    blatt = _blatt(BLATT)
+    inkrementell = formel_engine.Neuberechnung(blatt)
+    rnd = random.Random(1)
+    werte = {"L": 2.0, "H": 1.0, "F": 1.0}
+    for _ in range(200):
+        var = rnd.choice(["L", "H", "F"])
+        werte[var] = rnd.choice([0.0, 1.0, 2.5, 7.0]) # H = 0 -> C schlägt fehl
+        voll = formel_engine.Neuberechnung(blatt)
+        assert inkrementell.berechne(dict(werte)) == voll.berechne(dict(werte))
+        assert inkrementell.ergebnis("P") == voll.ergebnis("P")
+
+def test_reihenfolge_unabhaengig_von_zeilenfolge():
+    blatt = _blatt([BLATT[0], BLATT[1], BLATT[2], BLATT[6], BLATT[5], BLATT[4], BLATT[3]])
+    r = formel_engine.Neuberechnung(blatt)
+    r.berechne({"L": 3.0, "H": 2.0, "F": 2.0})
+    assert r.ergebnis("P") == (6.0 + 4.0) * 10 + 2
+
+def test_zyklus_wirft_fehler():
+    blatt = _blatt([("Zahl", "", "L", 0, None), ("Berechnung", "", "X", None, "Y + L"),
+                    ("Berechnung", "", "Y", None, "X + 1"), ("Berechnung", "", "Z", None, "Z * 2"),
+                    ("Preis", "", "P", None, "X")])
+    zyklen = {i: m for i, m in blatt.fehler.items() if "Zyklus" in m}
+    assert {blatt.zeilen[i][1] for i in zyklen} == {"X", "Y", "Z", "P"} # P hängt am Zyklus
+    for i in zyklen:
+        with pytest.raises(formel_engine.FormelFehler): blatt.berechne(i, {"L": 1.0})
+    r = formel_engine.Neuberechnung(blatt)
+    r.berechne({"L": 1.0})
+    with pytest.raises(formel_engine.FormelFehler): r.ergebnis("P")
@@ -0,0 +1,28 @@
+import random
+
+import pytest
+
+import glasteilung as g
+
+@pytest.mark.parametrize("L, ecken", [(0.3, 0), (1.0, 5), (4.0, 0), (10.0, 2)] + [(round(random.Random(i).uniform(0.5, 40), 2), i % 4) for i in range(40)])
+def test_felder_hoechstens_b_max_und_lauflaenge(L, ecken):
+    t = g.teilung(L, ecken)
+    assert sum(t.laeufe) == pytest.approx(L)
+    assert len(t.laeufe) == ecken + 1
+    for lauf, n, b in zip(t.laeufe, t.felder, t.breiten):
+        assert b <= g.B_MAX
+        assert n * b + (n + 1) * g.SPALT == pytest.approx(lauf, abs=n * 1e-4) # Breite auf 0.1 mm gerundet
+        if n > 1: assert (lauf - n * g.SPALT) / (n - 1) > g.B_MAX # ein Feld weniger wäre zu breit
+    assert (t.breite_max < g.B_MIN) == bool(t.warnungen)
+    assert t.klemmen == t.anzahl * g.KLEMMEN_JE_FELD + ecken * g.KLEMMEN_JE_ECKE
+    assert g.glas_felder(L, ecken) == t.anzahl and g.glas_steher(L, ecken) == t.anzahl + 1
+
+def test_teile_unterschiedliche_laeufe():
+    t = g.teile([2.0, 0.5, 3.3])
+    assert t.felder == (2, 1, 3)
+    assert t.steher == 7
+    assert not t.warnungen
+
+def test_schmale_scheibe_gemeldet():
+    assert g.teilung(0.3, 0).warnungen
+    assert g.teilung(1.0, 5).warnungen
@@ -0,0 +1,19 @@
+import konfigurator
+
+def test_optionen_dezimalkomma():
+    opt, meldungen = konfigurator.optionen_lesen("A:1,5,B:2")
+    assert opt.index == {"A": 1.5, "B": 2.0} and meldungen == []
+
+def test_optionen_trenner_vor_name_mit_ziffern():
+    opt, meldungen = konfigurator.optionen_lesen("H 1030:22,1230:26")
+    assert opt.namen == ("H 1030", "1230") and opt.werte == (22.0, 26.0) and meldungen == []
+
+def test_optionen_wert_keine_zahl():
+    opt, meldungen = konfigurator.optionen_lesen("A:x")
+    assert opt.index == {"A": 0.0} and len(meldungen) == 1
+
+def test_optionen_mehrdeutig_und_doppelpunkt_gemeldet():
+    _, meldungen = konfigurator.optionen_lesen("A:1, 5")
+    assert any("mehrdeutig" in m for m in meldungen)
+    _, meldungen = konfigurator.optionen_lesen("a:b:3")
+    assert any("':'" in m for m in meldungen)
@@ -0,0 +1,25 @@
+import math
+import random
+
+import pytest
+
+import konfigurator
+import preismatrix
+
+def _blaetter():
+    start = konfigurator.katalog_cache.lade_katalog(konfigurator.EXCEL_DATEI).blatt("Startseite")
+    return list(dict.fromkeys(start['Blattname'].astype(str).str.strip()))
+
+@pytest.mark.parametrize("blatt", _blaetter())
+def test_matrix_wie_konfigurator(blatt):
+    zeilen, _, _ = konfigurator.lade_modell(blatt)
+    zahlen = [var for typ, _, var, *_ in zeilen if typ == 'zahl'][:6]
+    auswahl = [var for typ, _, var, *_ in zeilen if typ == 'auswahl']
+    df = preismatrix.preismatrix(blatt, {var: [0.0, 3.0] for var in zahlen})
+    rnd = random.Random(blatt)
+    for i in [0] + rnd.sample(range(len(df)), min(len(df), 12)): # Punkt 0 = alle Zahlen 0
+        eingaben = {var: df[var].iat[i] for var in zahlen + auswahl}
+        try: erwartet = round(konfigurator.berechne(blatt, eingaben)["Preis"], 2)
+        except Exception: erwartet = math.nan
+        preis = df["Preis"].iat[i]
+        assert (math.isnan(preis) and math.isnan(erwartet)) or preis == pytest.approx(erwartet, abs=0.01), (blatt, eingaben)
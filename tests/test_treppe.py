@@ -0,0 +1,30 @@
+import math
+
+import pytest
+
+import treppe
+
+@pytest.mark.parametrize("H, lauf_max, oeffnung", [(2.8, 0, 0), (3.0, 0, 0), (3.0, 4.5, 0), (2.6, 0, 3.0), (3.2, 5.0, 3.5), (0.9, 0, 0)])
+def test_loesungen_halten_regeln_ein(H, lauf_max, oeffnung):
+    df = treppe.loesungen(H, lauf_max, oeffnung)
+    assert len(df)
+    for _, z in df.iterrows():
+        r, a = H / z["Steigungen"], z["Auftritt m"]
+        assert abs(2 * r + a - treppe.SCHRITTMASS) <= treppe.TOLERANZ + 1e-6 # Schrittmaßregel 63 ± 3 cm
+        assert treppe.STEIGUNG[0] - 1e-9 <= r <= treppe.STEIGUNG[1] + 1e-9
+        assert treppe.AUFTRITT[0] - 1e-9 <= a <= treppe.AUFTRITT[1] + 1e-9
+        assert z["Stufen"] == z["Steigungen"] - 1
+        assert z["Lauflänge m"] == pytest.approx(z["Stufen"] * a, abs=1e-3)
+        if lauf_max: assert z["Lauflänge m"] <= lauf_max + 1e-6
+        if oeffnung:
+            assert z["Kopfhöhe m"] >= treppe.KOPFHOEHE - 1e-3
+            assert oeffnung * r / a - treppe.DECKE >= treppe.KOPFHOEHE - 1e-9
+    assert df["Bewertung"].is_monotonic_increasing
+
+def test_formelfunktionen():
+    assert treppe.treppe_stufen(0) == 0.0
+    assert math.isnan(treppe.treppe_stufen(3.0, 1.0)) # 1 m Lauf reicht nie
+    z = treppe.loesung(3.0)
+    assert treppe.treppe_stufen(3.0) == z["Stufen"]
+    assert treppe.treppe_wange(3.0) == pytest.approx(math.hypot(z["Lauflänge m"], 3.0), abs=1e-3)
+    assert treppe.treppe_stufen(3.0, wahl=2) == treppe.loesungen(3.0).iloc[1]["Stufen"]
@@ -0,0 +1,35 @@
+import random
+from collections import Counter
+
+import pytest
+
+import zuschnitt
+
+def _pruefe(plan, teile, lager_mm, kerf):
+    for s in plan.stangen:
+        assert s.laenge in lager_mm
+        assert sum(s.teile) + kerf * (len(s.teile) - 1) <= s.laenge
+        assert s.rest() >= 0
+    gelegt = Counter(t for s in plan.stangen for t in s.teile) + Counter(plan.zu_lang)
+    assert gelegt == Counter(teile)
+
+@pytest.mark.parametrize("optimiert", [False, True])
+@pytest.mark.parametrize("lager_m", [(6.0,), (3.0, 6.0, 7.5)])
+def test_alle_teile_passen(optimiert, lager_m):
+    rnd = random.Random(3)
+    teile = [rnd.choice([350, 800, 1200, 1250, 2400, 2999, 5997]) for _ in range(300)] + [8000]
+    plan = zuschnitt.optimiere(teile, lager_m, 3, optimiert, zeitbudget=0.2)
+    _pruefe(plan, teile, {int(l * 1000) for l in lager_m}, 3)
+    assert plan.zu_lang == [8000]
+
+def test_optimiert_nicht_schlechter():
+    rnd = random.Random(5)
+    teile = [rnd.randint(300, 3500) for _ in range(200)]
+    ffd = zuschnitt.optimiere(teile)
+    opt = zuschnitt.optimiere(teile, optimiert=True, zeitbudget=0.3)
+    assert opt.verbrauch_mm <= ffd.verbrauch_mm
+
+def test_schnitte_aus_stueckliste():
+    pos = [{"Menge": 2, "Stueckliste": [{"Artikel": "Rohr", "Menge": 3, "Einheit": "Stk", "Laenge": 1.2},
+                                        {"Artikel": "Glas", "Menge": 1, "Einheit": "Scheibe", "Laenge": 1.0}]}]
+    assert zuschnitt.schnitte(pos) == {"Rohr": [1200] * 6}
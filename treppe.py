@@ -0,0 +1,90 @@
+"""Geometrie gerader Stahltreppen (Stahl_Treppe, app.py "Stahltreppe Gerade"), ohne Streamlit.
+
+Für eine Geschoßhöhe werden alle Steigungsanzahlen und Auftrittstiefen (Raster
+5 mm) auf einmal mit NumPy durchgerechnet und gegen die Schrittmaßregel
+2 Steigungen + 1 Auftritt ≈ 63 cm, die Grenzen für Steigung/Auftritt, die
+verfügbare Lauflänge und optional die Kopfhöhe unter der Deckenöffnung
+geprüft. Die gültigen Lösungen werden bewertet (Abweichung vom Schrittmaß,
+dann von der Wunschsteigung, dann kürzerer Lauf).
+
+Die Stufenzahl zählt die Auftritte: bei n Steigungen sind es n - 1, die
+oberste Steigung endet auf dem Geschoß. Katalog-Formeln::
+
+    N_Stufen = treppe_stufen(H, L_Lauf, O_Decke, T_Wahl)
+    L_Wange  = treppe_wange(H, L_Lauf, O_Decke, T_Wahl)
+"""
+import functools
+import math
+
+import numpy as np
+import pandas as pd
+
+SCHRITTMASS = 0.63        # m, 2R + A
+TOLERANZ = 0.03           # m, erlaubte Abweichung vom Schrittmaß
+STEIGUNG = (0.14, 0.21)   # m, min/max
+AUFTRITT = (0.21, 0.37)   # m, min/max
+STEIGUNG_IDEAL = 0.17
+RASTER = 0.005            # m, Schrittweite der Auftrittstiefe
+KOPFHOEHE = 2.0           # m, lichte Höhe unter der Deckenkante
+DECKE = 0.20              # m, Deckenstärke an der Öffnung
+
+SPALTEN = ["Steigungen", "Stufen", "Steigung m", "Auftritt m", "Schrittmaß m", "Lauflänge m",
+           "Wange m", "Neigung °", "Kopfhöhe m", "Bewertung"]
+
+def loesungen(H, lauf_max=0.0, oeffnung=0.0, decke=DECKE, kopfhoehe=KOPFHOEHE, schrittmass=SCHRITTMASS,
+              toleranz=TOLERANZ, steigung=STEIGUNG, auftritt=AUFTRITT, anzahl=20):
+    """Gültige Geometrien für Geschoßhöhe ``H`` (m), beste zuerst (höchstens ``anzahl`` Zeilen).
+
+    ``lauf_max`` begrenzt die Lauflänge, ``oeffnung`` ist die Länge der
+    Deckenöffnung ab der Austrittskante (0 = ohne Prüfung der Kopfhöhe).
+    """
+    if not H > 0: return pd.DataFrame(columns=SPALTEN)
+    n = np.arange(max(2, math.ceil(H / steigung[1] - 1e-9)), math.floor(H / steigung[0] + 1e-9) + 1)
+    a = np.arange(auftritt[0], auftritt[1] + RASTER / 2, RASTER)
+    r = (H / n)[:, None]                                  # Steigungen x Auftritte
+    stufen = (n - 1)[:, None]
+    schritt = 2 * r + a
+    lauf = stufen * a
+    ok = np.abs(schritt - schrittmass) <= toleranz + 1e-9
+    if lauf_max > 0: ok &= lauf <= lauf_max + 1e-9
+    # Unter der Deckenkante (``oeffnung`` vor dem Austritt) liegt die Lauflinie um oeffnung * R/A tiefer
+    kopf = oeffnung * r / a - decke if oeffnung > 0 else np.full(ok.shape, np.inf)
+    if oeffnung > 0: ok &= kopf >= kopfhoehe
+    i, j = np.nonzero(ok)
+    if not len(i): return pd.DataFrame(columns=SPALTEN)
+
+    rr, aa, ll = r[i, 0], a[j], lauf[i, j]
+    bewertung = np.abs(schritt[i, j] - schrittmass) + 0.5 * np.abs(rr - STEIGUNG_IDEAL) + 0.001 * ll
+    reihe = np.lexsort((ll, bewertung))[:anzahl]
+    df = pd.DataFrame({"Steigungen": n[i], "Stufen": n[i] - 1, "Steigung m": rr.round(4), "Auftritt m": aa.round(3),
+                       "Schrittmaß m": schritt[i, j].round(4), "Lauflänge m": ll.round(3),
+                       "Wange m": np.hypot(ll, H).round(3), "Neigung °": np.degrees(np.arctan2(rr, aa)).round(1),
+                       "Kopfhöhe m": np.where(np.isinf(kopf[i, j]), np.nan, kopf[i, j]).round(3),
+                       "Bewertung": bewertung.round(4)}).iloc[reihe]
+    return df.reset_index(drop=True)
+
+@functools.lru_cache(maxsize=1024)
+def _loesung(H, lauf_max, oeffnung, wahl):
+    df = loesungen(H, lauf_max, oeffnung, anzahl=max(1, wahl))
+    return df.iloc[wahl - 1] if len(df) >= wahl else None
+
+def loesung(H, lauf_max=0.0, oeffnung=0.0, wahl=1):
+    """Die ``wahl``-beste Geometrie als Zeile (Series) oder None (gecacht)."""
+    return _loesung(float(H), float(lauf_max), float(oeffnung), max(1, int(wahl)))
+
+# ==========================================
+# FUNKTIONEN FÜR KATALOG-FORMELN
+# ==========================================
+# Ohne gültige Geometrie liefern sie NaN - der Preis wird dann ebenfalls NaN statt falsch; H = 0 heißt keine Treppe
+def _wert(spalte, H, lauf_max, oeffnung, wahl):
+    if not H > 0: return 0.0
+    z = loesung(H, lauf_max, oeffnung, wahl)
+    return float("nan") if z is None else float(z[spalte])
+
+def treppe_stufen(H, lauf_max=0.0, oeffnung=0.0, wahl=1): return _wert("Stufen", H, lauf_max, oeffnung, wahl)
+def treppe_wange(H, lauf_max=0.0, oeffnung=0.0, wahl=1): return _wert("Wange m", H, lauf_max, oeffnung, wahl)
+def treppe_steigung(H, lauf_max=0.0, oeffnung=0.0, wahl=1): return _wert("Steigung m", H, lauf_max, oeffnung, wahl)
+def treppe_auftritt(H, lauf_max=0.0, oeffnung=0.0, wahl=1): return _wert("Auftritt m", H, lauf_max, oeffnung, wahl)
+
+FORMEL_FUNKTIONEN = {"treppe_stufen": treppe_stufen, "treppe_wange": treppe_wange,
+                     "treppe_steigung": treppe_steigung, "treppe_auftritt": treppe_auftritt}
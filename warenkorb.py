@@ -0,0 +1,23 @@
+"""Warenkorb-Helfer für beide Apps: Seitenansicht und Batch-Änderungen für den Angebotsspeicher."""
+import math
+
+SEITEN_GROESSE = 25
+
+def seiten_anzahl(anzahl, groesse=SEITEN_GROESSE):
+    return max(1, math.ceil(anzahl / groesse))
+
+def seiten_bereich(seite, anzahl, groesse=SEITEN_GROESSE):
+    """(start, ende) der Positionen auf Seite ``seite`` (1-basiert)."""
+    start = (seite - 1) * groesse
+    return start, min(start + groesse, anzahl)
+
+def mengen_aendern(positionen, mengen, preis_feld, menge_feld='Menge', ep_feld='Einzelpreis'):
+    """[(ID, Position)] + {ID: Menge} -> {ID: (Position, Preis)} für ``AngebotStore.positionen_batch``."""
+    aendern = {}
+    for pid, p in positionen:
+        if pid not in mengen: continue
+        neu = dict(p)
+        neu[menge_feld] = mengen[pid]
+        neu[preis_feld] = mengen[pid] * p.get(ep_feld, 0)
+        aendern[pid] = (neu, neu[preis_feld])
+    return aendern
@@ -0,0 +1,175 @@
+"""Zuschnittoptimierung (1D) für Stäbe, Steher und Handläufe eines ganzen Angebots (ohne Streamlit).
+
+Die Schnittlängen kommen aus den Stücklisten der Positionen (Zeilen mit
+``Laenge``), getrennt je Artikel. Standard ist First-Fit-Decreasing über
+gleiche Längen gruppiert (tausende Schnitte in Millisekunden);
+``optimiert=True`` verbessert das Ergebnis danach innerhalb eines Zeitbudgets
+(Stangen mit dem meisten Verschnitt auflösen und per Best-Fit neu verteilen).
+Intern wird in ganzen Millimetern gerechnet.
+"""
+import bisect
+import math
+import random
+import time
+from collections import Counter
+
+LAGER_M = (6.0,)      # lieferbare Stangenlängen
+KERF_MM = 3           # Schnittbreite (Sägeblatt)
+EINHEITEN = ("Stk",)  # nur Stangenware; z.B. Glasscheiben (Einheit "Scheibe") werden nicht geschnitten
+ZEITBUDGET_S = 0.5    # für das optimierte Verfahren, je Angebot
+
+# ==========================================
+# 1. DATEN
+# ==========================================
+class Stange:
+    __slots__ = ("laenge", "teile", "belegt")
+
+    def __init__(self, laenge):
+        self.laenge = laenge
+        self.teile = []
+        self.belegt = 0
+
+    def platz_fuer(self, teil, kerf):
+        """Wie viele Teile dieser Länge noch hineinpassen."""
+        frei = self.laenge - self.belegt + (kerf if not self.teile else 0)
+        return max(0, frei // (teil + kerf))
+
+    def fuege(self, teil, anzahl, kerf):
+        self.belegt += anzahl * (teil + kerf) - (kerf if not self.teile else 0)
+        self.teile.extend([teil] * anzahl)
+
+    def rest(self):
+        return self.laenge - self.belegt
+
+class Plan:
+    """Ergebnis für einen Artikel: Stangen (mm), Teile länger als jede Lagerlänge, Schnittbreite."""
+    __slots__ = ("stangen", "zu_lang", "kerf")
+
+    def __init__(self, stangen, zu_lang, kerf):
+        self.stangen = stangen
+        self.zu_lang = zu_lang
+        self.kerf = kerf
+
+    @property
+    def verbrauch_mm(self): return sum(s.laenge for s in self.stangen)
+
+    @property
+    def netto_mm(self): return sum(sum(s.teile) for s in self.stangen)
+
+    @property
+    def verschnitt_prozent(self):
+        v = self.verbrauch_mm
+        return (1 - self.netto_mm / v) * 100 if v else 0.0
+
+    def muster(self):
+        """Gleiche Stangen zusammengefasst: [(Anzahl, Stangenlänge, ((Teil, Stk), ...), Rest)]."""
+        zaehler = Counter((s.laenge, tuple(sorted(Counter(s.teile).items(), reverse=True)), s.rest()) for s in self.stangen)
+        return [(n, laenge, teile, rest) for (laenge, teile, rest), n in sorted(zaehler.items(), key=lambda x: (-x[1], x[0][2]))]
+
+# ==========================================
+# 2. VERFAHREN
+# ==========================================
+def _kuerzen(stangen, lager):
+    # Stange nachträglich auf die kürzeste Lagerlänge setzen, in die ihre Teile passen
+    for s in stangen: s.laenge = lager[bisect.bisect_left(lager, s.belegt)]
+
+def _ffd(teile, lager, kerf):
+    stangen, offen, laengste = [], [], lager[-1]
+    gruppen = sorted(Counter(teile).items(), reverse=True)
+    kleinstes = gruppen[-1][0] if gruppen else 0
+    for teil, anzahl in gruppen:
+        for s in offen:
+            if not anzahl: break
+            k = min(anzahl, s.platz_fuer(teil, kerf))
+            if k: s.fuege(teil, k, kerf); anzahl -= k
+        while anzahl:
+            s = Stange(laengste)
+            k = min(anzahl, s.platz_fuer(teil, kerf))
+            s.fuege(teil, k, kerf); anzahl -= k
+            stangen.append(s); offen.append(s)
+        # Stangen, in die nicht einmal das kleinste Teil mehr passt, nicht mehr durchsuchen
+        offen = [s for s in offen if s.rest() >= kleinstes + kerf]
+    _kuerzen(stangen, lager)
+    return stangen
+
+def _kosten(stangen):
+    # Weniger Material zuerst; bei Gleichstand lieber volle + leere Stangen (quadratische Füllung)
+    return sum(s.laenge for s in stangen), -sum(s.belegt * s.belegt for s in stangen)
+
+def _neu_verteilen(behalten, pool, lager, kerf, rnd):
+    """Best-Fit der Teile aus ``pool`` in ``behalten`` (neue Stangen nach Bedarf)."""
+    stangen = []
+    for s in behalten:
+        k = Stange(lager[-1]); k.teile = list(s.teile); k.belegt = s.belegt
+        stangen.append(k)
+    reste = sorted((s.rest(), i) for i, s in enumerate(stangen))
+    pool = sorted(pool, reverse=True)
+    # leicht gemischt: gleich lange Teile bleiben zusammen, ähnlich lange tauschen den Platz
+    for i in range(len(pool) - 1):
+        if rnd.random() < 0.3: pool[i], pool[i + 1] = pool[i + 1], pool[i]
+    for teil in pool:
+        j = bisect.bisect_left(reste, (teil + kerf, -1))
+        if j < len(reste):
+            _, i = reste.pop(j)
+            stangen[i].fuege(teil, 1, kerf)
+        else:
+            stangen.append(Stange(lager[-1])); i = len(stangen) - 1
+            stangen[i].fuege(teil, 1, kerf)
+        bisect.insort(reste, (stangen[i].rest(), i))
+    _kuerzen(stangen, lager)
+    return stangen
+
+def _verbessern(stangen, lager, kerf, zeitbudget, rnd):
+    ende = time.perf_counter() + zeitbudget
+    netto = sum(sum(s.teile) for s in stangen)
+    untergrenze = math.ceil(netto / lager[-1]) * lager[0] if len(lager) == 1 else netto
+    bestes, beste_kosten = stangen, _kosten(stangen)
+    aktuell, aktuelle_kosten = stangen, beste_kosten
+    while time.perf_counter() < ende and beste_kosten[0] > untergrenze and len(aktuell) > 1:
+        # die leersten Stangen plus ein paar zufällige auflösen
+        nach_rest = sorted(range(len(aktuell)), key=lambda i: -aktuell[i].rest())
+        weg = set(nach_rest[:rnd.randint(1, 3)]) | set(rnd.sample(range(len(aktuell)), min(len(aktuell), rnd.randint(1, 4))))
+        pool = [t for i in weg for t in aktuell[i].teile]
+        neu = _neu_verteilen([s for i, s in enumerate(aktuell) if i not in weg], pool, lager, kerf, rnd)
+        kosten = _kosten(neu)
+        if kosten <= aktuelle_kosten:
+            aktuell, aktuelle_kosten = neu, kosten
+            if kosten < beste_kosten: bestes, beste_kosten = neu, kosten
+    return bestes
+
+def optimiere(teile_mm, lager_m=LAGER_M, kerf_mm=KERF_MM, optimiert=False, zeitbudget=ZEITBUDGET_S, seed=0):
+    """Schnittplan für eine Liste von Teillängen (mm) -> Plan."""
+    lager = sorted({int(round(l * 1000)) for l in lager_m if l > 0}) or [int(LAGER_M[0] * 1000)]
+    kerf = max(0, int(round(kerf_mm)))
+    passend = [t for t in teile_mm if 0 < t <= lager[-1]]
+    zu_lang = sorted((t for t in teile_mm if t > lager[-1]), reverse=True)
+    stangen = _ffd(passend, lager, kerf)
+    if optimiert and stangen: stangen = _verbessern(stangen, lager, kerf, zeitbudget, random.Random(seed))
+    stangen.sort(key=lambda s: (-s.laenge, s.rest()))
+    return Plan(stangen, zu_lang, kerf)
+
+# ==========================================
+# 3. ANGEBOT
+# ==========================================
+def schnitte(positionen):
+    """{Artikel: [Länge mm, ...]} aus den Stücklisten (mal Positionsmenge)."""
+    ergebnis = {}
+    for pos in positionen:
+        faktor = float(pos.get('Menge', 1) or 0)
+        for z in pos.get('Stueckliste') or ():
+            if not z.get('Laenge') or z['Laenge'] <= 0 or z['Einheit'] not in EINHEITEN: continue
+            anzahl = int(round(z['Menge'] * faktor))
+            ergebnis.setdefault(z['Artikel'], []).extend([int(round(z['Laenge'] * 1000))] * anzahl)
+    return ergebnis
+
+def einstellungen(zusatzkosten):
+    """Zuschnitt-Parameter aus den Zusatzkosten eines Angebots (mit Standardwerten)."""
+    return {"lager_m": tuple(zusatzkosten.get('zuschnitt_lager') or LAGER_M),
+            "kerf_mm": float(zusatzkosten.get('zuschnitt_kerf_mm', KERF_MM)),
+            "optimiert": bool(zusatzkosten.get('zuschnitt_optimiert', False))}
+
+def fuer_angebot(positionen, lager_m=LAGER_M, kerf_mm=KERF_MM, optimiert=False, zeitbudget=ZEITBUDGET_S):
+    """{Artikel: Plan} für alle Positionen; das Zeitbudget wird auf die Artikel verteilt."""
+    alle = schnitte(positionen)
+    budget = zeitbudget / max(1, len(alle))
+    return {artikel: optimiere(teile, lager_m, kerf_mm, optimiert, budget) for artikel, teile in sorted(alle.items())}